@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import os
+import threading
+from dataclasses import dataclass
+
+from dotenv import load_dotenv
+
+# =========================
+# CONFIGURAÇÃO
+# =========================
+# O .env é lido uma única vez, no primeiro get_settings(); os módulos leem
+# daqui em vez de cada um chamar load_dotenv() e os.getenv(). Os singletons
+# criados no primeiro uso (executor do Argon2, caches, limiter, storage) leem
+# estes campos na criação.
+
+
+def _flag(value: str | None, default: bool = False) -> bool:
+    if value is None or not value.strip():
+        return default
+    return value.strip().lower() in {"1", "true", "sim"}
+
+
+@dataclass(frozen=True)
+class Settings:
+    db_host: str
+    db_port: str
+    db_name: str
+    db_user: str
+    db_password: str
+    db_sslmode: str
+    # "sync" (psycopg2 + rotas def no threadpool) ou "async" (asyncpg + AsyncSession)
+    db_mode: str
+    db_pool_liveness: str
+    db_pool_recycle: int
+    db_pool_size: int
+    db_max_overflow: int
+    db_pool_timeout: float
+    # réplicas de leitura (app.database.replicas); vazio = tudo no primário
+    db_replica_urls: tuple[str, ...]
+    db_replica_retry_seconds: float
+    read_your_writes_seconds: float
+    environment: str
+    frontend_url: str
+    secret_key: str
+    jwt_algorithm: str
+    jwt_cache_size: int
+    me_from_token: bool
+    reserva_ttl_seconds: float
+    # jobs periódicos do lifespan (main.py); intervalo 0 desliga
+    blacklist_compaction_seconds: float
+    blacklist_compaction_batch: int
+    reserva_release_seconds: float
+    # executor do Argon2 (app.utils.password)
+    hash_executor: str
+    hash_workers: int
+    hash_max_queue: int
+    # admissão de login/register (app.utils.rate_limit)
+    auth_rate_ip_per_min: float
+    auth_rate_ip_burst: int
+    auth_rate_ident_per_min: float
+    auth_rate_ident_burst: int
+    auth_max_in_flight: int
+    auth_rate_max_keys: int
+    auth_trust_forwarded: bool
+    auth_trusted_hops: int
+    # cache e gravação das revogações (app.utils.revocation)
+    revocation_bloom_capacity: int
+    revocation_bloom_error_rate: float
+    revocation_lru_size: int
+    revocation_lru_ttl: float
+    revocation_sync_seconds: float
+    revocation_sync_overlap: float
+    revocation_flush_seconds: float
+    revocation_flush_batch: int
+    revocation_queue_max: int
+    user_version_sync_seconds: float
+    catalog_cache_size: int
+    catalog_cache_ttl: float
+    # imagens (app.utils.storage, app.utils.uploads)
+    storage_backend: str
+    storage_dir: str
+    storage_url: str
+    storage_staging_dir: str | None
+    s3_bucket: str
+    s3_endpoint_url: str | None
+    s3_public_url: str | None
+    upload_max_bytes: int
+    thumb_size: int
+    thumb_quality: int
+    thumb_workers: int
+    # observabilidade (app.utils.query_stats, app.utils.metrics, /internal)
+    query_stats: bool
+    server_timing: bool
+    query_budget: int
+    query_budget_strict: bool
+    metrics: bool
+    metrics_token: str | None
+    internal_token: str | None
+
+    @property
+    def is_prod(self) -> bool:
+        return self.environment == "prod"
+
+    @property
+    def cookie_domain(self) -> str | None:
+        return "ziondocs.com.br" if self.is_prod else None
+
+    @property
+    def cookie_env(self) -> dict:
+        # atributos comuns dos cookies (auth e read-your-writes)
+        return {
+            "secure": True if self.is_prod else False,
+            "samesite": "Lax",
+            "domain": self.cookie_domain,
+        }
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        liveness = (os.getenv("DB_POOL_LIVENESS") or "pre_ping").strip().lower()
+        environment = os.getenv("ENVIRONMENT") or ""
+        hash_workers = max(1, int(os.getenv("HASH_WORKERS") or max(1, min(4, os.cpu_count() or 1))))
+        return cls(
+            db_host=(os.getenv("DB_HOST") or "").strip(),
+            db_port=(os.getenv("DB_PORT") or "").strip(),
+            db_name=(os.getenv("DB_NAME") or "").strip(),
+            db_user=(os.getenv("DB_USER") or "").strip(),
+            db_password=os.getenv("DB_PASSWORD") or "",
+            db_sslmode=(os.getenv("DB_SSLMODE") or "disable").strip(),
+            db_mode=(os.getenv("DB_MODE") or "sync").strip().lower(),
+            db_pool_liveness=liveness,
+            db_pool_recycle=int(os.getenv("DB_POOL_RECYCLE") or (1800 if liveness == "recycle" else -1)),
+            db_pool_size=int(os.getenv("DB_POOL_SIZE") or 5),
+            db_max_overflow=int(os.getenv("DB_MAX_OVERFLOW") or 10),
+            db_pool_timeout=float(os.getenv("DB_POOL_TIMEOUT") or 30),
+            db_replica_urls=tuple(u.strip() for u in (os.getenv("DB_REPLICA_URLS") or "").split(",") if u.strip()),
+            db_replica_retry_seconds=float(os.getenv("DB_REPLICA_RETRY_SECONDS") or 30),
+            read_your_writes_seconds=float(os.getenv("READ_YOUR_WRITES_SECONDS") or 5),
+            environment=environment,
+            frontend_url=os.getenv("FRONTEND_URL", "http://localhost:5173"),
+            secret_key=os.getenv("SECRET_KEY", "CHANGE_ME"),
+            jwt_algorithm=os.getenv("JWT_ALGORITHM", "HS256"),
+            jwt_cache_size=int(os.getenv("JWT_CACHE_SIZE") or 10000),
+            me_from_token=_flag(os.getenv("ME_FROM_TOKEN")),
+            reserva_ttl_seconds=float(os.getenv("RESERVA_TTL_SECONDS") or 600),
+            blacklist_compaction_seconds=float(os.getenv("BLACKLIST_COMPACTION_SECONDS") or 0),
+            blacklist_compaction_batch=int(os.getenv("BLACKLIST_COMPACTION_BATCH") or 1000),
+            reserva_release_seconds=float(os.getenv("RESERVA_RELEASE_SECONDS") or 60),
+            hash_executor="process" if (os.getenv("HASH_EXECUTOR") or "").strip().lower() == "process" else "thread",
+            hash_workers=hash_workers,
+            hash_max_queue=max(0, int(os.getenv("HASH_MAX_QUEUE") or hash_workers * 8)),
+            auth_rate_ip_per_min=float(os.getenv("AUTH_RATE_IP_PER_MIN") or 60),
+            auth_rate_ip_burst=int(os.getenv("AUTH_RATE_IP_BURST") or 20),
+            auth_rate_ident_per_min=float(os.getenv("AUTH_RATE_IDENT_PER_MIN") or 10),
+            auth_rate_ident_burst=int(os.getenv("AUTH_RATE_IDENT_BURST") or 5),
+            auth_max_in_flight=int(os.getenv("AUTH_MAX_IN_FLIGHT") or 64),
+            auth_rate_max_keys=int(os.getenv("AUTH_RATE_MAX_KEYS") or 100_000),
+            auth_trust_forwarded=_flag(os.getenv("AUTH_TRUST_FORWARDED")),
+            auth_trusted_hops=int(os.getenv("AUTH_TRUSTED_HOPS") or 1),
+            revocation_bloom_capacity=int(os.getenv("REVOCATION_BLOOM_CAPACITY") or 100_000),
+            revocation_bloom_error_rate=float(os.getenv("REVOCATION_BLOOM_ERROR_RATE") or 0.001),
+            revocation_lru_size=int(os.getenv("REVOCATION_LRU_SIZE") or 10_000),
+            revocation_lru_ttl=float(os.getenv("REVOCATION_LRU_TTL") or 3600),
+            revocation_sync_seconds=float(os.getenv("REVOCATION_SYNC_SECONDS") or 5),
+            revocation_sync_overlap=float(os.getenv("REVOCATION_SYNC_OVERLAP") or 60),
+            revocation_flush_seconds=float(os.getenv("REVOCATION_FLUSH_SECONDS") or 0.2),
+            revocation_flush_batch=int(os.getenv("REVOCATION_FLUSH_BATCH") or 500),
+            revocation_queue_max=int(os.getenv("REVOCATION_QUEUE_MAX") or 100_000),
+            user_version_sync_seconds=float(os.getenv("USER_VERSION_SYNC_SECONDS") or 5),
+            catalog_cache_size=int(os.getenv("CATALOG_CACHE_SIZE") or 1000),
+            catalog_cache_ttl=float(os.getenv("CATALOG_CACHE_TTL") or 30),
+            storage_backend=(os.getenv("STORAGE_BACKEND") or "local").strip().lower(),
+            storage_dir=os.getenv("STORAGE_DIR") or "media",
+            storage_url=os.getenv("STORAGE_URL") or "/media",
+            storage_staging_dir=os.getenv("STORAGE_STAGING_DIR") or None,
+            s3_bucket=os.getenv("S3_BUCKET") or "",
+            s3_endpoint_url=os.getenv("S3_ENDPOINT_URL") or None,
+            s3_public_url=os.getenv("S3_PUBLIC_URL") or None,
+            upload_max_bytes=int(os.getenv("UPLOAD_MAX_BYTES") or 10 * 1024 * 1024),
+            thumb_size=int(os.getenv("THUMB_SIZE") or 320),
+            thumb_quality=int(os.getenv("THUMB_QUALITY") or 80),
+            thumb_workers=int(os.getenv("THUMB_WORKERS") or 2),
+            query_stats=_flag(os.getenv("QUERY_STATS"), True),
+            server_timing=_flag(os.getenv("SERVER_TIMING"), environment != "prod"),
+            query_budget=int(os.getenv("QUERY_BUDGET") or 0),
+            query_budget_strict=_flag(os.getenv("QUERY_BUDGET_STRICT")),
+            metrics=_flag(os.getenv("METRICS"), True),
+            metrics_token=os.getenv("METRICS_TOKEN") or None,
+            internal_token=os.getenv("INTERNAL_TOKEN") or None,
+        )
+
+
+_settings: Settings | None = None
+_settings_lock = threading.Lock()
+
+
+def get_settings() -> Settings:
+    global _settings
+    if _settings is None:
+        with _settings_lock:
+            if _settings is None:
+                load_dotenv()
+                _settings = Settings.from_env()
+    return _settings
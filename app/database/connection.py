@@ -1,57 +1,190 @@
 from __future__ import annotations
 
-import os
-from typing import Generator
+import threading
+import time
+from typing import TYPE_CHECKING, Any, AsyncGenerator, Dict, Generator
 from urllib.parse import quote_plus
 
-from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
 from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 
-load_dotenv()
+from app.config import get_settings
+from app.utils.query_stats import instrument_engine
 
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 
-def _build_database_url() -> str:
-    db_host = (os.getenv("DB_HOST") or "").strip()
-    db_port = (os.getenv("DB_PORT") or "").strip()
-    db_name = (os.getenv("DB_NAME") or "").strip()
-    db_user = (os.getenv("DB_USER") or "").strip()
-    db_password = os.getenv("DB_PASSWORD") or ""
-    db_sslmode = (os.getenv("DB_SSLMODE") or "disable").strip()
 
+def _db_params() -> dict[str, str]:
+    s = get_settings()
     missing = [k for k, v in {
-        "DB_HOST": db_host,
-        "DB_PORT": db_port,
-        "DB_NAME": db_name,
-        "DB_USER": db_user,
-        "DB_PASSWORD": db_password,
+        "DB_HOST": s.db_host,
+        "DB_PORT": s.db_port,
+        "DB_NAME": s.db_name,
+        "DB_USER": s.db_user,
+        "DB_PASSWORD": s.db_password,
     }.items() if not v]
 
     if missing:
         raise RuntimeError(f"Variáveis ausentes no .env: {', '.join(missing)}")
 
-    # Protege caracteres especiais na senha (ex: @)
-    pwd = quote_plus(db_password)
+    return {
+        "host": s.db_host,
+        "port": s.db_port,
+        "name": s.db_name,
+        "user": s.db_user,
+        # Protege caracteres especiais na senha (ex: @)
+        "password": quote_plus(s.db_password),
+        "sslmode": s.db_sslmode,
+    }
+
 
+def _build_database_url() -> str:
+    p = _db_params()
     # psycopg2 (recomendado) — se você estiver usando outro driver, troque aqui.
-    return f"postgresql+psycopg2://{db_user}:{pwd}@{db_host}:{db_port}/{db_name}?sslmode={db_sslmode}"
+    return f"postgresql+psycopg2://{p['user']}:{p['password']}@{p['host']}:{p['port']}/{p['name']}?sslmode={p['sslmode']}"
 
 
-DATABASE_URL = _build_database_url()
+def _build_async_database_url() -> str:
+    p = _db_params()
+    # asyncpg não aceita sslmode na URL; o SSL vai em connect_args (ver get_async_engine)
+    return f"postgresql+asyncpg://{p['user']}:{p['password']}@{p['host']}:{p['port']}/{p['name']}"
 
 
 class Base(DeclarativeBase):
     pass
 
 
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,
-    future=True,
-)
+# =========================
+# POOL DE CONEXÕES
+# =========================
+# Liveness: "pre_ping" testa a conexão a cada checkout (1 round trip a mais);
+# "recycle" só descarta conexões mais velhas que DB_POOL_RECYCLE; "none" não faz nada.
+def _pool_options() -> Dict[str, Any]:
+    s = get_settings()
+    return {
+        "pool_size": s.db_pool_size,
+        "max_overflow": s.db_max_overflow,
+        "pool_timeout": s.db_pool_timeout,
+        "pool_recycle": s.db_pool_recycle,
+        "pool_pre_ping": s.db_pool_liveness == "pre_ping",
+    }
+
+
+class _CheckoutTimer:
+    """Mede o tempo de checkout (espera por conexão + pre-ping) do pool."""
+
+    def _record(self, started: float, timed_out: bool) -> None:
+        elapsed = time.perf_counter() - started
+        with _wait_lock:
+            _wait_stats["checkouts"] += 1
+            _wait_stats["wait_total_s"] += elapsed
+            if elapsed > _wait_stats["wait_max_s"]:
+                _wait_stats["wait_max_s"] = elapsed
+            if timed_out:
+                _wait_stats["timeouts"] += 1
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            conn = super().connect()
+        except exc.TimeoutError:
+            self._record(started, True)
+            raise
+        self._record(started, False)
+        return conn
+
+
+class TimedQueuePool(_CheckoutTimer, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_CheckoutTimer, AsyncAdaptedQueuePool):
+    pass
+
+
+_wait_lock = threading.Lock()
+_wait_stats: Dict[str, Any] = {"checkouts": 0, "wait_total_s": 0.0, "wait_max_s": 0.0, "timeouts": 0}
+
+
+def _pool_snapshot(pool: Pool) -> Dict[str, Any]:
+    if not isinstance(pool, QueuePool):
+        return {"class": type(pool).__name__}
+    return {
+        "class": type(pool).__name__,
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(0, pool.overflow()),
+        "max_overflow": pool._max_overflow,
+        "timeout_s": pool.timeout(),
+    }
+
+
+def pool_stats() -> Dict[str, Any]:
+    with _wait_lock:
+        waits = dict(_wait_stats)
+    checkouts = waits["checkouts"]
+    stats: Dict[str, Any] = {
+        "checkouts": checkouts,
+        "checkout_timeouts": waits["timeouts"],
+        "checkout_wait_avg_ms": round(waits["wait_total_s"] / checkouts * 1000, 3) if checkouts else 0.0,
+        "checkout_wait_max_ms": round(waits["wait_max_s"] * 1000, 3),
+        "checkout_wait_total_s": round(waits["wait_total_s"], 6),
+    }
+    if _engine is not None:
+        stats["sync"] = _pool_snapshot(_engine.pool)
+    if _async_engine is not None:
+        stats["async"] = _pool_snapshot(_async_engine.pool)
+    return stats
+
+
+# =========================
+# ENGINE (criado no primeiro uso)
+# =========================
+# Nada de banco no import: a URL, o engine e o driver (psycopg2) só são
+# montados na primeira sessão, normalmente dentro do lifespan. Importar os
+# módulos (testes, jobs, scripts, workers subindo) fica barato e não exige
+# as variáveis DB_* configuradas.
+_engine: Engine | None = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> Engine:
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                engine = create_engine(
+                    _build_database_url(),
+                    poolclass=TimedQueuePool,
+                    future=True,
+                    **_pool_options(),
+                )
+                # nº de statements e tempo de banco por requisição (Server-Timing)
+                instrument_engine(engine)
+                _engine = engine
+    return _engine
+
+
+def dispose_engine() -> None:
+    global _engine
+    with _engine_lock:
+        if _engine is not None:
+            _engine.dispose()
+            _engine = None
+
+
+class _LazySession(Session):
+    # sem bind explícito, usa o engine padrão (criando-o se preciso)
+    def __init__(self, bind=None, **kw: Any) -> None:
+        super().__init__(bind=bind if bind is not None else get_engine(), **kw)
+
 
 SessionLocal = sessionmaker(
-    bind=engine,
+    class_=_LazySession,
     autoflush=False,
     autocommit=False,
     expire_on_commit=False,
@@ -63,4 +196,47 @@ def get_db() -> Generator[Session, None, None]:
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# =========================
+# MODO ASYNC (asyncpg)
+# =========================
+# Criado só quando usado, para o modo sync não depender do asyncpg.
+_async_engine: "AsyncEngine | None" = None
+_async_session_factory = None
+
+
+def get_async_engine() -> "AsyncEngine":
+    global _async_engine, _async_session_factory
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        sslmode = _db_params()["sslmode"]
+        _async_engine = create_async_engine(
+            _build_async_database_url(),
+            poolclass=TimedAsyncQueuePool,
+            **_pool_options(),
+            connect_args={"ssl": False if sslmode == "disable" else sslmode},
+        )
+        instrument_engine(_async_engine.sync_engine)
+        _async_session_factory = async_sessionmaker(
+            bind=_async_engine,
+            autoflush=False,
+            expire_on_commit=False,
+        )
+    return _async_engine
+
+
+async def get_async_db() -> AsyncGenerator["AsyncSession", None]:
+    get_async_engine()
+    async with _async_session_factory() as db:
+        yield db
+
+
+async def dispose_async_engine() -> None:
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_session_factory = None
@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import itertools
+import logging
+import threading
+import time
+from http.cookies import SimpleCookie
+from typing import Any, Dict, Generator, List, Optional
+
+from fastapi import Request
+from sqlalchemy import create_engine, exc
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database.connection import (
+    SessionLocal,
+    TimedQueuePool,
+    _pool_options,
+    _pool_snapshot,
+    get_db,
+    get_engine,
+)
+from app.utils.query_stats import instrument_engine
+
+logger = logging.getLogger(__name__)
+
+# =========================
+# RÉPLICAS DE LEITURA
+# =========================
+# Com DB_REPLICA_URLS (URLs SQLAlchemy separadas por vírgula), os GETs do
+# catálogo e o /user/me leem de uma réplica (round robin); escritas continuam
+# no primário via get_db. Sem réplicas configuradas, get_read_db == get_db.
+#
+# - Saúde: a réplica é escolhida na primeira query da sessão, já abrindo a
+#   conexão (o pre_ping do pool valida). Se falhar, ela fica fora por
+#   DB_REPLICA_RETRY_SECONDS e a sessão tenta a próxima; sem nenhuma de pé, o
+#   primário. Requisições servidas pelo cache do catálogo não abrem conexão.
+# - Read-your-writes: toda escrita bem-sucedida (POST/PUT/PATCH/DELETE < 400)
+#   devolve o cookie RYW_COOKIE; enquanto ele vale (READ_YOUR_WRITES_SECONDS),
+#   as leituras desse cliente vão ao primário e não veem o atraso da réplica.
+#   Outros clientes podem ver dados atrasados pelo lag da réplica.
+
+RYW_COOKIE = "ryw_ate"
+
+
+class _Replica:
+    def __init__(self, url: str) -> None:
+        self.url = url
+        self.engine: Optional[Engine] = None
+        self.down_until = 0.0
+        self.failures = 0
+
+
+class ReplicaRouter:
+    def __init__(self, urls: List[str], retry_seconds: float) -> None:
+        self.replicas = [_Replica(u) for u in urls]
+        self.retry_seconds = retry_seconds
+        self._lock = threading.Lock()
+        self._rr = itertools.count()
+        self.reads = 0
+        self.fallbacks = 0
+
+    def _engine(self, replica: _Replica) -> Engine:
+        if replica.engine is None:
+            with self._lock:
+                if replica.engine is None:
+                    engine = create_engine(replica.url, poolclass=TimedQueuePool, **_pool_options())
+                    instrument_engine(engine)
+                    replica.engine = engine
+        return replica.engine
+
+    def _candidatas(self) -> List[_Replica]:
+        now = time.monotonic()
+        vivas = [r for r in self.replicas if r.down_until <= now]
+        if not vivas:
+            return []
+        start = next(self._rr) % len(vivas)
+        return vivas[start:] + vivas[:start]
+
+    def connect(self) -> Optional[Connection]:
+        # None: nenhuma réplica respondeu, quem chama usa o primário
+        for replica in self._candidatas():
+            try:
+                conn = self._engine(replica).connect()
+            except (exc.DBAPIError, exc.TimeoutError):
+                # fora do ar ou pool esgotado (DB_POOL_TIMEOUT): segue para a próxima
+                with self._lock:
+                    replica.failures += 1
+                    replica.down_until = time.monotonic() + self.retry_seconds
+                logger.warning(
+                    "Réplica fora por %ss: %s",
+                    self.retry_seconds, replica.engine.url.render_as_string(hide_password=True),
+                )
+                continue
+            with self._lock:
+                self.reads += 1
+            return conn
+        with self._lock:
+            self.fallbacks += 1
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "reads": self.reads,
+                "fallbacks": self.fallbacks,
+                "replicas": [
+                    {
+                        "url": r.engine.url.render_as_string(hide_password=True) if r.engine else None,
+                        "healthy": r.down_until <= now,
+                        "failures": r.failures,
+                        "pool": _pool_snapshot(r.engine.pool) if r.engine else None,
+                    }
+                    for r in self.replicas
+                ],
+            }
+
+    def dispose(self) -> None:
+        for replica in self.replicas:
+            if replica.engine is not None:
+                replica.engine.dispose()
+                replica.engine = None
+
+
+class _ReadSession(Session):
+    # a conexão (réplica ou primário) é aberta só na primeira query
+    def __init__(self, router: ReplicaRouter, **kw: Any) -> None:
+        super().__init__(**kw)
+        self._router = router
+        self._read_bind: Connection | Engine | None = None
+
+    def get_bind(self, mapper=None, clause=None, **kw: Any):
+        if self._read_bind is None:
+            self._read_bind = self._router.connect() or get_engine()
+        return self._read_bind
+
+    def close(self) -> None:
+        super().close()
+        if isinstance(self._read_bind, Connection):
+            self._read_bind.close()
+        self._read_bind = None
+
+
+_router: Optional[ReplicaRouter] = None
+_router_lock = threading.Lock()
+_router_ready = False
+
+
+def get_replica_router() -> Optional[ReplicaRouter]:
+    global _router, _router_ready
+    if not _router_ready:
+        with _router_lock:
+            if not _router_ready:
+                settings = get_settings()
+                if settings.db_replica_urls:
+                    _router = ReplicaRouter(list(settings.db_replica_urls), settings.db_replica_retry_seconds)
+                _router_ready = True
+    return _router
+
+
+def read_session() -> Session:
+    router = get_replica_router()
+    if router is None:
+        return SessionLocal()
+    return _ReadSession(router, autoflush=False, expire_on_commit=False)
+
+
+def _le_do_primario(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(RYW_COOKIE) or 0) > time.time()
+    except ValueError:
+        return False
+
+
+def get_read_db(request: Request) -> Generator[Session, None, None]:
+    if get_replica_router() is None or _le_do_primario(request):
+        yield from get_db()
+        return
+    db = read_session()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def replica_stats() -> Optional[Dict[str, Any]]:
+    router = get_replica_router()
+    return router.stats() if router else None
+
+
+def dispose_replicas() -> None:
+    if _router is not None:
+        _router.dispose()
+
+
+def _ryw_cookie(ate: float, max_age: int) -> bytes:
+    # mesmos Secure/SameSite/Domain dos cookies de auth
+    env = get_settings().cookie_env
+    cookie: SimpleCookie = SimpleCookie()
+    cookie[RYW_COOKIE] = f"{ate:.3f}"
+    morsel = cookie[RYW_COOKIE]
+    morsel["max-age"] = max_age
+    morsel["path"] = "/"
+    morsel["httponly"] = True
+    morsel["samesite"] = env["samesite"]
+    if env["secure"]:
+        morsel["secure"] = True
+    if env["domain"]:
+        morsel["domain"] = env["domain"]
+    return cookie.output(header="").strip().encode("latin-1")
+
+
+class ReadYourWritesMiddleware:
+    # ASGI puro: marca o cliente que acabou de escrever
+    SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+    def __init__(self, app: Any, seconds: float) -> None:
+        self.app = app
+        self.seconds = seconds
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["method"] in self.SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                cookie = _ryw_cookie(time.time() + self.seconds, int(self.seconds) + 1)
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"set-cookie", cookie)]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import logging
+import time
+
+from sqlalchemy import and_, delete, or_, select
+from sqlalchemy.orm import Session
+
+from app.models.user import TokenBlacklist
+
+logger = logging.getLogger(__name__)
+
+# Linhas antigas (sem exp) expiram junto com o refresh token mais longo (30 dias).
+LEGACY_MAX_AGE = dt.timedelta(days=30)
+
+
+def _expired_clause(now: dt.datetime):
+    return or_(
+        TokenBlacklist.exp < now,
+        and_(TokenBlacklist.exp.is_(None), TokenBlacklist.data_insercao < now - LEGACY_MAX_AGE),
+    )
+
+
+def compact_blacklist(
+    db: Session,
+    batch_size: int = 1000,
+    max_batches: int | None = None,
+    pause: float = 0.0,
+) -> int:
+    """
+    Remove do tb_blacklist os JTIs cujo token já expirou.
+    Apaga em lotes pequenos, cada um na sua transação, com SKIP LOCKED:
+    nenhum lock fica preso por muito tempo e dois compactadores não brigam.
+    Retorna o total de linhas removidas.
+    """
+    now = dt.datetime.utcnow()
+    total = 0
+    batches = 0
+
+    while max_batches is None or batches < max_batches:
+        ids = (
+            select(TokenBlacklist.id)
+            .where(_expired_clause(now))
+            .order_by(TokenBlacklist.id.asc())
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        result = db.execute(
+            delete(TokenBlacklist)
+            .where(TokenBlacklist.id.in_(ids))
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+
+        removed = result.rowcount or 0
+        total += removed
+        batches += 1
+        if removed < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+
+    if total:
+        logger.info("Compactação do tb_blacklist: %s linhas removidas", total)
+    return total
+
+
+def main() -> None:
+    from app.database.connection import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Remove tokens expirados do tb_blacklist")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--max-batches", type=int, default=None)
+    parser.add_argument("--pause", type=float, default=0.05, help="pausa (s) entre lotes")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    with SessionLocal() as db:
+        total = compact_blacklist(db, args.batch_size, args.max_batches, args.pause)
+    print(f"{total} linhas removidas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import json
+import logging
+import multiprocessing
+import os
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.user import Pessoa, Usuario
+from app.schemas.user import RegisterIn
+from app.utils.password import hash_password
+
+logger = logging.getLogger(__name__)
+
+# Importação em massa de usuários (lista de membros da paróquia).
+#
+#   python -m app.jobs.import_usuarios membros.csv
+#   python -m app.jobs.import_usuarios membros.ndjson --workers 8 --relatorio erros.ndjson
+#
+# NDJSON: um RegisterIn por linha ({"pessoa": {...}, "usuario": {...}}).
+# CSV: cabeçalho nome,cpf,data_nascimento,adm,email,senha.
+#
+# O arquivo é lido em streaming e processado em lotes: validação, checagem de
+# duplicados (1 SELECT por lote para e-mail e 1 para CPF), hash Argon2 em
+# paralelo num pool de processos e INSERT multi-linha de Pessoa/Usuario numa
+# transação por lote. Duplicados e linhas inválidas vão para o relatório;
+# não interrompem a importação.
+
+
+@dataclass
+class _Linha:
+    numero: int
+    email: str
+    cpf: str
+    dados: RegisterIn
+
+
+@dataclass
+class ImportResult:
+    importados: int = 0
+    rejeitados: int = 0
+
+
+def _cpf_digits(valor: str) -> str:
+    return "".join(ch for ch in (valor or "") if ch.isdigit())
+
+
+def _read_ndjson(fp: TextIO) -> Iterator[Tuple[int, Any]]:
+    for numero, line in enumerate(fp, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield numero, json.loads(line)
+        except json.JSONDecodeError:
+            yield numero, None
+
+
+def _read_csv(fp: TextIO) -> Iterator[Tuple[int, Any]]:
+    for numero, row in enumerate(csv.DictReader(fp), start=2):
+        adm = (row.get("adm") or "").strip().lower() in {"1", "true", "sim", "s"}
+        yield numero, {
+            "pessoa": {
+                "nome": row.get("nome"),
+                "cpf": _cpf_digits(row.get("cpf") or ""),
+                "data_nascimento": row.get("data_nascimento"),
+                "adm": adm,
+            },
+            "usuario": {"email": row.get("email"), "senha": row.get("senha")},
+        }
+
+
+def _batches(it: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    it = iter(it)
+    while batch := list(islice(it, size)):
+        yield batch
+
+
+class _Importer:
+    def __init__(self, db: Session, pool: Executor, relatorio: TextIO) -> None:
+        self.db = db
+        self.pool = pool
+        self.relatorio = relatorio
+        self.result = ImportResult()
+        # duplicados dentro do próprio arquivo, entre lotes
+        self._emails: set[str] = set()
+        self._cpfs: set[str] = set()
+
+    def _rejeitar(self, numero: int, motivo: str) -> None:
+        self.result.rejeitados += 1
+        self.relatorio.write(json.dumps({"linha": numero, "motivo": motivo}, ensure_ascii=False) + "\n")
+
+    def _validar(self, batch: List[Tuple[int, Any]]) -> List[_Linha]:
+        linhas = []
+        for numero, raw in batch:
+            if raw is None:
+                self._rejeitar(numero, "JSON inválido")
+                continue
+            try:
+                dados = RegisterIn.model_validate(raw)
+            except ValidationError as e:
+                self._rejeitar(numero, "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()))
+                continue
+            linhas.append(_Linha(numero, dados.usuario.email.strip().lower(), _cpf_digits(dados.pessoa.cpf or ""), dados))
+        return linhas
+
+    def _sem_duplicados(self, linhas: List[_Linha]) -> List[_Linha]:
+        emails = {l.email for l in linhas}
+        cpfs = {l.cpf for l in linhas if l.cpf}
+        emails_db = set(self.db.execute(select(Usuario.email).where(Usuario.email.in_(emails))).scalars()) if emails else set()
+        cpfs_db = set(self.db.execute(select(Pessoa.cpf).where(Pessoa.cpf.in_(cpfs))).scalars()) if cpfs else set()
+
+        ok = []
+        for l in linhas:
+            if l.email in emails_db or l.email in self._emails:
+                self._rejeitar(l.numero, "E-mail já cadastrado")
+                continue
+            if l.cpf and (l.cpf in cpfs_db or l.cpf in self._cpfs):
+                self._rejeitar(l.numero, "CPF já cadastrado")
+                continue
+            self._emails.add(l.email)
+            if l.cpf:
+                self._cpfs.add(l.cpf)
+            ok.append(l)
+        return ok
+
+    def _inserir(self, linhas: List[_Linha], hashes: List[str]) -> None:
+        pessoas = [
+            {
+                "nome": l.dados.pessoa.nome.strip(),
+                "cpf": l.cpf or None,
+                "data_nascimento": l.dados.pessoa.data_nascimento,
+                "adm": l.dados.pessoa.adm,
+            }
+            for l in linhas
+        ]
+        ids = self.db.execute(
+            insert(Pessoa).returning(Pessoa.id, sort_by_parameter_order=True), pessoas
+        ).scalars().all()
+        self.db.execute(
+            insert(Usuario),
+            [{"id_pessoa": pid, "email": l.email, "senha_hash": h} for pid, l, h in zip(ids, linhas, hashes)],
+        )
+
+    def _inserir_um_a_um(self, linhas: List[_Linha], hashes: List[str]) -> int:
+        # fallback quando o lote colide com um cadastro concorrente
+        inseridos = 0
+        for l, h in zip(linhas, hashes):
+            try:
+                with self.db.begin_nested():
+                    self._inserir([l], [h])
+                inseridos += 1
+            except IntegrityError:
+                self._rejeitar(l.numero, "E-mail ou CPF já cadastrado")
+        self.db.commit()
+        return inseridos
+
+    def processar(self, batch: List[Tuple[int, Any]]) -> None:
+        linhas = self._sem_duplicados(self._validar(batch))
+        if not linhas:
+            return
+
+        hashes = list(self.pool.map(hash_password, [l.dados.usuario.senha for l in linhas], chunksize=8))
+
+        try:
+            self._inserir(linhas, hashes)
+            self.db.commit()
+            self.result.importados += len(linhas)
+        except IntegrityError:
+            self.db.rollback()
+            self.result.importados += self._inserir_um_a_um(linhas, hashes)
+
+
+def import_usuarios(
+    db: Session,
+    registros: Iterable[Tuple[int, Any]],
+    workers: Optional[int] = None,
+    batch_size: int = 500,
+    relatorio: TextIO = sys.stderr,
+) -> ImportResult:
+    # forkserver/spawn: os filhos não herdam o engine nem as conexões do pool
+    ctx = multiprocessing.get_context("forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), mp_context=ctx) as pool:
+        importer = _Importer(db, pool, relatorio)
+        for batch in _batches(registros, batch_size):
+            importer.processar(batch)
+            logger.info(
+                "Importação: %s importados, %s rejeitados",
+                importer.result.importados,
+                importer.result.rejeitados,
+            )
+    return importer.result
+
+
+def main() -> None:
+    from app.database.connection import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Importa usuários em massa a partir de CSV ou NDJSON")
+    parser.add_argument("arquivo", help="caminho do arquivo, ou - para stdin")
+    parser.add_argument("--formato", choices=["csv", "ndjson"], default=None)
+    parser.add_argument("--workers", type=int, default=None, help="processos para o hash (padrão: nº de CPUs)")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--relatorio", default=None, help="arquivo NDJSON com as linhas rejeitadas (padrão: stderr)")
+    args = parser.parse_args()
+
+    formato = args.formato or ("csv" if args.arquivo.lower().endswith(".csv") else "ndjson")
+    fp = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8") if args.arquivo == "-" else open(args.arquivo, encoding="utf-8", newline="")
+    relatorio = open(args.relatorio, "w", encoding="utf-8") if args.relatorio else sys.stderr
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        registros = _read_csv(fp) if formato == "csv" else _read_ndjson(fp)
+        with SessionLocal() as db:
+            result = import_usuarios(db, registros, args.workers, args.batch_size, relatorio)
+    finally:
+        fp.close()
+        if relatorio is not sys.stderr:
+            relatorio.close()
+
+    print(f"{result.importados} importados, {result.rejeitados} rejeitados")
+
+
+if __name__ == "__main__":
+    main()
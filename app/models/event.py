@@ -5,14 +5,17 @@ from typing import Optional, List
 
 from sqlalchemy import (
     BigInteger,
+    CheckConstraint,
     Date,
     Time,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     Numeric,
     String,
     Text,
+    UniqueConstraint,
     func,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -22,6 +25,12 @@ from app.database.connection import Base
 
 class Evento(Base):
     __tablename__ = "tb_eventos"
+    __table_args__ = (
+        # listagem paginada por (dt_ini desc, id desc)
+        Index("ix_tb_eventos_dt_ini_id", "dt_ini", "id"),
+        # a coluna gerada "busca" e os índices da busca ficam na
+        # migrations/006_busca_eventos.sql (dependem de unaccent/pg_trgm)
+    )
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
 
@@ -51,6 +60,15 @@ class Evento(Base):
 
 class Lote(Base):
     __tablename__ = "tb_lote"
+    __table_args__ = (
+        # última barreira contra overbooking, inclusive ao reduzir total_vagas
+        CheckConstraint(
+            "vagas_reservadas >= 0 AND vagas_reservadas <= total_vagas",
+            name="ck_tb_lote_vagas_reservadas",
+        ),
+        # um num_lote por evento; também serve às buscas por id_evento
+        UniqueConstraint("id_evento", "num_lote", name="uq_tb_lote_evento_num_lote"),
+    )
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
 
@@ -58,12 +76,13 @@ class Lote(Base):
         BigInteger,
         ForeignKey("tb_eventos.id", onupdate="CASCADE", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
 
     preco: Mapped[float] = mapped_column(Numeric(10, 2), nullable=False)
     num_lote: Mapped[int] = mapped_column(Integer, nullable=False)
     total_vagas: Mapped[int] = mapped_column(Integer, nullable=False)
+    # vagas seguras por reservas pendentes + confirmadas (ver app.routes.reserva)
+    vagas_reservadas: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
 
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -86,8 +105,35 @@ class Produto(Base):
     preco: Mapped[float] = mapped_column(Numeric(10, 2), nullable=False)
     descricao: Mapped[str] = mapped_column(String(255), nullable=False)
     img: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # S3 URL ou key
+    # miniatura gerada no upload (POST /event/produtos/{id}/imagem)
+    img_thumb: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
 
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
-    evento: Mapped["Evento"] = relationship("Evento", back_populates="produtos")
\ No newline at end of file
+    evento: Mapped["Evento"] = relationship("Evento", back_populates="produtos")
+
+
+class ReservaVaga(Base):
+    __tablename__ = "tb_reserva_vaga"
+    __table_args__ = (
+        # liberação em massa das reservas pendentes vencidas
+        Index("ix_tb_reserva_vaga_status_expira_em", "status", "expira_em"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+
+    id_lote: Mapped[int] = mapped_column(
+        BigInteger,
+        ForeignKey("tb_lote.id", onupdate="CASCADE", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+
+    codigo: Mapped[str] = mapped_column(String(36), unique=True, nullable=False)
+    quantidade: Mapped[int] = mapped_column(Integer, nullable=False)
+    status: Mapped[str] = mapped_column(String(16), nullable=False, server_default="pendente")  # pendente | confirmada
+    expira_em: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
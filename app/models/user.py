@@ -9,8 +9,10 @@ from sqlalchemy import (
     Date,
     DateTime,
     ForeignKey,
+    Integer,
     String,
     Text,
+    UniqueConstraint,
     func,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -20,11 +22,15 @@ from app.database.connection import Base
 
 class Pessoa(Base):
     __tablename__ = "tb_pessoa"
+    __table_args__ = (
+        # nomes fixos: as rotas traduzem a violação em 409 (app.utils.db_errors)
+        UniqueConstraint("cpf", name="uq_tb_pessoa_cpf"),
+    )
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
     nome: Mapped[str] = mapped_column(String(160), nullable=False)
     data_nascimento: Mapped[date] = mapped_column(Date, nullable=False)
-    cpf: Mapped[Optional[str]] = mapped_column(String(11), unique=True, nullable=True)
+    cpf: Mapped[Optional[str]] = mapped_column(String(11), nullable=True)
     adm: Mapped[bool] = mapped_column(Boolean, nullable=False, server_default="false")
 
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -40,18 +46,23 @@ class Pessoa(Base):
 
 class Usuario(Base):
     __tablename__ = "tb_usuario"
+    __table_args__ = (
+        UniqueConstraint("email", name="uq_tb_usuario_email"),
+    )
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
     id_pessoa: Mapped[int] = mapped_column(BigInteger, ForeignKey("tb_pessoa.id", onupdate="CASCADE", ondelete="RESTRICT"), nullable=False, unique=True)
 
-    email: Mapped[str] = mapped_column(String(255), unique=True, nullable=False, index=True)
+    email: Mapped[str] = mapped_column(String(255), nullable=False)
     senha_hash: Mapped[str] = mapped_column(Text, nullable=False)
 
     is_active: Mapped[bool] = mapped_column(Boolean, nullable=False, server_default="true")
     last_login_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    # incrementada por trigger a cada alteração de perfil (migrations/009, app.utils.user_version)
+    versao: Mapped[int] = mapped_column(Integer, nullable=False, server_default="1")
 
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
-    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
 
     pessoa: Mapped["Pessoa"] = relationship("Pessoa", back_populates="usuario")
 
@@ -61,4 +72,7 @@ class TokenBlacklist(Base):
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
     jti: Mapped[str] = mapped_column(String(64), unique=True, nullable=False, index=True)
-    data_insercao: Mapped[datetime] = mapped_column(DateTime(timezone=False), server_default=func.now(), nullable=False)
\ No newline at end of file
+    # corte da sincronização do cache de revogação (app.utils.revocation)
+    data_insercao: Mapped[datetime] = mapped_column(DateTime(timezone=False), server_default=func.now(), nullable=False, index=True)
+    # expiração do token revogado (UTC); depois dela a linha pode ser compactada
+    exp: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=False), nullable=True, index=True)
\ No newline at end of file
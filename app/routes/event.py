@@ -1,19 +1,186 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+import csv
+import io
+from datetime import date
+from typing import Iterator, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import BigInteger, Boolean, Integer, Numeric, String, Text, and_, case, cast, column, exists, func, literal_column, or_, select, update, values
+from sqlalchemy.dialects.postgresql import JSON, TSVECTOR, aggregate_order_by, insert
+from sqlalchemy.orm import Session, aliased
+from starlette.concurrency import run_in_threadpool
 
 from app.database.connection import get_db
+from app.database.replicas import get_read_db, read_session
 from app.models.event import Evento, Lote, Produto
 from app.schemas.event import (
     EventoCreate, EventoUpdate, EventoOut,
     LoteCreate, LoteUpdate, LoteOut,
     ProdutoCreate, ProdutoUpdate, ProdutoOut, EventoInfoOut,
+    LoteBulkCreate, LoteBulkOut, ProdutoBulkCreate, ProdutoBulkOut,
+    LoteBulkUpdate, LoteBulkUpdateOut, ProdutoBulkUpdate, ProdutoBulkUpdateOut,
 )
+from app.utils.catalog_cache import bump_catalog, cached_response
+from app.utils.db_errors import conflitos_http
+from app.utils.pagination import NEXT_CURSOR_HEADER, apply_keyset, page_limit, split_page
+from app.utils.serialization import RowSerializer, dumps
+from app.utils.storage import Storage, get_storage
+from app.utils.uploads import IMAGE_TYPES, Upload, receber_arquivo, thumb_size, thumbnail_async, upload_max_bytes
 
 router = APIRouter()
 
+# chaves do keyset (mesma ordem do ORDER BY, todas DESC)
+EVENTO_KEYSET = ((Evento.dt_ini, Evento.id), (date.fromisoformat, int), lambda e: (e.dt_ini, e.id))
+LOTE_KEYSET = ((Lote.id,), (int,), lambda l: (l.id,))
+PRODUTO_KEYSET = ((Produto.id,), (int,), lambda p: (p.id,))
+
+
+def _paginate(stmt, keyset, cursor: str | None, limit: int):
+    keys, parsers, _ = keyset
+    return apply_keyset(stmt, keys, parsers, cursor, limit)
+
+
+# leituras selecionam só as colunas dos schemas de saída (app.utils.serialization)
+EVENTO_ROW = RowSerializer(EventoOut, Evento)
+LOTE_ROW = RowSerializer(LoteOut, Lote)
+PRODUTO_ROW = RowSerializer(ProdutoOut, Produto)
+
+
+# escritas sem SELECT prévio: a constraint violada vira a resposta de sempre
+EVENTO_FK = {
+    "tb_lote_id_evento_fkey": (404, "Evento não encontrado"),
+    "tb_produtos_id_evento_fkey": (404, "Evento não encontrado"),
+}
+LOTE_CONFLITOS = {
+    **EVENTO_FK,
+    "uq_tb_lote_evento_num_lote": (409, "num_lote já existe para este evento"),
+    "ck_tb_lote_vagas_reservadas": (409, "total_vagas menor que as vagas já reservadas"),
+}
+
+
+def page_body(serializer: RowSerializer, rows, limit: int, keyset) -> tuple[bytes, dict[str, str]]:
+    rows, next_cursor = split_page(rows, limit, keyset[2])
+    return serializer.dumps(rows), ({NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {})
+
+
+def lote_update_stmt(lote_id: int, payload: LoteUpdate):
+    # UPDATE ... RETURNING num único statement; sem campos, só lê o lote
+    data = payload.model_dump(exclude_unset=True)
+    if not data:
+        return select(*LOTE_ROW.columns).where(Lote.id == lote_id)
+    return update(Lote).where(Lote.id == lote_id).values(**data).returning(*LOTE_ROW.columns)
+
+
+# =========================
+# ATUALIZAÇÃO EM LOTE
+# =========================
+# Um único UPDATE ... FROM (VALUES ...) RETURNING por requisição. Campo null
+# no VALUES mantém o valor atual (coalesce); os casts tipam colunas que vêm
+# inteiras null. Itens que dariam conflito ficam de fora pelo próprio WHERE
+# (em vez de derrubar o lote todo) e voltam em "conflitos".
+def _repetidos(chaves) -> tuple[list[dict], set[int]]:
+    # itens com chave já vista antes na requisição (None não conta)
+    conflitos, vistos, fora = [], set(), set()
+    for i, (chave, detail) in enumerate(chaves):
+        if chave is None:
+            continue
+        if chave in vistos:
+            conflitos.append({"indice": i, "detail": detail})
+            fora.add(i)
+        vistos.add(chave)
+    return conflitos, fora
+
+
+def lote_bulk_update_stmt(id_evento: int, itens):
+    v = values(
+        column("id", BigInteger), column("preco", Numeric(10, 2)),
+        column("num_lote", Integer), column("total_vagas", Integer),
+        name="v",
+    ).data([(i.id, i.preco, i.num_lote, i.total_vagas) for i in itens])
+    num_lote = func.coalesce(cast(v.c.num_lote, Integer), Lote.num_lote)
+    total_vagas = func.coalesce(cast(v.c.total_vagas, Integer), Lote.total_vagas)
+    outro = aliased(Lote)
+    # conservador: um num_lote ainda ocupado por outro lote (mesmo que ele
+    # também mude nesta requisição) é conflito; a unique não é deferrable
+    em_uso = exists().where(outro.id_evento == Lote.id_evento, outro.num_lote == num_lote, outro.id != Lote.id)
+    return (
+        update(Lote)
+        .where(Lote.id == v.c.id, Lote.id_evento == id_evento, total_vagas >= Lote.vagas_reservadas, ~em_uso)
+        .values(
+            preco=func.coalesce(cast(v.c.preco, Numeric(10, 2)), Lote.preco),
+            num_lote=num_lote,
+            total_vagas=total_vagas,
+        )
+        .returning(*LOTE_ROW.columns)
+    )
+
+
+def produto_bulk_update_stmt(id_evento: int, itens):
+    v = values(
+        column("id", BigInteger), column("preco", Numeric(10, 2)), column("descricao", String),
+        column("img", Text), column("img_set", Boolean),
+        name="v",
+    ).data([(i.id, i.preco, i.descricao, i.img, "img" in i.model_fields_set) for i in itens])
+    img = cast(v.c.img, Text)
+    return (
+        update(Produto)
+        .where(Produto.id == v.c.id, Produto.id_evento == id_evento)
+        .values(
+            preco=func.coalesce(cast(v.c.preco, Numeric(10, 2)), Produto.preco),
+            descricao=func.coalesce(cast(v.c.descricao, String), Produto.descricao),
+            img=case((v.c.img_set, img), else_=Produto.img),
+            # img trocada: a miniatura antiga não vale mais (como no PUT unitário)
+            img_thumb=case((and_(v.c.img_set, img.is_distinct_from(Produto.img)), None), else_=Produto.img_thumb),
+        )
+        .returning(*PRODUTO_ROW.columns)
+    )
+
+
+# =========================
+# BUSCA DE EVENTOS
+# =========================
+# Full-text em português sem acento (coluna gerada tb_eventos.busca, config
+# pt_unaccent, índice GIN) mais trigramas sobre nome + local, que pegam
+# palavras digitadas pela metade ou com erro. Ranking: ts_rank_cd (nome pesa
+# mais que local) + word_similarity. Coluna, função e índices vêm da
+# migrations/006_busca_eventos.sql (dependem de unaccent e pg_trgm), por
+# isso não estão no model.
+#
+# As expressões vão como SQL literal, idênticas às dos índices: com bind
+# parameters (asyncpg, plano genérico) o planner não casaria a expressão.
+BUSCA_CONFIG = "pt_unaccent"
+_BUSCA_DOC = literal_column("tb_eventos.busca", TSVECTOR)
+_BUSCA_TRGM = literal_column("f_unaccent(lower(tb_eventos.nome_evento || ' ' || tb_eventos.local))", Text)
+
+
+def evento_search_stmt(q: str, de: date | None, ate: date | None, limit: int):
+    if de and ate and ate < de:
+        raise HTTPException(status_code=400, detail="ate não pode ser menor que de")
+
+    q = q.strip()
+    tsq = func.websearch_to_tsquery(literal_column(f"'{BUSCA_CONFIG}'"), q)
+    termo = func.f_unaccent(func.lower(q))
+    rank = func.ts_rank_cd(_BUSCA_DOC, tsq) + func.word_similarity(termo, _BUSCA_TRGM)
+
+    stmt = select(*EVENTO_ROW.columns).where(or_(_BUSCA_DOC.op("@@")(tsq), termo.op("<%")(_BUSCA_TRGM)))
+    # eventos que tocam o intervalo [de, ate]
+    if de:
+        stmt = stmt.where(Evento.dt_fim >= de)
+    if ate:
+        stmt = stmt.where(Evento.dt_ini <= ate)
+    return stmt.order_by(rank.desc(), Evento.dt_ini.desc(), Evento.id.desc()).limit(limit)
+
+
+def evento_info_body(row) -> bytes:
+    *evento, lotes, produtos = row
+    return dumps({
+        "evento": EVENTO_ROW.as_dict(evento),
+        "lotes": lotes,
+        "produtos": produtos,
+    })
+
 
 # =========================
 # EVENTOS
@@ -27,20 +194,51 @@ def criar_evento(payload: EventoCreate, db: Session = Depends(get_db)):
     db.add(obj)
     db.commit()
     db.refresh(obj)
+    bump_catalog(obj.id)
     return obj
 
 
 @router.get("/eventos", response_model=list[EventoOut])
-def listar_eventos(db: Session = Depends(get_db)):
-    return db.execute(select(Evento).order_by(Evento.dt_ini.desc(), Evento.id.desc())).scalars().all()
+def listar_eventos(
+    request: Request,
+    cursor: str | None = Query(default=None),
+    limit: int = Depends(page_limit),
+    db: Session = Depends(get_read_db),
+):
+    def build():
+        stmt = select(*EVENTO_ROW.columns).order_by(Evento.dt_ini.desc(), Evento.id.desc())
+        stmt = _paginate(stmt, EVENTO_KEYSET, cursor, limit)
+        return page_body(EVENTO_ROW, db.execute(stmt).all(), limit, EVENTO_KEYSET)
+
+    return cached_response(request, ("eventos", cursor, limit), None, build)
+
+
+# antes de /eventos/{evento_id}, senão "search" vira um evento_id
+@router.get("/eventos/search", response_model=list[EventoOut])
+def buscar_eventos(
+    request: Request,
+    q: str = Query(..., min_length=2, max_length=100),
+    de: date | None = Query(default=None),
+    ate: date | None = Query(default=None),
+    limit: int = Depends(page_limit),
+    db: Session = Depends(get_read_db),
+):
+    def build():
+        rows = db.execute(evento_search_stmt(q, de, ate, limit)).all()
+        return EVENTO_ROW.dumps(rows), {}
+
+    return cached_response(request, ("busca", q.strip().lower(), de, ate, limit), None, build)
 
 
 @router.get("/eventos/{evento_id}", response_model=EventoOut)
-def obter_evento(evento_id: int, db: Session = Depends(get_db)):
-    obj = db.execute(select(Evento).where(Evento.id == evento_id)).scalar_one_or_none()
-    if not obj:
-        raise HTTPException(status_code=404, detail="Evento não encontrado")
-    return obj
+def obter_evento(evento_id: int, request: Request, db: Session = Depends(get_read_db)):
+    def build():
+        row = db.execute(select(*EVENTO_ROW.columns).where(Evento.id == evento_id)).one_or_none()
+        if not row:
+            raise HTTPException(status_code=404, detail="Evento não encontrado")
+        return EVENTO_ROW.dumps_one(row), {}
+
+    return cached_response(request, ("evento", evento_id), evento_id, build)
 
 
 @router.put("/eventos/{evento_id}", response_model=EventoOut)
@@ -61,6 +259,7 @@ def atualizar_evento(evento_id: int, payload: EventoUpdate, db: Session = Depend
 
     db.commit()
     db.refresh(obj)
+    bump_catalog(evento_id)
     return obj
 
 
@@ -72,6 +271,7 @@ def deletar_evento(evento_id: int, db: Session = Depends(get_db)):
 
     db.delete(obj)
     db.commit()
+    bump_catalog(evento_id)
     return None
 
 
@@ -80,57 +280,119 @@ def deletar_evento(evento_id: int, db: Session = Depends(get_db)):
 # =========================
 @router.post("/lotes", response_model=LoteOut, status_code=status.HTTP_201_CREATED)
 def criar_lote(payload: LoteCreate, db: Session = Depends(get_db)):
-    evento = db.execute(select(Evento.id).where(Evento.id == payload.id_evento)).scalar_one_or_none()
-    if not evento:
-        raise HTTPException(status_code=404, detail="Evento não encontrado")
-
-    # garante (id_evento, num_lote) único
-    existe = db.execute(
-        select(Lote.id).where(Lote.id_evento == payload.id_evento, Lote.num_lote == payload.num_lote)
-    ).scalar_one_or_none()
-    if existe:
-        raise HTTPException(status_code=409, detail="num_lote já existe para este evento")
-
-    obj = Lote(**payload.model_dump())
-    db.add(obj)
-    db.commit()
-    db.refresh(obj)
-    return obj
+    # evento inexistente (FK) e num_lote repetido (unique) saem do próprio INSERT
+    with conflitos_http(LOTE_CONFLITOS):
+        row = db.execute(insert(Lote).values(**payload.model_dump()).returning(*LOTE_ROW.columns)).one()
+        db.commit()
+    bump_catalog(payload.id_evento)
+    return LOTE_ROW.as_dict(row)
 
 
 @router.get("/lotes", response_model=list[LoteOut])
 def listar_lotes(
+    request: Request,
     id_evento: int | None = Query(default=None),
-    db: Session = Depends(get_db),
+    cursor: str | None = Query(default=None),
+    limit: int = Depends(page_limit),
+    db: Session = Depends(get_read_db),
 ):
-    stmt = select(Lote).order_by(Lote.id.desc())
-    if id_evento is not None:
-        stmt = stmt.where(Lote.id_evento == id_evento)
-    return db.execute(stmt).scalars().all()
+    def build():
+        stmt = select(*LOTE_ROW.columns).order_by(Lote.id.desc())
+        if id_evento is not None:
+            stmt = stmt.where(Lote.id_evento == id_evento)
+        stmt = _paginate(stmt, LOTE_KEYSET, cursor, limit)
+        return page_body(LOTE_ROW, db.execute(stmt).all(), limit, LOTE_KEYSET)
+
+    return cached_response(request, ("lotes", id_evento, cursor, limit), id_evento, build)
+
+
+@router.post("/lotes/bulk", response_model=LoteBulkOut, status_code=status.HTTP_201_CREATED)
+def criar_lotes_bulk(payload: LoteBulkCreate, db: Session = Depends(get_db)):
+    conflitos = []
+    novos = []
+    indices: dict[int, int] = {}
+    for i, item in enumerate(payload.itens):
+        if item.num_lote in indices:
+            conflitos.append({"indice": i, "detail": "num_lote repetido na requisição"})
+            continue
+        indices[item.num_lote] = i
+        novos.append({"id_evento": payload.id_evento, **item.model_dump()})
+
+    # um único INSERT ... ON CONFLICT (id_evento, num_lote) DO NOTHING RETURNING:
+    # o que não voltou já existia no evento
+    stmt = insert(Lote).values(novos).on_conflict_do_nothing(
+        index_elements=[Lote.id_evento, Lote.num_lote],
+    ).returning(*LOTE_ROW.columns)
+    with conflitos_http(EVENTO_FK):
+        criados = db.execute(stmt).all()
+        db.commit()
+
+    inseridos = {r.num_lote for r in criados}
+    conflitos.extend(
+        {"indice": i, "detail": "num_lote já existe para este evento"}
+        for num, i in indices.items() if num not in inseridos
+    )
+    conflitos.sort(key=lambda c: c["indice"])
+    if criados:
+        bump_catalog(payload.id_evento)
+
+    return {"criados": [LOTE_ROW.as_dict(r) for r in criados], "conflitos": conflitos}
+
+
+# antes de /lotes/{lote_id}, senão "bulk" vira um lote_id
+@router.put("/lotes/bulk", response_model=LoteBulkUpdateOut)
+def atualizar_lotes_bulk(payload: LoteBulkUpdate, db: Session = Depends(get_db)):
+    itens = payload.itens
+    conflitos, fora = _repetidos((i.id, "id repetido na requisição") for i in itens)
+    repetidos_num, fora_num = _repetidos(
+        (None if n in fora else i.num_lote, "num_lote repetido na requisição") for n, i in enumerate(itens)
+    )
+    conflitos += repetidos_num
+    fora |= fora_num
+    validos = {i.id: (n, i) for n, i in enumerate(itens) if n not in fora}
+
+    atualizados = []
+    if validos:
+        # corrida com outra escrita no mesmo num_lote ainda cai na constraint (409)
+        with conflitos_http(LOTE_CONFLITOS):
+            atualizados = db.execute(lote_bulk_update_stmt(payload.id_evento, [i for _, i in validos.values()])).all()
+            faltando = set(validos) - {r.id for r in atualizados}
+            # por que ficou de fora: 1 SELECT só para os que não voltaram
+            atuais = {
+                r.id: r
+                for r in db.execute(
+                    select(Lote.id, Lote.id_evento, Lote.vagas_reservadas).where(Lote.id.in_(faltando))
+                )
+            } if faltando else {}
+            db.commit()
+
+        for lote_id in faltando:
+            n, item = validos[lote_id]
+            atual = atuais.get(lote_id)
+            if atual is None or atual.id_evento != payload.id_evento:
+                detail = "Lote não encontrado neste evento"
+            elif item.total_vagas is not None and item.total_vagas < atual.vagas_reservadas:
+                detail = "total_vagas menor que as vagas já reservadas"
+            else:
+                detail = "num_lote já existe para este evento"
+            conflitos.append({"indice": n, "detail": detail})
+
+    conflitos.sort(key=lambda c: c["indice"])
+    if atualizados:
+        bump_catalog(payload.id_evento)
+    return {"atualizados": [LOTE_ROW.as_dict(r) for r in atualizados], "conflitos": conflitos}
 
 
 @router.put("/lotes/{lote_id}", response_model=LoteOut)
 def atualizar_lote(lote_id: int, payload: LoteUpdate, db: Session = Depends(get_db)):
-    obj = db.execute(select(Lote).where(Lote.id == lote_id)).scalar_one_or_none()
-    if not obj:
+    # num_lote repetido e total_vagas abaixo das reservas caem nas constraints
+    with conflitos_http(LOTE_CONFLITOS):
+        row = db.execute(lote_update_stmt(lote_id, payload)).first()
+        db.commit()
+    if row is None:
         raise HTTPException(status_code=404, detail="Lote não encontrado")
-
-    data = payload.model_dump(exclude_unset=True)
-
-    # se mudar num_lote, checa unicidade por evento
-    if "num_lote" in data and data["num_lote"] != obj.num_lote:
-        existe = db.execute(
-            select(Lote.id).where(Lote.id_evento == obj.id_evento, Lote.num_lote == data["num_lote"])
-        ).scalar_one_or_none()
-        if existe:
-            raise HTTPException(status_code=409, detail="num_lote já existe para este evento")
-
-    for k, v in data.items():
-        setattr(obj, k, v)
-
-    db.commit()
-    db.refresh(obj)
-    return obj
+    bump_catalog(row.id_evento)
+    return LOTE_ROW.as_dict(row)
 
 
 @router.delete("/lotes/{lote_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -141,6 +403,7 @@ def deletar_lote(lote_id: int, db: Session = Depends(get_db)):
 
     db.delete(obj)
     db.commit()
+    bump_catalog(obj.id_evento)
     return None
 
 
@@ -149,26 +412,63 @@ def deletar_lote(lote_id: int, db: Session = Depends(get_db)):
 # =========================
 @router.post("/produtos", response_model=ProdutoOut, status_code=status.HTTP_201_CREATED)
 def criar_produto(payload: ProdutoCreate, db: Session = Depends(get_db)):
-    evento = db.execute(select(Evento.id).where(Evento.id == payload.id_evento)).scalar_one_or_none()
-    if not evento:
-        raise HTTPException(status_code=404, detail="Evento não encontrado")
-
-    obj = Produto(**payload.model_dump())
-    db.add(obj)
-    db.commit()
-    db.refresh(obj)
-    return obj
+    with conflitos_http(EVENTO_FK):
+        row = db.execute(insert(Produto).values(**payload.model_dump()).returning(*PRODUTO_ROW.columns)).one()
+        db.commit()
+    bump_catalog(payload.id_evento)
+    return PRODUTO_ROW.as_dict(row)
 
 
 @router.get("/produtos", response_model=list[ProdutoOut])
 def listar_produtos(
+    request: Request,
     id_evento: int | None = Query(default=None),
-    db: Session = Depends(get_db),
+    cursor: str | None = Query(default=None),
+    limit: int = Depends(page_limit),
+    db: Session = Depends(get_read_db),
 ):
-    stmt = select(Produto).order_by(Produto.id.desc())
-    if id_evento is not None:
-        stmt = stmt.where(Produto.id_evento == id_evento)
-    return db.execute(stmt).scalars().all()
+    def build():
+        stmt = select(*PRODUTO_ROW.columns).order_by(Produto.id.desc())
+        if id_evento is not None:
+            stmt = stmt.where(Produto.id_evento == id_evento)
+        stmt = _paginate(stmt, PRODUTO_KEYSET, cursor, limit)
+        return page_body(PRODUTO_ROW, db.execute(stmt).all(), limit, PRODUTO_KEYSET)
+
+    return cached_response(request, ("produtos", id_evento, cursor, limit), id_evento, build)
+
+
+@router.post("/produtos/bulk", response_model=ProdutoBulkOut, status_code=status.HTTP_201_CREATED)
+def criar_produtos_bulk(payload: ProdutoBulkCreate, db: Session = Depends(get_db)):
+    novos = [{"id_evento": payload.id_evento, **item.model_dump()} for item in payload.itens]
+    with conflitos_http(EVENTO_FK):
+        criados = db.execute(insert(Produto).values(novos).returning(*PRODUTO_ROW.columns)).all()
+        db.commit()
+    bump_catalog(payload.id_evento)
+
+    return {"criados": [PRODUTO_ROW.as_dict(r) for r in criados]}
+
+
+# antes de /produtos/{produto_id}, senão "bulk" vira um produto_id
+@router.put("/produtos/bulk", response_model=ProdutoBulkUpdateOut)
+def atualizar_produtos_bulk(payload: ProdutoBulkUpdate, db: Session = Depends(get_db)):
+    itens = payload.itens
+    conflitos, fora = _repetidos((i.id, "id repetido na requisição") for i in itens)
+    validos = {i.id: n for n, i in enumerate(itens) if n not in fora}
+
+    atualizados = []
+    if validos:
+        atualizados = db.execute(produto_bulk_update_stmt(payload.id_evento, [itens[n] for n in validos.values()])).all()
+        db.commit()
+
+    voltaram = {r.id for r in atualizados}
+    conflitos.extend(
+        {"indice": n, "detail": "Produto não encontrado neste evento"}
+        for produto_id, n in validos.items() if produto_id not in voltaram
+    )
+    conflitos.sort(key=lambda c: c["indice"])
+    if atualizados:
+        bump_catalog(payload.id_evento)
+    return {"atualizados": [PRODUTO_ROW.as_dict(r) for r in atualizados], "conflitos": conflitos}
 
 
 @router.put("/produtos/{produto_id}", response_model=ProdutoOut)
@@ -178,14 +478,78 @@ def atualizar_produto(produto_id: int, payload: ProdutoUpdate, db: Session = Dep
         raise HTTPException(status_code=404, detail="Produto não encontrado")
 
     data = payload.model_dump(exclude_unset=True)
+    # img trocada à mão: a miniatura antiga não vale mais
+    if "img" in data and data["img"] != obj.img:
+        obj.img_thumb = None
     for k, v in data.items():
         setattr(obj, k, v)
 
     db.commit()
     db.refresh(obj)
+    bump_catalog(obj.id_evento)
     return obj
 
 
+async def _guardar_imagem(storage: Storage, upload: Upload) -> tuple[str, str]:
+    base = f"produtos/{upload.sha256[:2]}/{upload.sha256}"
+    key = base + IMAGE_TYPES[upload.content_type]
+    thumb_key = f"{base}_{thumb_size()}.webp"
+
+    # mesmo conteúdo já enviado (por este ou outro produto): só reaproveita
+    if not await run_in_threadpool(lambda: storage.exists(key) and storage.exists(thumb_key)):
+        try:
+            thumb = await thumbnail_async(upload.path)
+        except ValueError:
+            raise HTTPException(status_code=415, detail="Imagem inválida")
+        await run_in_threadpool(storage.save_bytes, thumb, thumb_key, "image/webp")
+        await run_in_threadpool(storage.save_file, upload.path, key, upload.content_type)
+
+    return storage.url(key), storage.url(thumb_key)
+
+
+def _produto_existe(db: Session, produto_id: int) -> bool:
+    existe = db.scalar(select(Produto.id).where(Produto.id == produto_id)) is not None
+    # devolve a conexão ao pool enquanto o arquivo chega
+    db.rollback()
+    return existe
+
+
+def _set_imagem(db: Session, produto_id: int, img: str, img_thumb: str):
+    row = db.execute(
+        update(Produto)
+        .where(Produto.id == produto_id)
+        .values(img=img, img_thumb=img_thumb)
+        .returning(*PRODUTO_ROW.columns)
+    ).first()
+    db.commit()
+    return row
+
+
+# multipart com o arquivo no campo "arquivo" (jpeg, png ou webp). O corpo é
+# gravado em streaming (app.utils.uploads), deduplicado pelo sha256 e a
+# miniatura sai de um pool de processos; a listagem devolve img_thumb.
+@router.post("/produtos/{produto_id}/imagem", response_model=ProdutoOut)
+async def enviar_imagem_produto(produto_id: int, request: Request, db: Session = Depends(get_db)):
+    # antes de ler o corpo: id inexistente não custa decode, pool nem storage
+    if not await run_in_threadpool(_produto_existe, db, produto_id):
+        raise HTTPException(status_code=404, detail="Produto não encontrado")
+
+    storage = get_storage()
+    staging = await run_in_threadpool(storage.staging_dir)
+    upload = await receber_arquivo(request, "arquivo", staging, set(IMAGE_TYPES), upload_max_bytes())
+    try:
+        img, img_thumb = await _guardar_imagem(storage, upload)
+    finally:
+        upload.discard()
+
+    row = await run_in_threadpool(_set_imagem, db, produto_id, img, img_thumb)
+    if row is None:
+        # apagado durante o upload
+        raise HTTPException(status_code=404, detail="Produto não encontrado")
+    bump_catalog(row.id_evento)
+    return PRODUTO_ROW.as_dict(row)
+
+
 @router.delete("/produtos/{produto_id}", status_code=status.HTTP_204_NO_CONTENT)
 def deletar_produto(produto_id: int, db: Session = Depends(get_db)):
     obj = db.execute(select(Produto).where(Produto.id == produto_id)).scalar_one_or_none()
@@ -194,28 +558,89 @@ def deletar_produto(produto_id: int, db: Session = Depends(get_db)):
 
     db.delete(obj)
     db.commit()
+    bump_catalog(obj.id_evento)
     return None
 
+def _json_list(serializer: RowSerializer, model, order_by):
+    # json_agg ordenado dos campos do schema de saída, correlacionado com o evento
+    obj = func.json_build_object(*[x for f, c in zip(serializer.fields, serializer.columns) for x in (f, c)])
+    return (
+        select(func.coalesce(func.json_agg(aggregate_order_by(obj, order_by)), literal_column("'[]'::json"), type_=JSON))
+        .where(model.id_evento == Evento.id)
+        .scalar_subquery()
+    )
+
+
+def evento_info_stmt(evento_id: int):
+    # evento + lotes + produtos num único round trip
+    return select(
+        *EVENTO_ROW.columns,
+        _json_list(LOTE_ROW, Lote, Lote.num_lote.asc()),
+        _json_list(PRODUTO_ROW, Produto, Produto.id.asc()),
+    ).where(Evento.id == evento_id)
+
+
 @router.get("/eventos/{evento_id}/info", response_model=EventoInfoOut)
-def evento_info(evento_id: int, db: Session = Depends(get_db)):
-    evento = db.execute(select(Evento).where(Evento.id == evento_id)).scalar_one_or_none()
-    if not evento:
-        raise HTTPException(status_code=404, detail="Evento não encontrado")
+def evento_info(evento_id: int, request: Request, db: Session = Depends(get_read_db)):
+    def build():
+        row = db.execute(evento_info_stmt(evento_id)).one_or_none()
+        if not row:
+            raise HTTPException(status_code=404, detail="Evento não encontrado")
+        return evento_info_body(row), {}
 
-    lotes = db.execute(
-        select(Lote)
-        .where(Lote.id_evento == evento_id)
-        .order_by(Lote.num_lote.asc())
-    ).scalars().all()
+    return cached_response(request, ("evento_info", evento_id), evento_id, build)
 
-    produtos = db.execute(
-        select(Produto)
-        .where(Produto.id_evento == evento_id)
-        .order_by(Produto.id.asc())
-    ).scalars().all()
 
-    return {
-        "evento": evento,
-        "lotes": lotes,
-        "produtos": produtos,
-    }
\ No newline at end of file
+# =========================
+# EXPORT (NDJSON / CSV)
+# =========================
+# Cursor no servidor (yield_per) + StreamingResponse: memória constante e o
+# primeiro byte sai antes de a consulta terminar, qualquer que seja o tamanho
+# da tabela. A sessão é aberta dentro do gerador porque a resposta continua
+# sendo enviada depois que o handler (e o get_db) terminam.
+EXPORT_CHUNK_ROWS = 1000
+
+_EXPORTS = {
+    "eventos": (EVENTO_ROW, Evento),
+    "lotes": (LOTE_ROW, Lote),
+    "produtos": (PRODUTO_ROW, Produto),
+}
+
+
+def _export_rows(serializer: RowSerializer, model, id_evento: int | None, formato: str) -> Iterator[bytes]:
+    if formato == "csv":
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(serializer.fields)
+        yield buf.getvalue().encode("utf-8")
+
+    stmt = select(*serializer.columns).order_by(model.id.asc())
+    if id_evento is not None:
+        stmt = stmt.where((model.id if model is Evento else model.id_evento) == id_evento)
+
+    # leitura longa: vai para a réplica, se houver
+    with read_session() as db:
+        result = db.execute(stmt.execution_options(yield_per=EXPORT_CHUNK_ROWS))
+        for rows in result.partitions():
+            if formato == "csv":
+                buf = io.StringIO()
+                csv.writer(buf).writerows(rows)
+                yield buf.getvalue().encode("utf-8")
+            else:
+                yield b"".join(serializer.dumps_one(r) + b"\n" for r in rows)
+
+
+@router.get("/export/{recurso}")
+def exportar(
+    recurso: Literal["eventos", "lotes", "produtos"],
+    formato: Literal["ndjson", "csv"] = Query(default="ndjson"),
+    id_evento: int | None = Query(default=None),
+):
+    serializer, model = _EXPORTS[recurso]
+    media_type = "text/csv; charset=utf-8" if formato == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        _export_rows(serializer, model, id_evento, formato),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{recurso}.{formato}"'},
+    )
+
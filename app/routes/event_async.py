@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.connection import get_async_db
+from app.models.event import Evento, Lote, Produto
+from app.schemas.event import (
+    EventoCreate, EventoUpdate, EventoOut,
+    LoteCreate, LoteUpdate, LoteOut,
+    ProdutoCreate, ProdutoUpdate, ProdutoOut, EventoInfoOut,
+)
+from app.routes.event import (
+    EVENTO_ROW, LOTE_ROW, PRODUTO_ROW,
+    EVENTO_KEYSET, LOTE_KEYSET, PRODUTO_KEYSET, EVENTO_FK, LOTE_CONFLITOS,
+    _paginate, evento_info_body, evento_info_stmt, evento_search_stmt, lote_update_stmt, page_body,
+)
+from app.utils.catalog_cache import bump_catalog, cached_response_async
+from app.utils.db_errors import conflitos_http
+from app.utils.pagination import page_limit
+
+# Variante async de app.routes.event (DB_MODE=async). Mesmas rotas e
+# respostas; o acesso ao banco usa AsyncSession em vez do threadpool.
+router = APIRouter()
+
+
+# =========================
+# EVENTOS
+# =========================
+@router.post("/eventos", response_model=EventoOut, status_code=status.HTTP_201_CREATED)
+async def criar_evento(payload: EventoCreate, db: AsyncSession = Depends(get_async_db)):
+    if payload.dt_fim < payload.dt_ini:
+        raise HTTPException(status_code=400, detail="dt_fim não pode ser menor que dt_ini")
+
+    obj = Evento(**payload.model_dump())
+    db.add(obj)
+    await db.commit()
+    await db.refresh(obj)
+    bump_catalog(obj.id)
+    return obj
+
+
+@router.get("/eventos", response_model=list[EventoOut])
+async def listar_eventos(
+    request: Request,
+    cursor: str | None = Query(default=None),
+    limit: int = Depends(page_limit),
+    db: AsyncSession = Depends(get_async_db),
+):
+    async def build():
+        stmt = select(*EVENTO_ROW.columns).order_by(Evento.dt_ini.desc(), Evento.id.desc())
+        stmt = _paginate(stmt, EVENTO_KEYSET, cursor, limit)
+        return page_body(EVENTO_ROW, (await db.execute(stmt)).all(), limit, EVENTO_KEYSET)
+
+    return await cached_response_async(request, ("eventos", cursor, limit), None, build)
+
+
+@router.get("/eventos/search", response_model=list[EventoOut])
+async def buscar_eventos(
+    request: Request,
+    q: str = Query(..., min_length=2, max_length=100),
+    de: date | None = Query(default=None),
+    ate: date | None = Query(default=None),
+    limit: int = Depends(page_limit),
+    db: AsyncSession = Depends(get_async_db),
+):
+    async def build():
+        rows = (await db.execute(evento_search_stmt(q, de, ate, limit))).all()
+        return EVENTO_ROW.dumps(rows), {}
+
+    return await cached_response_async(request, ("busca", q.strip().lower(), de, ate, limit), None, build)
+
+
+@router.get("/eventos/{evento_id}", response_model=EventoOut)
+async def obter_evento(evento_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    async def build():
+        row = (await db.execute(select(*EVENTO_ROW.columns).where(Evento.id == evento_id))).one_or_none()
+        if not row:
+            raise HTTPException(status_code=404, detail="Evento não encontrado")
+        return EVENTO_ROW.dumps_one(row), {}
+
+    return await cached_response_async(request, ("evento", evento_id), evento_id, build)
+
+
+@router.put("/eventos/{evento_id}", response_model=EventoOut)
+async def atualizar_evento(evento_id: int, payload: EventoUpdate, db: AsyncSession = Depends(get_async_db)):
+    obj = (await db.execute(select(Evento).where(Evento.id == evento_id))).scalar_one_or_none()
+    if not obj:
+        raise HTTPException(status_code=404, detail="Evento não encontrado")
+
+    data = payload.model_dump(exclude_unset=True)
+
+    dt_ini = data.get("dt_ini", obj.dt_ini)
+    dt_fim = data.get("dt_fim", obj.dt_fim)
+    if dt_fim < dt_ini:
+        raise HTTPException(status_code=400, detail="dt_fim não pode ser menor que dt_ini")
+
+    for k, v in data.items():
+        setattr(obj, k, v)
+
+    await db.commit()
+    await db.refresh(obj)
+    bump_catalog(evento_id)
+    return obj
+
+
+@router.delete("/eventos/{evento_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def deletar_evento(evento_id: int, db: AsyncSession = Depends(get_async_db)):
+    obj = (await db.execute(select(Evento).where(Evento.id == evento_id))).scalar_one_or_none()
+    if not obj:
+        raise HTTPException(status_code=404, detail="Evento não encontrado")
+
+    await db.delete(obj)
+    await db.commit()
+    bump_catalog(evento_id)
+    return None
+
+
+# =========================
+# LOTES
+# =========================
+@router.post("/lotes", response_model=LoteOut, status_code=status.HTTP_201_CREATED)
+async def criar_lote(payload: LoteCreate, db: AsyncSession = Depends(get_async_db)):
+    with conflitos_http(LOTE_CONFLITOS):
+        row = (await db.execute(insert(Lote).values(**payload.model_dump()).returning(*LOTE_ROW.columns))).one()
+        await db.commit()
+    bump_catalog(payload.id_evento)
+    return LOTE_ROW.as_dict(row)
+
+
+@router.get("/lotes", response_model=list[LoteOut])
+async def listar_lotes(
+    request: Request,
+    id_evento: int | None = Query(default=None),
+    cursor: str | None = Query(default=None),
+    limit: int = Depends(page_limit),
+    db: AsyncSession = Depends(get_async_db),
+):
+    async def build():
+        stmt = select(*LOTE_ROW.columns).order_by(Lote.id.desc())
+        if id_evento is not None:
+            stmt = stmt.where(Lote.id_evento == id_evento)
+        stmt = _paginate(stmt, LOTE_KEYSET, cursor, limit)
+        return page_body(LOTE_ROW, (await db.execute(stmt)).all(), limit, LOTE_KEYSET)
+
+    return await cached_response_async(request, ("lotes", id_evento, cursor, limit), id_evento, build)
+
+
+@router.put("/lotes/{lote_id}", response_model=LoteOut)
+async def atualizar_lote(lote_id: int, payload: LoteUpdate, db: AsyncSession = Depends(get_async_db)):
+    with conflitos_http(LOTE_CONFLITOS):
+        row = (await db.execute(lote_update_stmt(lote_id, payload))).first()
+        await db.commit()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Lote não encontrado")
+    bump_catalog(row.id_evento)
+    return LOTE_ROW.as_dict(row)
+
+
+@router.delete("/lotes/{lote_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def deletar_lote(lote_id: int, db: AsyncSession = Depends(get_async_db)):
+    obj = (await db.execute(select(Lote).where(Lote.id == lote_id))).scalar_one_or_none()
+    if not obj:
+        raise HTTPException(status_code=404, detail="Lote não encontrado")
+
+    await db.delete(obj)
+    await db.commit()
+    bump_catalog(obj.id_evento)
+    return None
+
+
+# =========================
+# PRODUTOS
+# =========================
+@router.post("/produtos", response_model=ProdutoOut, status_code=status.HTTP_201_CREATED)
+async def criar_produto(payload: ProdutoCreate, db: AsyncSession = Depends(get_async_db)):
+    with conflitos_http(EVENTO_FK):
+        row = (await db.execute(insert(Produto).values(**payload.model_dump()).returning(*PRODUTO_ROW.columns))).one()
+        await db.commit()
+    bump_catalog(payload.id_evento)
+    return PRODUTO_ROW.as_dict(row)
+
+
+@router.get("/produtos", response_model=list[ProdutoOut])
+async def listar_produtos(
+    request: Request,
+    id_evento: int | None = Query(default=None),
+    cursor: str | None = Query(default=None),
+    limit: int = Depends(page_limit),
+    db: AsyncSession = Depends(get_async_db),
+):
+    async def build():
+        stmt = select(*PRODUTO_ROW.columns).order_by(Produto.id.desc())
+        if id_evento is not None:
+            stmt = stmt.where(Produto.id_evento == id_evento)
+        stmt = _paginate(stmt, PRODUTO_KEYSET, cursor, limit)
+        return page_body(PRODUTO_ROW, (await db.execute(stmt)).all(), limit, PRODUTO_KEYSET)
+
+    return await cached_response_async(request, ("produtos", id_evento, cursor, limit), id_evento, build)
+
+
+@router.put("/produtos/{produto_id}", response_model=ProdutoOut)
+async def atualizar_produto(produto_id: int, payload: ProdutoUpdate, db: AsyncSession = Depends(get_async_db)):
+    obj = (await db.execute(select(Produto).where(Produto.id == produto_id))).scalar_one_or_none()
+    if not obj:
+        raise HTTPException(status_code=404, detail="Produto não encontrado")
+
+    data = payload.model_dump(exclude_unset=True)
+    if "img" in data and data["img"] != obj.img:
+        obj.img_thumb = None
+    for k, v in data.items():
+        setattr(obj, k, v)
+
+    await db.commit()
+    await db.refresh(obj)
+    bump_catalog(obj.id_evento)
+    return obj
+
+
+@router.delete("/produtos/{produto_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def deletar_produto(produto_id: int, db: AsyncSession = Depends(get_async_db)):
+    obj = (await db.execute(select(Produto).where(Produto.id == produto_id))).scalar_one_or_none()
+    if not obj:
+        raise HTTPException(status_code=404, detail="Produto não encontrado")
+
+    await db.delete(obj)
+    await db.commit()
+    bump_catalog(obj.id_evento)
+    return None
+
+@router.get("/eventos/{evento_id}/info", response_model=EventoInfoOut)
+async def evento_info(evento_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    async def build():
+        row = (await db.execute(evento_info_stmt(evento_id))).one_or_none()
+        if not row:
+            raise HTTPException(status_code=404, detail="Evento não encontrado")
+        return evento_info_body(row), {}
+
+    return await cached_response_async(request, ("evento_info", evento_id), evento_id, build)
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import hmac
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+
+from app.config import get_settings
+from app.database.connection import pool_stats
+from app.database.replicas import replica_stats
+from app.utils.catalog_cache import get_catalog_cache
+from app.utils.jwt_handler import token_cache_stats
+from app.utils.password import hash_stats
+from app.utils.rate_limit import get_auth_admission
+from app.utils.revocation import get_revocation_cache, get_revocation_writer
+from app.utils.user_version import get_user_versions
+
+
+def _require_internal_token(request: Request) -> None:
+    # sem INTERNAL_TOKEN configurado as rotas internas simplesmente não existem
+    expected = get_settings().internal_token or ""
+    given = request.headers.get("x-internal-token") or ""
+    if not expected or not hmac.compare_digest(given, expected):
+        raise HTTPException(status_code=404, detail="Not Found")
+
+
+router = APIRouter(dependencies=[Depends(_require_internal_token)])
+
+
+@router.get("/pool")
+def pool():
+    return {**pool_stats(), "replicas": replica_stats()}
+
+
+@router.get("/stats")
+def stats():
+    return {
+        "pool": pool_stats(),
+        "replicas": replica_stats(),
+        "hash": hash_stats(),
+        "auth_admission": get_auth_admission().stats(),
+        "revocation": get_revocation_cache().stats(),
+        "revocation_writer": get_revocation_writer().stats(),
+        "jwt": token_cache_stats(),
+        "user_versions": get_user_versions().stats(),
+        "catalog_cache": get_catalog_cache().stats(),
+    }
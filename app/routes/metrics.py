@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import hmac
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+
+from app.database.connection import pool_stats
+from app.database.replicas import replica_stats
+from app.utils.catalog_cache import get_catalog_cache
+from app.utils.jwt_handler import token_cache_stats
+from app.utils.metrics import REGISTRY, GaugeFunc, metrics_token
+from app.utils.password import hash_stats
+from app.utils.rate_limit import get_auth_admission
+from app.utils.revocation import get_revocation_writer
+
+# Lidos só no scrape, a partir dos stats que já existem em cada módulo (os
+# mesmos de /internal/stats): níveis como gauge, acumulados como counter.
+
+
+def _pool():
+    stats = pool_stats()
+    for nome in ("sync", "async"):
+        snap = stats.get(nome) or {}
+        for campo in ("size", "checked_in", "checked_out", "overflow"):
+            if campo in snap:
+                yield (nome, campo), snap[campo]
+
+
+def _pool_counters(campo: str):
+    def fn():
+        yield (), pool_stats()[campo]
+    return fn
+
+
+def _fields(stats_fn, campos):
+    # níveis (entries, in_flight...), um gauge com label field
+    def fn():
+        stats = stats_fn()
+        if stats:
+            for campo in campos:
+                yield (campo,), stats[campo]
+    return fn
+
+
+def _total(stats_fn, campo: str):
+    # acumulados viram counters próprios (*_total), para rate() e reset
+    def fn():
+        stats = stats_fn()
+        if stats:
+            yield (), stats[campo]
+    return fn
+
+
+def _replicas():
+    stats = replica_stats()
+    if stats:
+        yield ("replica",), stats["reads"]
+        yield ("primary_fallback",), stats["fallbacks"]
+
+
+def _auth_stats():
+    return get_auth_admission().stats()
+
+
+def _writer_stats():
+    return get_revocation_writer().stats()
+
+
+def _catalog_stats():
+    return get_catalog_cache().stats()
+
+
+REGISTRY.register(GaugeFunc("db_pool_connections", "Conexões do pool por estado", _pool, ("pool", "state")))
+REGISTRY.register(GaugeFunc(
+    "db_pool_checkouts_total", "Checkouts de conexão do pool", _pool_counters("checkouts"), kind="counter",
+))
+REGISTRY.register(GaugeFunc(
+    "db_pool_checkout_timeouts_total", "Checkouts que estouraram DB_POOL_TIMEOUT",
+    _pool_counters("checkout_timeouts"), kind="counter",
+))
+REGISTRY.register(GaugeFunc(
+    "db_pool_checkout_wait_seconds_total", "Tempo total esperando conexão do pool",
+    _pool_counters("checkout_wait_total_s"), kind="counter",
+))
+REGISTRY.register(GaugeFunc(
+    "db_read_sessions_total", "Sessões de leitura por destino (réplica ou fallback no primário)",
+    _replicas, ("target",), kind="counter",
+))
+# o executor do Argon2 só aparece depois do primeiro hash (hash_stats não o cria)
+REGISTRY.register(GaugeFunc(
+    "password_hash_executor", "Executor do Argon2",
+    _fields(hash_stats, ("workers", "in_flight", "queue_depth")), ("field",),
+))
+REGISTRY.register(GaugeFunc(
+    "password_hash_rejected_total", "Hashes recusados com a fila cheia", _total(hash_stats, "rejected"), kind="counter",
+))
+REGISTRY.register(GaugeFunc(
+    "password_hash_completed_total", "Hashes concluídos", _total(hash_stats, "completed"), kind="counter",
+))
+REGISTRY.register(GaugeFunc(
+    "jwt_cache", "Cache de tokens verificados", _fields(token_cache_stats, ("entries",)), ("field",),
+))
+REGISTRY.register(GaugeFunc(
+    "jwt_cache_hits_total", "Acertos do cache de tokens", _total(token_cache_stats, "hits"), kind="counter",
+))
+REGISTRY.register(GaugeFunc(
+    "jwt_cache_misses_total", "Faltas do cache de tokens", _total(token_cache_stats, "misses"), kind="counter",
+))
+REGISTRY.register(GaugeFunc(
+    "jwt_cache_expired_total", "Entradas expiradas do cache de tokens",
+    _total(token_cache_stats, "expired"), kind="counter",
+))
+REGISTRY.register(GaugeFunc(
+    "auth_admission", "Controle de admissão de login/register", _fields(_auth_stats, ("in_flight",)), ("field",),
+))
+REGISTRY.register(GaugeFunc(
+    "auth_admission_rejected_overloaded_total", "Auth recusadas pelo limite global (503)",
+    _total(_auth_stats, "rejected_overloaded"), kind="counter",
+))
+REGISTRY.register(GaugeFunc(
+    "auth_admission_rejected_ip_total", "Auth recusadas pelo bucket do IP (429)",
+    _total(_auth_stats, "rejected_ip"), kind="counter",
+))
+REGISTRY.register(GaugeFunc(
+    "auth_admission_rejected_ident_total", "Auth recusadas pelo bucket do e-mail/CPF (429)",
+    _total(_auth_stats, "rejected_ident"), kind="counter",
+))
+REGISTRY.register(GaugeFunc(
+    "revocation_writer", "Gravação em lote das revogações", _fields(_writer_stats, ("pending",)), ("field",),
+))
+REGISTRY.register(GaugeFunc(
+    "revocation_writer_written_total", "Revogações gravadas", _total(_writer_stats, "written"), kind="counter",
+))
+REGISTRY.register(GaugeFunc(
+    "revocation_writer_failures_total", "Flushes de revogações que falharam",
+    _total(_writer_stats, "failures"), kind="counter",
+))
+REGISTRY.register(GaugeFunc(
+    "catalog_cache", "Cache do catálogo", _fields(_catalog_stats, ("entries",)), ("field",),
+))
+REGISTRY.register(GaugeFunc(
+    "catalog_cache_hits_total", "Acertos do cache do catálogo", _total(_catalog_stats, "hits"), kind="counter",
+))
+REGISTRY.register(GaugeFunc(
+    "catalog_cache_misses_total", "Faltas do cache do catálogo", _total(_catalog_stats, "misses"), kind="counter",
+))
+REGISTRY.register(GaugeFunc(
+    "catalog_cache_not_modified_total", "Respostas 304 do cache do catálogo",
+    _total(_catalog_stats, "not_modified"), kind="counter",
+))
+
+
+def _require_metrics_token(request: Request) -> None:
+    # exige "Authorization: Bearer <METRICS_TOKEN>"; sem token configurado o
+    # router nem é incluído (metrics_enabled)
+    expected = metrics_token() or ""
+    given = (request.headers.get("authorization") or "").removeprefix("Bearer ").strip()
+    if not expected or not hmac.compare_digest(given, expected):
+        raise HTTPException(status_code=404, detail="Not Found")
+
+
+router = APIRouter(dependencies=[Depends(_require_metrics_token)])
+
+
+@router.get("/metrics")
+def metrics():
+    return Response(content=REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import uuid
+from datetime import timedelta
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import bindparam, delete, func, insert, literal, select, true, update
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database.connection import get_db
+from app.models.event import Lote, ReservaVaga
+from app.schemas.event import ReservaCreate, ReservaOut
+
+router = APIRouter()
+
+# =========================
+# RESERVA DE VAGAS
+# =========================
+# Lote.vagas_reservadas conta as vagas seguras por reservas pendentes e
+# confirmadas. A reserva incrementa o contador com um UPDATE condicional
+# (vagas_reservadas + q <= total_vagas): o Postgres serializa os UPDATEs na
+# linha do lote e reavalia o WHERE depois do lock, então nunca há overbooking
+# — e o CHECK de tb_lote é a última barreira.
+#
+# Reservas pendentes expiram em RESERVA_TTL_SECONDS. As vencidas são apagadas
+# em massa e as vagas voltam a cada lote em ordem de id (sem deadlock entre
+# liberações concorrentes); isso roda no loop do lifespan
+# (RESERVA_RELEASE_SECONDS) e também quando um lote parece esgotado.
+#
+# Reservas não mexem no catálogo (LoteOut não expõe a ocupação), então não há
+# bump_catalog aqui.
+
+RESERVA_TTL = timedelta(seconds=get_settings().reserva_ttl_seconds)
+RELEASE_BATCH = 1000
+
+
+def _tentar_reservar(db: Session, lote_id: int, quantidade: int, codigo: str):
+    # UPDATE do lote + INSERT da reserva num só round-trip: o lock da linha do
+    # lote fica preso o mínimo possível. expira_em sai do relógio do banco, o
+    # mesmo now() com que liberação e confirmação comparam.
+    upd = (
+        update(Lote)
+        .where(Lote.id == lote_id, Lote.vagas_reservadas + quantidade <= Lote.total_vagas)
+        .values(vagas_reservadas=Lote.vagas_reservadas + quantidade)
+        .returning(Lote.id, (Lote.total_vagas - Lote.vagas_reservadas).label("restantes"))
+        .cte("upd")
+    )
+    ins = (
+        insert(ReservaVaga)
+        .from_select(
+            ["id_lote", "codigo", "quantidade", "status", "expira_em"],
+            select(upd.c.id, literal(codigo), literal(quantidade), literal("pendente"), func.now() + RESERVA_TTL),
+        )
+        .returning(ReservaVaga.expira_em)
+        .cte("ins")
+    )
+    stmt = select(upd.c.restantes, ins.c.expira_em).select_from(upd).join(ins, true())
+    return db.execute(stmt).one_or_none()
+
+
+def reservar_vagas(db: Session, lote_id: int, quantidade: int) -> ReservaOut:
+    codigo = str(uuid.uuid4())
+
+    row = _tentar_reservar(db, lote_id, quantidade, codigo)
+    if row is None:
+        db.rollback()
+        # esgotado: pode ser só reserva vencida ainda não liberada
+        if liberar_reservas_expiradas(db, lote_id):
+            row = _tentar_reservar(db, lote_id, quantidade, codigo)
+
+    if row is None:
+        db.rollback()
+        if not db.scalar(select(Lote.id).where(Lote.id == lote_id)):
+            raise HTTPException(status_code=404, detail="Lote não encontrado")
+        raise HTTPException(status_code=409, detail="Vagas esgotadas para este lote")
+
+    db.commit()
+    return ReservaOut(
+        codigo=codigo,
+        id_lote=lote_id,
+        quantidade=quantidade,
+        status="pendente",
+        expira_em=row.expira_em,
+        vagas_restantes=row.restantes,
+    )
+
+
+def _devolver_vagas(db: Session, apagadas) -> int:
+    # apagadas: CTE com (id_lote, quantidade) das reservas removidas
+    soma = (
+        select(apagadas.c.id_lote, func.sum(apagadas.c.quantidade))
+        .group_by(apagadas.c.id_lote)
+    )
+    por_lote = sorted((lote_id, int(q)) for lote_id, q in db.execute(soma))
+    if not por_lote:
+        return 0
+    # um UPDATE por lote, em ordem de id: liberações concorrentes (o loop de
+    # cada worker e o caminho do "esgotado") travam os lotes na mesma ordem e
+    # não entram em deadlock; a reserva trava um lote só
+    lote = Lote.__table__
+    db.execute(
+        update(lote)
+        .where(lote.c.id == bindparam("lote_id"))
+        .values(vagas_reservadas=lote.c.vagas_reservadas - bindparam("quantidade")),
+        [{"lote_id": lote_id, "quantidade": q} for lote_id, q in por_lote],
+    )
+    return sum(q for _, q in por_lote)
+
+
+# retorna o nº de vagas devolvidas; lotes de batch_size com SKIP LOCKED, como
+# em app.jobs.compact_blacklist
+def liberar_reservas_expiradas(db: Session, lote_id: int | None = None, batch_size: int = RELEASE_BATCH) -> int:
+    total = 0
+    while True:
+        alvo = (
+            select(ReservaVaga.id)
+            .where(ReservaVaga.status == "pendente", ReservaVaga.expira_em < func.now())
+            .order_by(ReservaVaga.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        if lote_id is not None:
+            alvo = alvo.where(ReservaVaga.id_lote == lote_id)
+
+        apagadas = (
+            delete(ReservaVaga)
+            .where(ReservaVaga.id.in_(alvo.scalar_subquery()))
+            .returning(ReservaVaga.id_lote, ReservaVaga.quantidade)
+            .cte("apagadas")
+        )
+        liberadas = _devolver_vagas(db, apagadas)
+        db.commit()
+        total += liberadas
+        if liberadas == 0:
+            return total
+
+
+def confirmar_reserva(db: Session, codigo: str) -> ReservaOut:
+    row = db.execute(
+        update(ReservaVaga)
+        .where(
+            ReservaVaga.codigo == codigo,
+            ReservaVaga.status == "pendente",
+            ReservaVaga.expira_em >= func.now(),
+        )
+        .values(status="confirmada", expira_em=None)
+        .returning(ReservaVaga.id_lote, ReservaVaga.quantidade)
+        .execution_options(synchronize_session=False)
+    ).one_or_none()
+
+    if row is None:
+        db.rollback()
+        atual = db.execute(
+            select(ReservaVaga.status).where(ReservaVaga.codigo == codigo)
+        ).scalar_one_or_none()
+        if atual is None:
+            raise HTTPException(status_code=404, detail="Reserva não encontrada")
+        if atual == "confirmada":
+            raise HTTPException(status_code=409, detail="Reserva já confirmada")
+        raise HTTPException(status_code=409, detail="Reserva expirada")
+
+    db.commit()
+    return ReservaOut(codigo=codigo, id_lote=row.id_lote, quantidade=row.quantidade, status="confirmada")
+
+
+def cancelar_reserva(db: Session, codigo: str) -> None:
+    apagadas = (
+        delete(ReservaVaga)
+        .where(ReservaVaga.codigo == codigo, ReservaVaga.status == "pendente")
+        .returning(ReservaVaga.id_lote, ReservaVaga.quantidade)
+        .cte("apagadas")
+    )
+    if _devolver_vagas(db, apagadas):
+        db.commit()
+        return
+
+    db.rollback()
+    atual = db.execute(select(ReservaVaga.status).where(ReservaVaga.codigo == codigo)).scalar_one_or_none()
+    if atual is None:
+        raise HTTPException(status_code=404, detail="Reserva não encontrada")
+    raise HTTPException(status_code=409, detail="Reserva já confirmada")
+
+
+@router.post("/lotes/{lote_id}/reservas", response_model=ReservaOut, status_code=status.HTTP_201_CREATED)
+def criar_reserva(lote_id: int, payload: ReservaCreate, db: Session = Depends(get_db)):
+    return reservar_vagas(db, lote_id, payload.quantidade)
+
+
+@router.post("/reservas/{codigo}/confirmar", response_model=ReservaOut)
+def confirmar(codigo: str, db: Session = Depends(get_db)):
+    return confirmar_reserva(db, codigo)
+
+
+@router.delete("/reservas/{codigo}", status_code=status.HTTP_204_NO_CONTENT)
+def cancelar(codigo: str, db: Session = Depends(get_db)):
+    cancelar_reserva(db, codigo)
+    return None
@@ -1,31 +1,35 @@
-import os
 import re
 import uuid
 
-from dotenv import load_dotenv
 from pydantic import BaseModel
 from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from fastapi.responses import JSONResponse
 from sqlalchemy import select
 from sqlalchemy.orm import Session, joinedload
+from starlette.concurrency import run_in_threadpool
 
+from app.config import get_settings
 from app.database.connection import get_db
-from app.models.user import Pessoa, Usuario, TokenBlacklist
+from app.database.replicas import get_read_db
+from app.models.user import Pessoa, Usuario
 from app.schemas.user import RegisterIn, RegisterOut
-from app.utils.password import hash_password, verify_password
+from app.utils.password import HashQueueFull, hash_password_async, verify_password_async
+from app.utils.db_errors import conflitos_http
 from app.utils.jwt_handler import criar_token, verificar_token, decode_token
+from app.utils.rate_limit import admitir_auth
+from app.utils.revocation import get_revocation_cache, revoke
+from app.utils.serialization import json_response
+from app.utils.user_version import get_user_versions
 
 router = APIRouter()
 
-load_dotenv()
-is_prod = os.getenv("ENVIRONMENT") == "prod"
-cookie_domain = "ziondocs.com.br" if is_prod else None
+is_prod = get_settings().is_prod
+cookie_domain = get_settings().cookie_domain
 
-cookie_env = {
-    "secure": True if is_prod else False,
-    "samesite": "Lax",
-    "domain": cookie_domain,
-}
+cookie_env = get_settings().cookie_env
+
+# /me responde do perfil embutido no access token (app.utils.user_version)
+ME_FROM_TOKEN = get_settings().me_from_token
 
 ACCESS_MAX_AGE = 60 * 60 * 24 * 7
 REFRESH_MAX_AGE = 60 * 60 * 24 * 30
@@ -80,69 +84,114 @@ def _delete_cookie_auth(resp: Response) -> None:
 def _is_blacklisted(db: Session, jti: str | None) -> bool:
     if not jti:
         return True
-    return db.scalar(select(TokenBlacklist.id).where(TokenBlacklist.jti == jti)) is not None
+    return get_revocation_cache().is_revoked(db, jti)
 
 
-@router.post("/register", response_model=RegisterOut, status_code=status.HTTP_201_CREATED)
-def register(payload: RegisterIn, db: Session = Depends(get_db)):
-    email = payload.usuario.email.strip().lower()
+def _servidor_ocupado() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Servidor ocupado, tente novamente em instantes",
+        headers={"Retry-After": "1"},
+    )
 
-    if db.scalar(select(Usuario.id).where(Usuario.email == email)):
-        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="E-mail já cadastrado")
 
-    cpf = _cpf_digits(payload.pessoa.cpf or "")
-    if cpf and db.scalar(select(Pessoa.id).where(Pessoa.cpf == cpf)):
-        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="CPF já cadastrado")
+async def _hash_senha(senha: str) -> str:
+    try:
+        return await hash_password_async(senha)
+    except HashQueueFull:
+        raise _servidor_ocupado()
 
+
+async def _verificar_senha(senha: str, senha_hash: str) -> bool:
+    try:
+        return await verify_password_async(senha, senha_hash)
+    except HashQueueFull:
+        raise _servidor_ocupado()
+
+
+# e-mail/CPF repetidos são detectados pelas constraints no próprio INSERT
+REGISTER_CONFLITOS = {
+    "uq_tb_usuario_email": (status.HTTP_409_CONFLICT, "E-mail já cadastrado"),
+    "uq_tb_pessoa_cpf": (status.HTTP_409_CONFLICT, "CPF já cadastrado"),
+}
+
+
+def _insert_register(db: Session, payload: RegisterIn, email: str, cpf: str, senha_hash: str) -> RegisterOut:
     pessoa = Pessoa(
         nome=payload.pessoa.nome.strip(),
         cpf=cpf or None,
         data_nascimento=payload.pessoa.data_nascimento,
         adm=getattr(payload.pessoa, "adm", False) or False,
     )
-    db.add(pessoa)
-    db.flush()
-
-    usuario = Usuario(
-        id_pessoa=pessoa.id,
-        email=email,
-        senha_hash=hash_password(payload.usuario.senha),
-    )
-    db.add(usuario)
-    db.commit()
-    db.refresh(pessoa)
-    db.refresh(usuario)
+    with conflitos_http(REGISTER_CONFLITOS):
+        db.add(pessoa)
+        db.flush()
+
+        usuario = Usuario(
+            id_pessoa=pessoa.id,
+            email=email,
+            senha_hash=senha_hash,
+        )
+        db.add(usuario)
+        db.commit()
+    # sem refresh: os defaults do servidor (created_at, versao...) já voltam
+    # no RETURNING dos INSERTs (eager_defaults="auto" do SQLAlchemy 2)
 
     return RegisterOut(pessoa=pessoa, usuario=usuario)
 
 
+# register/login são async: o acesso ao banco vai para o threadpool e o Argon2
+# vai para o executor dedicado (app.utils.password), sem segurar um slot do
+# threadpool compartilhado durante o hash. Antes de tudo passam pelo controle
+# de admissão (app.utils.rate_limit), que recusa excesso com 429/503.
+@router.post("/register", response_model=RegisterOut, status_code=status.HTTP_201_CREATED)
+async def register(payload: RegisterIn, request: Request, db: Session = Depends(get_db)):
+    email = payload.usuario.email.strip().lower()
+    cpf = _cpf_digits(payload.pessoa.cpf or "")
+
+    with admitir_auth(request, email):
+        senha_hash = await _hash_senha(payload.usuario.senha)
+
+        return await run_in_threadpool(_insert_register, db, payload, email, cpf, senha_hash)
+
+
 class LoginInput(BaseModel):
     usuario: str
     senha: str
 
 
-@router.post("/login", status_code=status.HTTP_200_OK)
-def login_user(payload: LoginInput, db: Session = Depends(get_db)):
-    ident = payload.usuario.strip()
-    user: Usuario | None = None
+def _login_key(ident: str) -> str:
+    # mesma normalização de _find_login_user: variações do identificador
+    # contam no mesmo bucket
+    return ident.lower() if _is_email(ident) else _cpf_digits(ident)
 
+
+def _find_login_user(db: Session, ident: str) -> Usuario | None:
     if _is_email(ident):
         email = ident.lower()
-        user = db.execute(
+        return db.execute(
             select(Usuario).options(joinedload(Usuario.pessoa)).where(Usuario.email == email)
         ).scalar_one_or_none()
-    else:
-        cpf = _cpf_digits(ident)
-        pessoa = db.execute(select(Pessoa).where(Pessoa.cpf == cpf)).scalar_one_or_none()
-        if pessoa:
-            user = db.execute(
-                select(Usuario).options(joinedload(Usuario.pessoa)).where(Usuario.id_pessoa == pessoa.id)
-            ).scalar_one_or_none()
-
-    if not user or not verify_password(payload.senha, user.senha_hash):
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Usuário ou senha inválidos")
-
-    access_payload = {"id": user.id, "sub": user.email, "tipo": "access", "jti": str(uuid.uuid4())}
+
+    cpf = _cpf_digits(ident)
+    pessoa = db.execute(select(Pessoa).where(Pessoa.cpf == cpf)).scalar_one_or_none()
+    if not pessoa:
+        return None
+    return db.execute(
+        select(Usuario).options(joinedload(Usuario.pessoa)).where(Usuario.id_pessoa == pessoa.id)
+    ).scalar_one_or_none()
+
+
+@router.post("/login", status_code=status.HTTP_200_OK)
+async def login_user(payload: LoginInput, request: Request, db: Session = Depends(get_db)):
+    ident = payload.usuario.strip()
+    with admitir_auth(request, _login_key(ident)):
+        user = await run_in_threadpool(_find_login_user, db, ident)
+
+        if not user or not await _verificar_senha(payload.senha, user.senha_hash):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Usuário ou senha inválidos")
+
+    access_payload = _access_payload(user)
     refresh_payload = {"id": user.id, "sub": user.email, "tipo": "refresh", "jti": str(uuid.uuid4())}
 
     access_token = criar_token(access_payload, expires_in=60 * 24 * 7)
@@ -153,8 +202,50 @@ def login_user(payload: LoginInput, db: Session = Depends(get_db)):
     return resp
 
 
+def _me_body(user: Usuario) -> dict:
+    return {
+        "usuario": {"id": user.id, "email": user.email},
+        "pessoa": {
+            "id": user.pessoa.id if user.pessoa else None,
+            "nome": user.pessoa.nome if user.pessoa else None,
+            "cpf": user.pessoa.cpf if user.pessoa else None,
+            "data_nascimento": user.pessoa.data_nascimento if user.pessoa else None,
+            "adm": getattr(user.pessoa, "adm", False) if user.pessoa else False,
+        },
+    }
+
+
+def _access_payload(user: Usuario) -> dict:
+    payload = {"id": user.id, "sub": user.email, "tipo": "access", "jti": str(uuid.uuid4())}
+    if ME_FROM_TOKEN:
+        # o token é assinado, não cifrado: o perfil (inclusive CPF) fica legível
+        # para quem tiver o cookie — o mesmo que o /me já devolve a ele
+        perfil = _me_body(user)
+        nascimento = perfil["pessoa"]["data_nascimento"]
+        perfil["pessoa"]["data_nascimento"] = nascimento.isoformat() if nascimento else None
+        payload["perfil"] = perfil
+        payload["ver"] = user.versao
+        get_user_versions().seen(user.id, user.versao)
+    return payload
+
+
+def _perfil_do_token(db: Session, payload: dict, uid: int) -> dict | None:
+    perfil = payload.get("perfil")
+    if not isinstance(perfil, dict):
+        return None
+    if not get_user_versions().is_current(db, uid, payload.get("ver")):
+        return None
+    return perfil
+
+
+def _user_stmt(uid: int):
+    stmt = select(Usuario).where(Usuario.id == uid)
+    # o access token novo carrega o perfil
+    return stmt.options(joinedload(Usuario.pessoa)) if ME_FROM_TOKEN else stmt
+
+
 @router.get("/me")
-def me(request: Request, db: Session = Depends(get_db)):
+def me(request: Request, db: Session = Depends(get_read_db)):
     token = request.cookies.get("access_token")
     if not token:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token de autenticação ausente")
@@ -172,6 +263,11 @@ def me(request: Request, db: Session = Depends(get_db)):
     except Exception:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token inválido")
 
+    if ME_FROM_TOKEN:
+        perfil = _perfil_do_token(db, payload, uid)
+        if perfil is not None:
+            return json_response(perfil)
+
     user = db.execute(
         select(Usuario).options(joinedload(Usuario.pessoa)).where(Usuario.id == uid)
     ).scalar_one_or_none()
@@ -179,16 +275,9 @@ def me(request: Request, db: Session = Depends(get_db)):
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuário não encontrado")
 
-    return {
-        "usuario": {"id": user.id, "email": user.email},
-        "pessoa": {
-            "id": user.pessoa.id if user.pessoa else None,
-            "nome": user.pessoa.nome if user.pessoa else None,
-            "cpf": user.pessoa.cpf if user.pessoa else None,
-            "data_nascimento": user.pessoa.data_nascimento if user.pessoa else None,
-            "adm": getattr(user.pessoa, "adm", False) if user.pessoa else False,
-        },
-    }
+    if ME_FROM_TOKEN:
+        get_user_versions().seen(user.id, user.versao)
+    return json_response(_me_body(user))
 
 
 @router.post("/refresh")
@@ -210,42 +299,37 @@ def refresh(request: Request, db: Session = Depends(get_db)):
     except Exception:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token inválido")
 
-    user = db.execute(select(Usuario).where(Usuario.id == uid)).scalar_one_or_none()
+    user = db.execute(_user_stmt(uid)).scalar_one_or_none()
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuário não encontrado")
 
-    novo_access = criar_token(
-        {"id": user.id, "sub": user.email, "tipo": "access", "jti": str(uuid.uuid4())},
-        expires_in=60 * 24 * 7,
-    )
+    novo_access = criar_token(_access_payload(user), expires_in=60 * 24 * 7)
 
     resp = JSONResponse(content={"message": "Token renovado"})
     _set_cookie_auth(resp, access_token=novo_access, refresh_token=None)
     return resp
 
 
+def _revoke_token(tok: str | None) -> None:
+    # sem round-trip: vale na hora neste worker e vai para o banco em lote
+    # (app.utils.revocation.RevocationWriter)
+    if not tok:
+        return
+    payload = decode_token(tok)
+    jti = payload.get("jti") if isinstance(payload, dict) else None
+    if not jti:
+        return
+    exp = payload.get("exp")
+    revoke(jti, float(exp) if isinstance(exp, (int, float)) else None)
+
+
 @router.post("/logout")
-def logout(request: Request, response: Response, db: Session = Depends(get_db)):
+def logout(request: Request, response: Response):
     access_token = request.cookies.get("access_token")
     refresh_token = request.cookies.get("refresh_token")
 
-    def _revoke(tok: str | None) -> None:
-        if not tok:
-            return
-        try:
-            payload = decode_token(tok)
-            jti = payload.get("jti") if isinstance(payload, dict) else None
-            if not jti:
-                return
-            exists = db.scalar(select(TokenBlacklist.id).where(TokenBlacklist.jti == jti))
-            if not exists:
-                db.add(TokenBlacklist(jti=jti))
-                db.commit()
-        except Exception:
-            return
-
-    _revoke(access_token)
-    _revoke(refresh_token)
+    _revoke_token(access_token)
+    _revoke_token(refresh_token)
 
     _delete_cookie_auth(response)
     return {"message": "Logout realizado com sucesso"}
\ No newline at end of file
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import uuid
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import JSONResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from app.database.connection import get_async_db
+from app.models.user import Usuario
+from app.schemas.user import RegisterIn, RegisterOut
+from app.utils.jwt_handler import criar_token, verificar_token
+from app.utils.rate_limit import admitir_auth
+from app.utils.serialization import json_response
+from app.utils.user_version import get_user_versions
+from app.routes.user import (
+    ME_FROM_TOKEN,
+    LoginInput,
+    _access_payload,
+    _cpf_digits,
+    _delete_cookie_auth,
+    _find_login_user,
+    _hash_senha,
+    _insert_register,
+    _is_blacklisted,
+    _login_key,
+    _me_body,
+    _perfil_do_token,
+    _revoke_token,
+    _set_cookie_auth,
+    _user_stmt,
+    _verificar_senha,
+)
+
+# Variante async de app.routes.user (DB_MODE=async). As regras ficam nos
+# helpers síncronos de app.routes.user, executados via AsyncSession.run_sync
+# (sem hop para o threadpool).
+router = APIRouter()
+
+
+@router.post("/register", response_model=RegisterOut, status_code=status.HTTP_201_CREATED)
+async def register(payload: RegisterIn, request: Request, db: AsyncSession = Depends(get_async_db)):
+    email = payload.usuario.email.strip().lower()
+    cpf = _cpf_digits(payload.pessoa.cpf or "")
+
+    with admitir_auth(request, email):
+        senha_hash = await _hash_senha(payload.usuario.senha)
+
+        return await db.run_sync(_insert_register, payload, email, cpf, senha_hash)
+
+
+@router.post("/login", status_code=status.HTTP_200_OK)
+async def login_user(payload: LoginInput, request: Request, db: AsyncSession = Depends(get_async_db)):
+    ident = payload.usuario.strip()
+    with admitir_auth(request, _login_key(ident)):
+        user = await db.run_sync(_find_login_user, ident)
+
+        if not user or not await _verificar_senha(payload.senha, user.senha_hash):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Usuário ou senha inválidos")
+
+    access_payload = _access_payload(user)
+    refresh_payload = {"id": user.id, "sub": user.email, "tipo": "refresh", "jti": str(uuid.uuid4())}
+
+    access_token = criar_token(access_payload, expires_in=60 * 24 * 7)
+    refresh_token = criar_token(refresh_payload, expires_in=60 * 24 * 30)
+
+    resp = JSONResponse(content={"message": "Login com sucesso"})
+    _set_cookie_auth(resp, access_token=access_token, refresh_token=refresh_token)
+    return resp
+
+
+@router.get("/me")
+async def me(request: Request, db: AsyncSession = Depends(get_async_db)):
+    token = request.cookies.get("access_token")
+    if not token:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token de autenticação ausente")
+
+    payload = verificar_token(token)
+    if not payload or payload.get("tipo") != "access":
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token inválido")
+
+    if await db.run_sync(_is_blacklisted, payload.get("jti")):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token expirado ou inválido")
+
+    uid = payload.get("id")
+    try:
+        uid = int(uid)
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token inválido")
+
+    if ME_FROM_TOKEN:
+        perfil = await db.run_sync(_perfil_do_token, payload, uid)
+        if perfil is not None:
+            return json_response(perfil)
+
+    user = (await db.execute(
+        select(Usuario).options(joinedload(Usuario.pessoa)).where(Usuario.id == uid)
+    )).scalar_one_or_none()
+
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuário não encontrado")
+
+    if ME_FROM_TOKEN:
+        get_user_versions().seen(user.id, user.versao)
+    return json_response(_me_body(user))
+
+
+@router.post("/refresh")
+async def refresh(request: Request, db: AsyncSession = Depends(get_async_db)):
+    token = request.cookies.get("refresh_token")
+    if not token:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="refreshToken não fornecido")
+
+    payload = verificar_token(token)
+    if not payload or payload.get("tipo") != "refresh":
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="refreshToken inválido ou expirado")
+
+    if await db.run_sync(_is_blacklisted, payload.get("jti")):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="refreshToken inválido ou expirado")
+
+    uid = payload.get("id")
+    try:
+        uid = int(uid)
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token inválido")
+
+    user = (await db.execute(_user_stmt(uid))).scalar_one_or_none()
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuário não encontrado")
+
+    novo_access = criar_token(_access_payload(user), expires_in=60 * 24 * 7)
+
+    resp = JSONResponse(content={"message": "Token renovado"})
+    _set_cookie_auth(resp, access_token=novo_access, refresh_token=None)
+    return resp
+
+
+@router.post("/logout")
+async def logout(request: Request, response: Response):
+    _revoke_token(request.cookies.get("access_token"))
+    _revoke_token(request.cookies.get("refresh_token"))
+
+    _delete_cookie_auth(response)
+    return {"message": "Logout realizado com sucesso"}
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from datetime import date, time
+from datetime import date, datetime, time
 from typing import Optional, List
 
 from pydantic import BaseModel, Field
@@ -81,10 +81,99 @@ class ProdutoOut(BaseModel):
     preco: float
     descricao: str
     img: Optional[str] = None
+    img_thumb: Optional[str] = None
 
     model_config = {"from_attributes": True}
 
 class EventoInfoOut(BaseModel):
     evento: EventoOut
     lotes: list[LoteOut]
-    produtos: list[ProdutoOut]
\ No newline at end of file
+    produtos: list[ProdutoOut]
+
+
+# -------- Bulk (lotes / produtos) --------
+class LoteBulkItem(BaseModel):
+    preco: float = Field(..., ge=0)
+    num_lote: int = Field(..., gt=0)
+    total_vagas: int = Field(..., ge=0)
+
+
+class LoteBulkCreate(BaseModel):
+    id_evento: int
+    itens: List[LoteBulkItem] = Field(..., min_length=1, max_length=500)
+
+
+class ProdutoBulkItem(BaseModel):
+    preco: float = Field(..., ge=0)
+    descricao: str = Field(..., min_length=1, max_length=255)
+    img: Optional[str] = None  # S3 URL ou key
+
+
+class ProdutoBulkCreate(BaseModel):
+    id_evento: int
+    itens: List[ProdutoBulkItem] = Field(..., min_length=1, max_length=500)
+
+
+class BulkConflito(BaseModel):
+    indice: int  # posição do item em "itens"
+    detail: str
+
+
+class LoteBulkOut(BaseModel):
+    criados: list[LoteOut]
+    conflitos: list[BulkConflito]
+
+
+# produtos não têm conflito por item na criação (só o evento inexistente, 404)
+class ProdutoBulkOut(BaseModel):
+    criados: list[ProdutoOut]
+
+
+# campos ausentes (ou null) mantêm o valor atual; em produto, img null limpa a imagem
+class LoteBulkUpdateItem(BaseModel):
+    id: int
+    preco: Optional[float] = Field(None, ge=0)
+    num_lote: Optional[int] = Field(None, gt=0)
+    total_vagas: Optional[int] = Field(None, ge=0)
+
+
+class LoteBulkUpdate(BaseModel):
+    id_evento: int
+    itens: List[LoteBulkUpdateItem] = Field(..., min_length=1, max_length=500)
+
+
+class LoteBulkUpdateOut(BaseModel):
+    atualizados: list[LoteOut]
+    conflitos: list[BulkConflito]
+
+
+class ProdutoBulkUpdateItem(BaseModel):
+    id: int
+    preco: Optional[float] = Field(None, ge=0)
+    descricao: Optional[str] = Field(None, min_length=1, max_length=255)
+    img: Optional[str] = None
+
+
+class ProdutoBulkUpdate(BaseModel):
+    id_evento: int
+    itens: List[ProdutoBulkUpdateItem] = Field(..., min_length=1, max_length=500)
+
+
+class ProdutoBulkUpdateOut(BaseModel):
+    atualizados: list[ProdutoOut]
+    conflitos: list[BulkConflito]
+
+
+# -------- Reserva de vagas --------
+class ReservaCreate(BaseModel):
+    quantidade: int = Field(1, ge=1, le=10)
+
+
+class ReservaOut(BaseModel):
+    codigo: str
+    id_lote: int
+    quantidade: int
+    status: str
+    expira_em: Optional[datetime] = None
+    vagas_restantes: Optional[int] = None
+
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from fastapi import Request, Response
+
+from app.config import get_settings
+from app.database.replicas import _le_do_primario, get_replica_router
+
+# =========================
+# CACHE DO CATÁLOGO (eventos/lotes/produtos)
+# =========================
+# As respostas de leitura ficam em memória já serializadas, indexadas pela
+# versão do catálogo no momento em que foram montadas:
+#   - versão por evento: muda em qualquer escrita do evento, dos seus lotes
+#     ou dos seus produtos;
+#   - versão global: muda em qualquer escrita (usada pelas listagens sem
+#     filtro de evento).
+# Os handlers de escrita chamam bump(id_evento); as entradas antigas deixam de
+# casar e são substituídas na próxima leitura.
+#
+# A versão é por worker. Escritas feitas em outro worker só aparecem aqui
+# depois de CATALOG_CACHE_TTL segundos, quando a entrada expira.
+#
+# Com réplicas de leitura (app.database.replicas):
+#   - quem está na janela read-your-writes (cookie ryw_ate) não lê do cache:
+#     a entrada pode ter vindo de uma réplica atrasada. O corpo montado no
+#     primário ainda é guardado, já que é o mais novo que existe;
+#   - um corpo montado na réplica até READ_YOUR_WRITES_SECONDS depois de um
+#     bump não é guardado: a réplica pode não ter a escrita ainda, e a versão
+#     nova ficaria presa ao dado velho até o TTL.
+#
+# O ETag é o hash do corpo: é o mesmo em todos os workers, então um
+# If-None-Match vale em qualquer um deles (e responde 304).
+
+Version = int
+Build = Callable[[], Tuple[bytes, Dict[str, str]]]
+
+
+@dataclass
+class _Entry:
+    version: Version
+    expires_at: float
+    body: bytes
+    etag: str
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in (t.strip().removeprefix("W/") for t in header.split(","))
+
+
+class CatalogCache:
+    def __init__(self, max_entries: int, ttl: float) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._global = 0
+        self._por_evento: Dict[int, int] = {}
+        # monotonic do último bump (global e por evento)
+        self._global_bump_at = float("-inf")
+        self._bump_at: Dict[int, float] = {}
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def version(self, evento_id: Optional[int]) -> Version:
+        with self._lock:
+            if evento_id is None:
+                return self._global
+            return self._por_evento.get(evento_id, 0)
+
+    def bump(self, evento_id: Optional[int] = None) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._global += 1
+            self._global_bump_at = now
+            if evento_id is not None:
+                self._por_evento[evento_id] = self._por_evento.get(evento_id, 0) + 1
+                self._bump_at[evento_id] = now
+
+    def bumped_within(self, evento_id: Optional[int], seconds: float) -> bool:
+        with self._lock:
+            if evento_id is None:
+                at = self._global_bump_at
+            else:
+                at = self._bump_at.get(evento_id, float("-inf"))
+        return time.monotonic() - at < seconds
+
+    def get(self, key: Hashable, evento_id: Optional[int]) -> Optional[_Entry]:
+        version = self.version(evento_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.version != version or entry.expires_at < time.monotonic():
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: Hashable, version: Version, body: bytes, headers: Dict[str, str]) -> _Entry:
+        entry = _Entry(version, time.monotonic() + self.ttl, body, _etag(body), headers)
+        if self.ttl <= 0:
+            return entry
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def respond(self, request: Request, entry: _Entry) -> Response:
+        headers = {"ETag": entry.etag, "Cache-Control": "no-cache", **entry.headers}
+        if _etag_matches(request, entry.etag):
+            with self._lock:
+                self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+            }
+
+
+_cache: Optional[CatalogCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_catalog_cache() -> CatalogCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                settings = get_settings()
+                _cache = CatalogCache(max_entries=settings.catalog_cache_size, ttl=settings.catalog_cache_ttl)
+    return _cache
+
+
+def bump_catalog(evento_id: Optional[int] = None) -> None:
+    get_catalog_cache().bump(evento_id)
+
+
+def _origem(request: Request) -> Tuple[bool, bool]:
+    # (lê do primário por read-your-writes, monta na réplica)
+    if get_replica_router() is None:
+        return False, False
+    primario = _le_do_primario(request)
+    return primario, not primario
+
+
+def _guardar(
+    cache: CatalogCache, key: Hashable, evento_id: Optional[int], version: Version,
+    body: bytes, headers: Dict[str, str], da_replica: bool,
+) -> _Entry:
+    if da_replica and cache.bumped_within(evento_id, get_settings().read_your_writes_seconds):
+        # só o ETag, sem entrar no cache
+        return _Entry(version, 0.0, body, _etag(body), headers)
+    return cache.put(key, version, body, headers)
+
+
+def cached_response(request: Request, key: Hashable, evento_id: Optional[int], build: Build) -> Response:
+    cache = get_catalog_cache()
+    primario, da_replica = _origem(request)
+    entry = None if primario else cache.get(key, evento_id)
+    if entry is None:
+        # versão lida ANTES de montar: uma escrita concorrente invalida o resultado
+        version = cache.version(evento_id)
+        body, headers = build()
+        entry = _guardar(cache, key, evento_id, version, body, headers, da_replica)
+    return cache.respond(request, entry)
+
+
+async def cached_response_async(
+    request: Request,
+    key: Hashable,
+    evento_id: Optional[int],
+    build: Callable[[], Awaitable[Tuple[bytes, Dict[str, str]]]],
+) -> Response:
+    # as rotas async leem do primário (get_async_db); com réplicas configuradas
+    # as regras acima valem igual, do lado seguro
+    cache = get_catalog_cache()
+    primario, da_replica = _origem(request)
+    entry = None if primario else cache.get(key, evento_id)
+    if entry is None:
+        version = cache.version(evento_id)
+        body, headers = await build()
+        entry = _guardar(cache, key, evento_id, version, body, headers, da_replica)
+    return cache.respond(request, entry)
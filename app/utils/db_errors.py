@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+
+# =========================
+# CONFLITOS VIA CONSTRAINT
+# =========================
+# As escritas não fazem SELECT antes para checar duplicidade: o INSERT/UPDATE
+# vai direto e a constraint violada vira o 409 (ou 404, no caso de FK) de
+# sempre. Sem corrida entre o SELECT e o INSERT e sem o round trip extra.
+#
+# Nomes das constraints: os declarados nos models e, nas FKs, o padrão do
+# Postgres (<tabela>_<coluna>_fkey).
+
+Conflitos = Dict[str, Tuple[int, str]]
+
+
+def constraint_name(err: IntegrityError) -> Optional[str]:
+    orig = err.orig
+    # psycopg2
+    diag = getattr(orig, "diag", None)
+    if diag is not None and getattr(diag, "constraint_name", None):
+        return diag.constraint_name
+    # asyncpg (o adaptador do SQLAlchemy encadeia a exceção original)
+    return getattr(getattr(orig, "__cause__", None), "constraint_name", None)
+
+
+@contextmanager
+def conflitos_http(conflitos: Conflitos) -> Iterator[None]:
+    # quem chama não precisa dar rollback: o get_db fecha a sessão
+    try:
+        yield
+    except IntegrityError as err:
+        erro = conflitos.get(constraint_name(err) or "")
+        if erro is None:
+            raise
+        raise HTTPException(status_code=erro[0], detail=erro[1]) from err
@@ -1,17 +1,20 @@
 from __future__ import annotations
 
-import os
+import hashlib
+import threading
+import time
 import uuid
 import datetime as dt
-from typing import Any, Dict, Optional
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
 
 from jose import jwt, JWTError
-from dotenv import load_dotenv
 
-load_dotenv()
+from app.config import get_settings
+from app.utils.metrics import JWT_VERIFY
 
-SECRET_KEY = os.getenv("SECRET_KEY", "CHANGE_ME")
-ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
+SECRET_KEY = get_settings().secret_key
+ALGORITHM = get_settings().jwt_algorithm
 
 
 def criar_token(payload: Dict[str, Any], expires_in: int) -> str:
@@ -29,18 +32,91 @@ def criar_token(payload: Dict[str, Any], expires_in: int) -> str:
     return jwt.encode(data, SECRET_KEY, algorithm=ALGORITHM)
 
 
+# =========================
+# CACHE DE TOKENS VERIFICADOS
+# =========================
+# O navegador manda o mesmo access_token em toda chamada durante 7 dias.
+# Tokens já verificados ficam num LRU (chave: sha256 do token) com o payload,
+# até o exp do próprio token; repetir a verificação vira um lookup. Tokens
+# inválidos não entram no cache. A revogação (blacklist) continua sendo
+# checada à parte, em toda requisição.
+
+class _VerifiedTokenCache:
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[bytes, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    def get(self, key: bytes) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            payload, exp = entry
+            if exp <= time.time():
+                del self._entries[key]
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        # cópia: quem chama pode alterar o dict
+        return dict(payload)
+
+    def put(self, key: bytes, payload: Dict[str, Any]) -> None:
+        exp = payload.get("exp")
+        if self.max_entries <= 0 or not isinstance(exp, (int, float)):
+            return
+        with self._lock:
+            self._entries[key] = (dict(payload), float(exp))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+            }
+
+
+_verified = _VerifiedTokenCache(get_settings().jwt_cache_size)
+
+
+def token_cache_stats() -> Dict[str, Any]:
+    return _verified.stats()
+
+
 def verificar_token(token: str) -> Optional[Dict[str, Any]]:
     """
     Valida assinatura e expiração.
     Retorna payload (dict) ou None.
     """
+    if not token:
+        return None
+    key = hashlib.sha256(token.encode()).digest()
+    payload = _verified.get(key)
+    if payload is not None:
+        JWT_VERIFY.inc(("cache_hit",))
+        return payload
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        if not isinstance(payload, dict):
-            return None
-        return payload
     except JWTError:
+        payload = None
+    if not isinstance(payload, dict):
+        JWT_VERIFY.inc(("invalid",))
         return None
+    JWT_VERIFY.inc(("ok",))
+    _verified.put(key, payload)
+    return payload
 
 
 def decode_token(token: str) -> Optional[Dict[str, Any]]:
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import base64
+import json
+from datetime import date
+from typing import Any, Callable, Sequence, TypeVar
+
+from fastapi import HTTPException, Query
+from sqlalchemy import Select, tuple_
+
+T = TypeVar("T")
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Paginação por keyset: o cursor carrega os valores da ordenação da última
+# linha devolvida e a próxima página começa com WHERE (chaves) < (cursor).
+# O custo da página não depende de quão fundo o cliente já foi (sem OFFSET).
+# A resposta continua sendo a lista; o cursor seguinte vai no header
+# X-Next-Cursor (ausente na última página).
+
+
+def page_limit(limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)) -> int:
+    return limit
+
+
+def encode_cursor(*values: Any) -> str:
+    raw = json.dumps([v.isoformat() if isinstance(v, date) else v for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, *parsers: Callable[[Any], Any]) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(parsers):
+            raise ValueError
+        return tuple(parse(v) for parse, v in zip(parsers, values))
+    except Exception:
+        raise HTTPException(status_code=400, detail="cursor inválido")
+
+
+def apply_keyset(
+    stmt: Select,
+    keys: Sequence[Any],
+    parsers: Sequence[Callable[[Any], Any]],
+    cursor: str | None,
+    limit: int,
+) -> Select:
+    """Filtra a partir do cursor (ordem DESC em todas as chaves) e busca limit + 1."""
+    if cursor:
+        values = decode_cursor(cursor, *parsers)
+        stmt = stmt.where(tuple_(*keys) < tuple_(*values))
+    return stmt.limit(limit + 1)
+
+
+def split_page(rows: Sequence[T], limit: int, key: Callable[[T], tuple]) -> tuple[list[T], str | None]:
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(*key(rows[-1]))
+
@@ -1,7 +1,17 @@
 from __future__ import annotations
 
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
 from passlib.context import CryptContext
 
+from app.config import get_settings
+from app.utils.metrics import HASH_DURATION
+
 _pwd_context = CryptContext(
     schemes=["argon2"],
     deprecated="auto",
@@ -19,4 +29,137 @@ def verify_password(password: str, password_hash: str) -> bool:
     try:
         return _pwd_context.verify(password, password_hash)
     except Exception:
-        return False
\ No newline at end of file
+        return False
+
+
+# =========================
+# EXECUTOR DEDICADO (Argon2)
+# =========================
+# O Argon2 custa dezenas de ms de CPU por chamada. Rodar isso no threadpool
+# compartilhado do AnyIO faz um pico de login travar as rotas de /event/*.
+# Aqui o hash roda num pool próprio, com fila limitada: quando a fila enche,
+# a chamada falha na hora (HashQueueFull) em vez de acumular latência.
+
+class HashQueueFull(RuntimeError):
+    pass
+
+
+class _HashExecutor:
+    def __init__(self, kind: str, workers: int, max_queue: int) -> None:
+        self.kind = kind
+        self.workers = workers
+        self.max_queue = max_queue
+
+        self._pool: Executor
+        if kind == "process":
+            # nada de fork de um servidor com threads (locks herdados travados)
+            ctx = multiprocessing.get_context("forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
+            self._pool = ProcessPoolExecutor(max_workers=workers, mp_context=ctx)
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="argon2")
+
+        # vagas = workers ocupados + itens aguardando na fila
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._rejected = 0
+        self._completed = 0
+        self._total_seconds = 0.0
+        self._max_seconds = 0.0
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise HashQueueFull("Fila de hash de senha cheia")
+
+        with self._lock:
+            self._in_flight += 1
+        started = time.perf_counter()
+        op = (fn.__name__.removesuffix("_password"),)  # hash | verify
+
+        def _done(_: Future) -> None:
+            elapsed = time.perf_counter() - started
+            HASH_DURATION.observe(elapsed, op)
+            with self._lock:
+                self._in_flight -= 1
+                self._completed += 1
+                self._total_seconds += elapsed
+                if elapsed > self._max_seconds:
+                    self._max_seconds = elapsed
+            self._slots.release()
+
+        try:
+            fut = self._pool.submit(fn, *args)
+        except BaseException:
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+            raise
+        fut.add_done_callback(_done)
+        return fut
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            in_flight = self._in_flight
+            completed = self._completed
+            total = self._total_seconds
+            return {
+                "executor": self.kind,
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": in_flight,
+                "queue_depth": max(0, in_flight - self.workers),
+                "rejected": self._rejected,
+                "completed": completed,
+                "avg_ms": round(total / completed * 1000, 3) if completed else 0.0,
+                "max_ms": round(self._max_seconds * 1000, 3),
+            }
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=True)
+
+
+_executor: Optional[_HashExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> _HashExecutor:
+    # criado no primeiro uso, com o .env já carregado (app.config)
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                settings = get_settings()
+                _executor = _HashExecutor(
+                    kind=settings.hash_executor,
+                    workers=settings.hash_workers,
+                    max_queue=settings.hash_max_queue,
+                )
+    return _executor
+
+
+async def hash_password_async(password: str) -> str:
+    if not password or not isinstance(password, str):
+        raise ValueError("Senha inválida")
+    return await asyncio.wrap_future(_get_executor().submit(hash_password, password))
+
+
+async def verify_password_async(password: str, password_hash: str) -> bool:
+    if not password or not password_hash:
+        return False
+    return await asyncio.wrap_future(_get_executor().submit(verify_password, password, password_hash))
+
+
+def hash_stats() -> Optional[Dict[str, Any]]:
+    # None antes do primeiro hash: ler stats não cria o executor
+    executor = _executor
+    return executor.stats() if executor is not None else None
+
+
+def shutdown_hash_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown()
+            _executor = None
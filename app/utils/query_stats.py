@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import get_settings
+
+logger = logging.getLogger("app.requests")
+
+# =========================
+# CONSULTAS POR REQUISIÇÃO
+# =========================
+# Os hooks before/after_cursor_execute do engine somam, na requisição
+# corrente (ContextVar), o nº de statements e o tempo de banco. O middleware
+# abre a contagem, devolve tudo no header Server-Timing (db, app, total) e
+# grava uma linha de log por requisição:
+#
+#   method=GET route=/event/eventos/{evento_id} status=200 queries=1 db_ms=0.8 app_ms=0.4 total_ms=1.2
+#
+# A ContextVar guarda um objeto mutável: os handlers sync rodam no threadpool
+# com uma cópia do contexto e somam no mesmo objeto.
+#
+# QUERY_BUDGET > 0 marca (log WARNING) as requisições que passam do limite de
+# statements; com QUERY_BUDGET_STRICT o statement excedente falha com
+# QueryBudgetExceeded — para pegar N+1 nos testes/dev.
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+@dataclass
+class RequestStats:
+    budget: int = 0
+    strict: bool = False
+    queries: int = 0
+    db_seconds: float = 0.0
+    started: float = field(default_factory=time.perf_counter)
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_query_stats", default=None)
+
+
+def current_stats() -> Optional[RequestStats]:
+    return _current.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = _current.get()
+    if stats is None:
+        return
+    stats.queries += 1
+    if stats.strict and stats.budget and stats.queries > stats.budget:
+        raise QueryBudgetExceeded(f"Requisição passou de {stats.budget} statements")
+    conn.info.setdefault("query_stats_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = _current.get()
+    starts: List[float] = conn.info.get("query_stats_start") or []
+    if stats is None or not starts:
+        return
+    stats.db_seconds += time.perf_counter() - starts.pop()
+
+
+def _handle_error(context) -> None:
+    # statement que falhou não passa pelo after_cursor_execute
+    starts = context.connection.info.get("query_stats_start") if context.connection is not None else None
+    stats = _current.get()
+    if starts and stats is not None:
+        stats.db_seconds += time.perf_counter() - starts.pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+class QueryStatsMiddleware:
+    # ASGI puro (sem BaseHTTPMiddleware): não cria task nem copia o corpo
+    def __init__(self, app: Any) -> None:
+        self.app = app
+        settings = get_settings()
+        self.enabled = settings.query_stats
+        self.header = settings.server_timing
+        self.budget = settings.query_budget
+        self.strict = settings.query_budget_strict
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(budget=self.budget, strict=self.strict)
+        token = _current.set(stats)
+        status_code = 500
+
+        async def send_wrapper(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.header:
+                    headers = list(message.get("headers") or [])
+                    headers.append((b"server-timing", _server_timing(stats).encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            self._log(scope, stats, status_code)
+
+    def _log(self, scope, stats: RequestStats, status_code: int) -> None:
+        total_ms = (time.perf_counter() - stats.started) * 1000
+        db_ms = stats.db_seconds * 1000
+        route = route_template(scope) or scope.get("path")
+        over = bool(self.budget) and stats.queries > self.budget
+        logger.log(
+            logging.WARNING if over else logging.INFO,
+            "method=%s route=%s status=%s queries=%s db_ms=%.1f app_ms=%.1f total_ms=%.1f%s",
+            scope.get("method"),
+            route,
+            status_code,
+            stats.queries,
+            db_ms,
+            max(0.0, total_ms - db_ms),
+            total_ms,
+            f" query_budget={self.budget} exceeded" if over else "",
+        )
+
+
+def route_template(scope) -> Optional[str]:
+    # template da rota como montado no app (/event/eventos/{evento_id}).
+    # route.path pode vir sem o prefixo do include_router (FastAPI recente
+    # não copia as rotas incluídas); o prefixo é o que sobra do path da
+    # requisição depois do trecho que a rota casou.
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if template is None:
+        return None
+    convertors = getattr(route, "param_convertors", {})
+    params = scope.get("path_params") or {}
+    try:
+        casado = template.format(**{
+            k: convertors[k].to_string(v) if k in convertors else v for k, v in params.items()
+        })
+    except (KeyError, IndexError, ValueError, AssertionError):
+        return template
+    path = scope.get("path") or ""
+    root_path = scope.get("root_path") or ""
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path):]
+    if not path.endswith(casado):
+        return template
+    return path[: len(path) - len(casado)] + template
+
+
+def _server_timing(stats: RequestStats) -> str:
+    # no início da resposta: o que roda no corpo (streaming) só entra no log
+    total_ms = (time.perf_counter() - stats.started) * 1000
+    db_ms = stats.db_seconds * 1000
+    return (
+        f'db;dur={db_ms:.1f};desc="{stats.queries} queries", '
+        f"app;dur={max(0.0, total_ms - db_ms):.1f}, "
+        f"total;dur={total_ms:.1f}"
+    )
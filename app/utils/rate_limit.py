@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+
+from app.config import get_settings
+
+# =========================
+# CONTROLE DE ADMISSÃO (login/register)
+# =========================
+# login e register gastam dezenas de ms de CPU no Argon2. Antes de qualquer
+# hash, a requisição passa por:
+#   - token bucket por IP (AUTH_RATE_IP_PER_MIN / AUTH_RATE_IP_BURST);
+#   - token bucket por identificador — e-mail/CPF do login, e-mail do
+#     register (AUTH_RATE_IDENT_PER_MIN / AUTH_RATE_IDENT_BURST);
+#   - limite global de requisições de auth em andamento (AUTH_MAX_IN_FLIGHT).
+# Estouro de bucket responde 429 e estouro do limite global 503, ambos com
+# Retry-After e sem tocar no banco nem no executor de hash. Taxa 0 desliga o
+# bucket correspondente.
+#
+# Os buckets são por worker, em memória, limitados a AUTH_RATE_MAX_KEYS
+# chaves (LRU). Com N workers o limite efetivo por IP é até N vezes maior.
+#
+# Os dois buckets são conferidos antes de gastar de qualquer um: um e-mail
+# barrado não consome o orçamento do IP (nem o contrário).
+#
+# Com AUTH_TRUST_FORWARDED o IP vem do X-Forwarded-For, contado da direita:
+# cada um dos AUTH_TRUSTED_HOPS proxies confiáveis acrescenta o endereço de quem
+# o chamou, e o que está à esquerda disso o cliente escreve como quiser.
+
+
+class _TokenBuckets:
+    def __init__(self, per_minute: float, burst: int, max_keys: int) -> None:
+        self.rate = per_minute / 60.0
+        self.burst = max(1, burst)
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        # chave -> (tokens, instante da última recarga)
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self.rejected = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def _tokens(self, key: str, now: float) -> float:
+        tokens, last = self._buckets.get(key, (float(self.burst), now))
+        return min(float(self.burst), tokens + (now - last) * self.rate)
+
+    def wait(self, key: str) -> float:
+        # 0 = há token; senão, segundos até haver um (conta como rejeição).
+        # Não gasta nada.
+        if not self.enabled:
+            return 0.0
+        with self._lock:
+            tokens = self._tokens(key, time.monotonic())
+            if tokens >= 1.0:
+                return 0.0
+            self.rejected += 1
+            return (1.0 - tokens) / self.rate
+
+    def take(self, key: str) -> None:
+        # gasta um token (quem chama já conferiu com wait)
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._buckets[key] = (max(0.0, self._tokens(key, now) - 1.0), now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._buckets)
+
+
+class AuthAdmission:
+    def __init__(
+        self,
+        ip_buckets: _TokenBuckets,
+        ident_buckets: _TokenBuckets,
+        max_in_flight: int,
+        trust_forwarded: bool = False,
+        trusted_hops: int = 1,
+    ) -> None:
+        self.ip = ip_buckets
+        self.ident = ident_buckets
+        self.max_in_flight = max_in_flight
+        self.trust_forwarded = trust_forwarded
+        self.trusted_hops = max(1, trusted_hops)
+        self._lock = threading.Lock()
+        # conferir e gastar os dois buckets de uma vez
+        self._buckets_lock = threading.Lock()
+        self._in_flight = 0
+        self.overloaded = 0
+
+    def client_ip(self, request: Request) -> str:
+        if self.trust_forwarded:
+            forwarded = [h.strip() for h in request.headers.get("x-forwarded-for", "").split(",") if h.strip()]
+            # menos entradas que proxies: o header não veio pela cadeia esperada
+            if len(forwarded) >= self.trusted_hops:
+                return forwarded[-self.trusted_hops]
+        return request.client.host if request.client else "-"
+
+    @contextmanager
+    def admit(self, request: Request, ident: Optional[str]) -> Iterator[None]:
+        ip = self.client_ip(request)
+        with self._buckets_lock:
+            wait = self.ip.wait(ip)
+            if not wait and ident:
+                wait = self.ident.wait(ident)
+            if not wait:
+                self.ip.take(ip)
+                if ident:
+                    self.ident.take(ident)
+        if wait:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Muitas tentativas, aguarde antes de tentar novamente",
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
+
+        with self._lock:
+            if self.max_in_flight > 0 and self._in_flight >= self.max_in_flight:
+                self.overloaded += 1
+                busy = True
+            else:
+                self._in_flight += 1
+                busy = False
+        if busy:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Servidor ocupado, tente novamente em instantes",
+                headers={"Retry-After": "1"},
+            )
+
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            in_flight = self._in_flight
+            overloaded = self.overloaded
+        return {
+            "in_flight": in_flight,
+            "max_in_flight": self.max_in_flight,
+            "rejected_overloaded": overloaded,
+            "rejected_ip": self.ip.rejected,
+            "rejected_ident": self.ident.rejected,
+            "tracked_ips": len(self.ip),
+            "tracked_idents": len(self.ident),
+        }
+
+
+_admission: Optional[AuthAdmission] = None
+_admission_lock = threading.Lock()
+
+
+def get_auth_admission() -> AuthAdmission:
+    global _admission
+    if _admission is None:
+        with _admission_lock:
+            if _admission is None:
+                settings = get_settings()
+                _admission = AuthAdmission(
+                    ip_buckets=_TokenBuckets(
+                        per_minute=settings.auth_rate_ip_per_min,
+                        burst=settings.auth_rate_ip_burst,
+                        max_keys=settings.auth_rate_max_keys,
+                    ),
+                    ident_buckets=_TokenBuckets(
+                        per_minute=settings.auth_rate_ident_per_min,
+                        burst=settings.auth_rate_ident_burst,
+                        max_keys=settings.auth_rate_max_keys,
+                    ),
+                    max_in_flight=settings.auth_max_in_flight,
+                    trust_forwarded=settings.auth_trust_forwarded,
+                    trusted_hops=settings.auth_trusted_hops,
+                )
+    return _admission
+
+
+def admitir_auth(request: Request, ident: Optional[str]):
+    return get_auth_admission().admit(request, ident)
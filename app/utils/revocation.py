@@ -0,0 +1,400 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database.connection import SessionLocal
+from app.models.user import TokenBlacklist
+
+logger = logging.getLogger(__name__)
+
+
+# =========================
+# CACHE DE REVOGAÇÃO (JTI)
+# =========================
+# Quase toda checagem de blacklist responde "não revogado". O Bloom filter
+# responde esse caso sem ir ao banco; um LRU com TTL guarda os JTIs que já
+# sabemos estar revogados. Só um positivo do Bloom que não está no LRU
+# (falso positivo ou entrada expirada) consulta o tb_blacklist.
+#
+# Cada worker tem o seu cache. Revogações feitas por outros workers chegam
+# por uma sincronização incremental, no máximo a cada REVOCATION_SYNC_SECONDS.
+# O corte é por data_insercao, não por id: ids de sequência não ficam
+# visíveis na ordem do commit, e um id menor comitado depois de um maior
+# seria pulado para sempre. data_insercao é o now() do início da transação,
+# então cada sync relê REVOCATION_SYNC_OVERLAP segundos antes do último
+# corte, cobrindo transações que comitam depois dele.
+#
+# A carga completa (varredura do tb_blacklist) nunca roda numa requisição: o
+# lifespan aquece no boot e, se o cache ainda está frio ou o filtro passou da
+# capacidade, uma thread reconstrói o filtro e troca no fim. Até lá as
+# checagens seguem com o filtro atual (ou, frio, vão ao banco).
+
+class _BloomFilter:
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        capacity = max(1, capacity)
+        bits = int(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        self.capacity = capacity
+        self.num_bits = max(8, bits)
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class RevocationCache:
+    def __init__(
+        self,
+        capacity: int,
+        error_rate: float,
+        lru_size: int,
+        lru_ttl: float,
+        sync_seconds: float,
+        sync_overlap: float,
+    ) -> None:
+        self.error_rate = error_rate
+        self.lru_size = lru_size
+        self.lru_ttl = lru_ttl
+        self.sync_seconds = sync_seconds
+        self.sync_overlap = timedelta(seconds=sync_overlap)
+
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._bloom = _BloomFilter(capacity, error_rate)
+        self._revoked: "OrderedDict[str, float]" = OrderedDict()
+        # corte da última sincronização (relógio do banco, data_insercao)
+        self._since: Optional[datetime] = None
+        self._last_sync = 0.0
+        self._warm = False
+        self._rebuilding = False
+        self._last_rebuild = float("-inf")
+
+        self.hits_negative = 0
+        self.hits_revoked = 0
+        self.db_lookups = 0
+
+    # ---- carga a partir do banco ----
+    def warm(self, db: Session) -> None:
+        # corte lido antes da varredura: o que entrar durante ela vem no sync
+        agora = db.scalar(select(func.localtimestamp()))
+        total = db.scalar(select(func.count(TokenBlacklist.id))) or 0
+        capacity = max(self._bloom.capacity, total * 2)
+        bloom = _BloomFilter(capacity, self.error_rate)
+
+        for jti in db.execute(select(TokenBlacklist.jti).execution_options(yield_per=5000)).scalars():
+            bloom.add(jti)
+
+        with self._lock:
+            # revogações deste worker ainda na fila do RevocationWriter
+            for jti in self._revoked:
+                if jti not in bloom:
+                    bloom.add(jti)
+            self._bloom = bloom
+            self._since = agora
+            self._last_sync = time.monotonic()
+            self._warm = True
+        logger.info("Cache de revogação aquecido com %s JTIs", bloom.count)
+
+    def _rebuild(self) -> None:
+        try:
+            with SessionLocal() as db:
+                self.warm(db)
+        except Exception:
+            logger.exception("Falha ao reconstruir o cache de revogação")
+        finally:
+            with self._lock:
+                self._rebuilding = False
+
+    def _rebuild_in_background(self) -> None:
+        # uma reconstrução por vez, e no máximo uma tentativa por intervalo de
+        # sync se o banco estiver fora
+        with self._lock:
+            if self._rebuilding or time.monotonic() - self._last_rebuild < self.sync_seconds:
+                return
+            self._rebuilding = True
+            self._last_rebuild = time.monotonic()
+        threading.Thread(target=self._rebuild, name="revocation-rebuild", daemon=True).start()
+
+    def sync(self, db: Session) -> None:
+        if not self._warm:
+            self._rebuild_in_background()
+            return
+        if self._bloom.count > self._bloom.capacity:
+            # o filtro cheio segue valendo (com mais falsos positivos) até a troca
+            self._rebuild_in_background()
+
+        agora = db.scalar(select(func.localtimestamp()))
+        jtis = db.execute(
+            select(TokenBlacklist.jti).where(TokenBlacklist.data_insercao > self._since - self.sync_overlap)
+        ).scalars().all()
+
+        with self._lock:
+            for jti in jtis:
+                # a janela de folga relê linhas já vistas; não contam de novo
+                if jti not in self._bloom:
+                    self._bloom.add(jti)
+            self._since = agora
+            self._last_sync = time.monotonic()
+
+    def _maybe_sync(self, db: Session) -> None:
+        if self._warm and time.monotonic() - self._last_sync < self.sync_seconds:
+            return
+        # só uma thread sincroniza; as outras seguem com o filtro atual. Nunca
+        # espera o lock: no DB_MODE=async isto roda via run_sync na thread do
+        # event loop, e quem segura o lock está parado num await de I/O dela.
+        if not self._sync_lock.acquire(blocking=False):
+            return
+        try:
+            if not self._warm or time.monotonic() - self._last_sync >= self.sync_seconds:
+                self.sync(db)
+        finally:
+            self._sync_lock.release()
+
+    # ---- LRU dos revogados conhecidos ----
+    def _remember(self, jti: str, exp: Optional[float] = None) -> None:
+        ttl = self.lru_ttl
+        if exp is not None:
+            # depois do exp o token já é recusado pela assinatura/expiração
+            ttl = max(0.0, min(ttl, exp - time.time()))
+        self._revoked[jti] = time.monotonic() + ttl
+        self._revoked.move_to_end(jti)
+        while len(self._revoked) > self.lru_size:
+            self._revoked.popitem(last=False)
+
+    def _known_revoked(self, jti: str) -> bool:
+        expires_at = self._revoked.get(jti)
+        if expires_at is None:
+            return False
+        if expires_at < time.monotonic():
+            del self._revoked[jti]
+            return False
+        self._revoked.move_to_end(jti)
+        return True
+
+    # ---- API ----
+    def add(self, jti: str, exp: Optional[float] = None) -> None:
+        with self._lock:
+            self._bloom.add(jti)
+            self._remember(jti, exp)
+
+    def is_revoked(self, db: Session, jti: str) -> bool:
+        self._maybe_sync(db)
+
+        with self._lock:
+            # ainda frio (outra requisição aquecendo): o filtro não vale, vai ao banco
+            if self._warm and jti not in self._bloom:
+                self.hits_negative += 1
+                return False
+            if self._known_revoked(jti):
+                self.hits_revoked += 1
+                return True
+            self.db_lookups += 1
+
+        revoked = db.scalar(select(TokenBlacklist.id).where(TokenBlacklist.jti == jti)) is not None
+        if revoked:
+            with self._lock:
+                self._remember(jti)
+        return revoked
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "warm": self._warm,
+                "rebuilding": self._rebuilding,
+                "bloom_items": self._bloom.count,
+                "bloom_capacity": self._bloom.capacity,
+                "lru_items": len(self._revoked),
+                "hits_negative": self.hits_negative,
+                "hits_revoked": self.hits_revoked,
+                "db_lookups": self.db_lookups,
+            }
+
+
+_cache: Optional[RevocationCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_revocation_cache() -> RevocationCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                settings = get_settings()
+                _cache = RevocationCache(
+                    capacity=settings.revocation_bloom_capacity,
+                    error_rate=settings.revocation_bloom_error_rate,
+                    lru_size=settings.revocation_lru_size,
+                    lru_ttl=settings.revocation_lru_ttl,
+                    sync_seconds=settings.revocation_sync_seconds,
+                    sync_overlap=settings.revocation_sync_overlap,
+                )
+    return _cache
+
+
+# =========================
+# GRAVAÇÃO EM LOTE (write-behind)
+# =========================
+# O logout não espera o banco: o JTI entra no cache deste worker na hora (já
+# vale aqui) e numa fila em memória. Uma thread grava a fila em lotes com
+# INSERT ... ON CONFLICT (jti) DO NOTHING a cada REVOCATION_FLUSH_SECONDS, ou
+# antes quando a fila chega a REVOCATION_FLUSH_BATCH. Os outros workers veem a
+# revogação depois do flush + a sincronização deles.
+#
+# Cada lote é comitado na própria transação. shutdown_revocation_writer()
+# (lifespan) grava o que restou. Se o banco falha, os lotes ainda não gravados
+# voltam para a fila e são tentados de novo; acima de REVOCATION_QUEUE_MAX
+# itens pendentes o próprio logout grava (backpressure).
+
+class RevocationWriter:
+    def __init__(self, flush_seconds: float, batch_size: int, max_queue: int) -> None:
+        self.flush_seconds = flush_seconds
+        self.batch_size = max(1, batch_size)
+        self.max_queue = max(self.batch_size, max_queue)
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._pending: Dict[str, Optional[float]] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+        self.enqueued = 0
+        self.written = 0
+        self.flushes = 0
+        self.failures = 0
+
+    def _start(self) -> None:
+        if self._thread is None and not self._stopped:
+            self._thread = threading.Thread(target=self._run, name="revocation-writer", daemon=True)
+            self._thread.start()
+
+    def enqueue(self, jti: str, exp: Optional[float]) -> None:
+        with self._lock:
+            self._pending[jti] = exp
+            self.enqueued += 1
+            pending = len(self._pending)
+            self._start()
+            inline = self._stopped
+        if inline or pending >= self.max_queue:
+            self.flush()
+        elif pending >= self.batch_size:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return 0
+            itens = list(batch.items())
+            gravados = 0
+            try:
+                with SessionLocal() as db:
+                    for start in range(0, len(itens), self.batch_size):
+                        chunk = itens[start:start + self.batch_size]
+                        self._write(db, chunk)
+                        gravados += len(chunk)
+            except Exception:
+                logger.exception("Falha ao gravar %s revogações; ficam na fila", len(itens) - gravados)
+                with self._lock:
+                    self.failures += 1
+                    for jti, exp in itens[gravados:]:
+                        self._pending.setdefault(jti, exp)
+            with self._lock:
+                self.written += gravados
+                if gravados:
+                    self.flushes += 1
+            return gravados
+
+    def _write(self, db: Session, chunk) -> None:
+        # uma transação curta por lote: data_insercao (now() do início da
+        # transação) fica colado no commit, bem dentro da folga da sincronização
+        # dos outros workers (RevocationCache, REVOCATION_SYNC_OVERLAP)
+        # exp é timestamp sem fuso, em UTC: um valor com fuso seria convertido
+        # pelo TimeZone da sessão
+        rows = [
+            {"jti": jti, "exp": datetime.fromtimestamp(exp, tz=timezone.utc).replace(tzinfo=None) if exp is not None else None}
+            for jti, exp in chunk
+        ]
+        db.execute(insert(TokenBlacklist).values(rows).on_conflict_do_nothing(index_elements=[TokenBlacklist.jti]))
+        db.commit()
+
+    def _run(self) -> None:
+        while not self._stopped:
+            self._wakeup.wait(self.flush_seconds)
+            self._wakeup.clear()
+            self.flush()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._stopped = True
+            thread = self._thread
+        self._wakeup.set()
+        if thread is not None:
+            thread.join(timeout=max(1.0, self.flush_seconds * 2))
+        self.flush()
+        if self._pending:
+            logger.error("%s revogações não gravadas no desligamento", len(self._pending))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "pending": len(self._pending),
+                "enqueued": self.enqueued,
+                "written": self.written,
+                "flushes": self.flushes,
+                "failures": self.failures,
+            }
+
+
+_writer: Optional[RevocationWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_revocation_writer() -> RevocationWriter:
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                settings = get_settings()
+                _writer = RevocationWriter(
+                    flush_seconds=settings.revocation_flush_seconds,
+                    batch_size=settings.revocation_flush_batch,
+                    max_queue=settings.revocation_queue_max,
+                )
+    return _writer
+
+
+def revoke(jti: str, exp: Optional[float] = None) -> None:
+    get_revocation_cache().add(jti, exp)
+    get_revocation_writer().enqueue(jti, exp)
+
+
+def shutdown_revocation_writer() -> None:
+    if _writer is not None:
+        _writer.shutdown()
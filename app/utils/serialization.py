@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Any, Iterable, Sequence
+
+import orjson
+from fastapi import Response
+from pydantic import BaseModel
+
+# =========================
+# SERIALIZAÇÃO RÁPIDA
+# =========================
+# As leituras do catálogo selecionam só as colunas do schema de saída e
+# serializam as linhas direto com orjson, sem montar objetos ORM nem passar
+# pela validação do Pydantic (os dados vêm do nosso próprio banco). O JSON
+# gerado é o mesmo que o response_model produziria.
+
+
+def _default(obj: Any) -> Any:
+    # Numeric(10, 2) chega como Decimal; o schema expõe float
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Tipo não serializável: {type(obj).__name__}")
+
+
+def dumps(data: Any) -> bytes:
+    return orjson.dumps(data, default=_default)
+
+
+def json_response(data: Any, status_code: int = 200) -> Response:
+    return Response(content=dumps(data), status_code=status_code, media_type="application/json")
+
+
+class RowSerializer:
+    """Serializador pré-compilado de linhas (Row/tupla) para um schema de saída."""
+
+    def __init__(self, schema: type[BaseModel], model: Any) -> None:
+        self.fields: tuple[str, ...] = tuple(schema.model_fields)
+        # colunas na mesma ordem dos campos do schema
+        self.columns = tuple(getattr(model, f) for f in self.fields)
+
+    def as_dict(self, row: Sequence[Any]) -> dict[str, Any]:
+        return dict(zip(self.fields, row))
+
+    def dumps_one(self, row: Sequence[Any]) -> bytes:
+        return dumps(dict(zip(self.fields, row)))
+
+    def dumps(self, rows: Iterable[Sequence[Any]]) -> bytes:
+        fields = self.fields
+        return dumps([dict(zip(fields, row)) for row in rows])
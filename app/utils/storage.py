@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+import threading
+from typing import Optional
+
+from app.config import get_settings
+
+# =========================
+# STORAGE DE ARQUIVOS
+# =========================
+# Chaves endereçadas por conteúdo (sha256): o mesmo arquivo enviado duas vezes
+# vira a mesma chave e só é gravado uma vez. Como a chave nunca muda de
+# conteúdo, a URL pode ser cacheada para sempre.
+#
+# STORAGE_BACKEND=local grava em STORAGE_DIR e o main serve em STORAGE_URL
+# (os uploads em andamento ficam em STORAGE_STAGING_DIR, fora do que é servido);
+# STORAGE_BACKEND=s3 usa um bucket S3 (ou compatível: MinIO, R2...) via boto3.
+
+
+class Storage:
+    def staging_dir(self) -> str:
+        # onde o upload é gravado enquanto chega (antes de ter a chave)
+        return tempfile.gettempdir()
+
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def save_file(self, path: str, key: str, content_type: str) -> None:
+        # move/copia o arquivo temporário para a chave; path deixa de existir
+        raise NotImplementedError
+
+    def save_bytes(self, data: bytes, key: str, content_type: str) -> None:
+        raise NotImplementedError
+
+    def url(self, key: str) -> str:
+        raise NotImplementedError
+
+
+class LocalStorage(Storage):
+    def __init__(self, root: str, base_url: str, staging: Optional[str] = None) -> None:
+        self.root = os.path.abspath(root)
+        self.base_url = base_url.rstrip("/")
+        # fora do root: o root é servido inteiro pelo StaticFiles do main
+        self.staging = os.path.abspath(staging or self.root + ".staging")
+
+    def _path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key))
+        if not path.startswith(self.root + os.sep):
+            raise ValueError(f"Chave fora do storage: {key}")
+        return path
+
+    def staging_dir(self) -> str:
+        # irmã do root, em geral no mesmo filesystem: o save_file vira um rename atômico
+        os.makedirs(self.staging, exist_ok=True)
+        return self.staging
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def save_file(self, path: str, key: str, content_type: str) -> None:
+        dest = self._path(key)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        try:
+            os.replace(path, dest)
+        except OSError:
+            # staging em outro filesystem
+            shutil.move(path, dest)
+
+    def save_bytes(self, data: bytes, key: str, content_type: str) -> None:
+        dest = self._path(key)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.staging_dir())
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, dest)
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+
+class S3Storage(Storage):
+    # boto3 só é importado com STORAGE_BACKEND=s3 (não está no requirements)
+    def __init__(self, bucket: str, endpoint_url: Optional[str], public_url: Optional[str]) -> None:
+        try:
+            import boto3
+            from botocore.exceptions import ClientError
+        except ImportError as e:
+            raise RuntimeError("STORAGE_BACKEND=s3 requer o pacote boto3") from e
+
+        self.bucket = bucket
+        self._client = boto3.client("s3", endpoint_url=endpoint_url or None)
+        self._client_error = ClientError
+        base = public_url or (f"{endpoint_url.rstrip('/')}/{bucket}" if endpoint_url else f"https://{bucket}.s3.amazonaws.com")
+        self.base_url = base.rstrip("/")
+
+    def _extra(self, content_type: str) -> dict:
+        return {"ContentType": content_type, "CacheControl": "public, max-age=31536000, immutable"}
+
+    def exists(self, key: str) -> bool:
+        try:
+            self._client.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except self._client_error as e:
+            if e.response.get("Error", {}).get("Code") in {"404", "NoSuchKey", "NotFound"}:
+                return False
+            raise
+
+    def save_file(self, path: str, key: str, content_type: str) -> None:
+        # upload_file faz multipart upload em partes para arquivos grandes
+        try:
+            self._client.upload_file(path, self.bucket, key, ExtraArgs=self._extra(content_type))
+        finally:
+            os.unlink(path)
+
+    def save_bytes(self, data: bytes, key: str, content_type: str) -> None:
+        self._client.put_object(Bucket=self.bucket, Key=key, Body=data, **self._extra(content_type))
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+
+_storage: Optional[Storage] = None
+_storage_lock = threading.Lock()
+
+
+def get_storage() -> Storage:
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                settings = get_settings()
+                if settings.storage_backend == "s3":
+                    _storage = S3Storage(
+                        bucket=settings.s3_bucket,
+                        endpoint_url=settings.s3_endpoint_url,
+                        public_url=settings.s3_public_url,
+                    )
+                else:
+                    _storage = LocalStorage(
+                        root=settings.storage_dir,
+                        base_url=settings.storage_url,
+                        staging=settings.storage_staging_dir,
+                    )
+    return _storage
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
+
+from fastapi import HTTPException, Request
+from python_multipart.multipart import MultipartParser, parse_options_header
+from starlette.concurrency import run_in_threadpool
+
+from app.config import get_settings
+
+# =========================
+# UPLOAD EM STREAMING
+# =========================
+# O corpo multipart é lido em chunks direto de request.stream(): cada pedaço
+# do arquivo vai para o hash (sha256) e para um arquivo temporário, sem passar
+# pelo request.form()/UploadFile (que acumula o arquivo inteiro antes da rota
+# rodar). O limite de tamanho vale durante o envio.
+
+IMAGE_TYPES = {"image/jpeg": ".jpg", "image/png": ".png", "image/webp": ".webp"}
+
+
+class Upload:
+    def __init__(self, path: str, sha256: str, size: int, content_type: str, filename: str) -> None:
+        self.path = path
+        self.sha256 = sha256
+        self.size = size
+        self.content_type = content_type
+        self.filename = filename
+
+    def discard(self) -> None:
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def upload_max_bytes() -> int:
+    return get_settings().upload_max_bytes
+
+
+class _Partes:
+    """Callbacks do MultipartParser: só acumulam eventos, o I/O fica na rota."""
+
+    def __init__(self) -> None:
+        self.eventos: List[Tuple[str, object]] = []
+        self._campo = bytearray()
+        self._valor = bytearray()
+        self._headers: Dict[bytes, bytes] = {}
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self._begin,
+            "on_header_field": lambda d, s, e: self._campo.extend(d[s:e]),
+            "on_header_value": lambda d, s, e: self._valor.extend(d[s:e]),
+            "on_header_end": self._header_end,
+            "on_headers_finished": lambda: self.eventos.append(("headers", dict(self._headers))),
+            "on_part_data": lambda d, s, e: self.eventos.append(("data", bytes(d[s:e]))),
+            "on_part_end": lambda: self.eventos.append(("end", None)),
+        }
+
+    def _begin(self) -> None:
+        self._headers = {}
+
+    def _header_end(self) -> None:
+        self._headers[bytes(self._campo).lower()] = bytes(self._valor)
+        self._campo.clear()
+        self._valor.clear()
+
+
+async def receber_arquivo(
+    request: Request,
+    campo: str,
+    staging_dir: str,
+    tipos: Set[str],
+    max_bytes: int,
+) -> Upload:
+    content_type, params = parse_options_header(request.headers.get("content-type") or "")
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise HTTPException(status_code=400, detail="Envie o arquivo como multipart/form-data")
+
+    partes = _Partes()
+    parser = MultipartParser(params[b"boundary"], partes.callbacks())
+    fd, path = tempfile.mkstemp(dir=staging_dir)
+    f = os.fdopen(fd, "wb")
+    sha = hashlib.sha256()
+    size = 0
+    atual = False
+    encontrado: Optional[Tuple[str, str]] = None
+
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            dados = []
+            for tipo, valor in partes.eventos:
+                if tipo == "headers":
+                    _, disp = parse_options_header(valor.get(b"content-disposition", b""))
+                    atual = encontrado is None and disp.get(b"name", b"").decode() == campo
+                    if atual:
+                        ctype = valor.get(b"content-type", b"").decode().split(";")[0].strip().lower()
+                        if ctype not in tipos:
+                            raise HTTPException(status_code=415, detail="Tipo de arquivo não suportado")
+                        encontrado = (ctype, disp.get(b"filename", b"").decode(errors="replace"))
+                elif tipo == "data" and atual:
+                    size += len(valor)
+                    if size > max_bytes:
+                        raise HTTPException(status_code=413, detail="Arquivo maior que o permitido")
+                    sha.update(valor)
+                    dados.append(valor)
+                elif tipo == "end":
+                    atual = False
+            partes.eventos.clear()
+            if dados:
+                await run_in_threadpool(f.write, b"".join(dados))
+        parser.finalize()
+    except BaseException:
+        f.close()
+        os.unlink(path)
+        raise
+    f.close()
+
+    if encontrado is None or size == 0:
+        os.unlink(path)
+        raise HTTPException(status_code=400, detail=f"Campo '{campo}' ausente ou vazio")
+    return Upload(path, sha.hexdigest(), size, encontrado[0], encontrado[1])
+
+
+# =========================
+# THUMBNAILS (pool de processos)
+# =========================
+# Redimensionar imagem é CPU pura e segura o GIL: roda num ProcessPoolExecutor
+# próprio, criado no primeiro upload. O mesmo passo valida que o arquivo é
+# mesmo uma imagem que o Pillow consegue abrir.
+
+def gerar_thumbnail(path: str, size: int, quality: int) -> bytes:
+    from PIL import Image, ImageOps
+
+    try:
+        with Image.open(path) as im:
+            im = ImageOps.exif_transpose(im)
+            im.thumbnail((size, size))
+            if im.mode not in ("RGB", "RGBA"):
+                im = im.convert("RGBA" if "A" in im.getbands() else "RGB")
+            out = io.BytesIO()
+            im.save(out, format="WEBP", quality=quality)
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        raise ValueError(f"Imagem inválida: {e}") from None
+    return out.getvalue()
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # forkserver/spawn: fork de um servidor com threads herda locks travados
+                ctx = multiprocessing.get_context("forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
+                _pool = ProcessPoolExecutor(max_workers=get_settings().thumb_workers, mp_context=ctx)
+    return _pool
+
+
+def thumb_size() -> int:
+    return get_settings().thumb_size
+
+
+async def thumbnail_async(path: str) -> bytes:
+    fut = _get_pool().submit(gerar_thumbnail, path, thumb_size(), get_settings().thumb_quality)
+    return await asyncio.wrap_future(fut)
+
+
+def shutdown_thumb_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+            _pool = None
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import datetime as dt
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models.user import Usuario
+
+logger = logging.getLogger(__name__)
+
+# =========================
+# VERSÃO DO PERFIL (ME_FROM_TOKEN)
+# =========================
+# Com ME_FROM_TOKEN o access token carrega o perfil do /me e a versão do
+# usuário (Usuario.versao) no momento da emissão. O /me responde direto do
+# token enquanto essa versão for a mais recente conhecida.
+#
+# A versão e o updated_at são incrementados por trigger no banco
+# (migrations/009_usuario_versao_trigger.sql) sempre que um campo do perfil
+# muda, por qualquer caminho. Cada worker guarda as versões alteradas
+# recentemente e sincroniza com o banco (updated_at > último corte) no máximo a cada
+# USER_VERSION_SYNC_SECONDS. Um token só pode estar desatualizado se a
+# alteração for posterior à emissão, ou seja, dentro da vida do access token;
+# por isso a primeira carga e a poda usam essa janela, e usuário sem versão
+# conhecida é considerado atual.
+
+ACCESS_TOKEN_LIFETIME = dt.timedelta(days=7)
+# folga para transações que comitam depois do corte (now() = início da transação)
+_SYNC_OVERLAP = dt.timedelta(seconds=60)
+
+
+class UserVersions:
+    def __init__(self, sync_seconds: float, window: dt.timedelta = ACCESS_TOKEN_LIFETIME) -> None:
+        self.sync_seconds = sync_seconds
+        self.window = window
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        # uid -> (versão, updated_at da alteração); só usuários alterados dentro
+        # da janela, que a poda do sync mantém limitada
+        self._versions: Dict[int, Tuple[int, dt.datetime]] = {}
+        self._since: Optional[dt.datetime] = None
+        self._last_sync = 0.0
+
+        self.current = 0
+        self.stale = 0
+        self.syncs = 0
+
+    def _record(self, uid: int, versao: int, updated_at: dt.datetime) -> None:
+        atual = self._versions.get(uid)
+        if atual is None or versao > atual[0]:
+            self._versions[uid] = (versao, updated_at)
+
+    def seen(self, uid: int, versao: int) -> None:
+        # versão lida no login/refresh/me: só adianta a de um usuário já
+        # acompanhado (mantendo o updated_at, que a poda usa). Usuário fora do
+        # mapa não mudou na janela, ou o próximo sync traz a alteração.
+        with self._lock:
+            atual = self._versions.get(uid)
+            if atual is not None and versao > atual[0]:
+                self._versions[uid] = (versao, atual[1])
+
+    def sync(self, db: Session) -> None:
+        agora = db.scalar(select(func.now()))
+        since = self._since - _SYNC_OVERLAP if self._since else agora - self.window
+        rows = db.execute(
+            select(Usuario.id, Usuario.versao, Usuario.updated_at).where(Usuario.updated_at > since)
+        ).all()
+
+        limite = agora - self.window
+        with self._lock:
+            for uid, versao, updated_at in rows:
+                self._record(uid, versao, updated_at)
+            # alterações mais antigas que a vida do token não afetam token válido
+            for uid in [u for u, (_, quando) in self._versions.items() if quando < limite]:
+                del self._versions[uid]
+            self._since = agora
+            self._last_sync = time.monotonic()
+            self.syncs += 1
+
+    @property
+    def warm(self) -> bool:
+        return self._since is not None
+
+    def _maybe_sync(self, db: Session) -> None:
+        if self.warm and time.monotonic() - self._last_sync < self.sync_seconds:
+            return
+        # nunca espera o lock: no DB_MODE=async isto roda via run_sync na thread
+        # do event loop, onde quem o segura está parado num await de I/O
+        if not self._sync_lock.acquire(blocking=False):
+            return
+        try:
+            if self._since is None or time.monotonic() - self._last_sync >= self.sync_seconds:
+                self.sync(db)
+        finally:
+            self._sync_lock.release()
+
+    def is_current(self, db: Session, uid: int, versao: Any) -> bool:
+        if not isinstance(versao, int):
+            return False
+        self._maybe_sync(db)
+        with self._lock:
+            # ainda frio (outra requisição carregando): sem como saber, vai ao banco
+            if not self.warm:
+                return False
+            conhecida = self._versions.get(uid)
+            if conhecida is not None and versao < conhecida[0]:
+                self.stale += 1
+                return False
+            self.current += 1
+            return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "tracked": len(self._versions),
+                "current": self.current,
+                "stale": self.stale,
+                "syncs": self.syncs,
+            }
+
+
+_versions: Optional[UserVersions] = None
+_versions_lock = threading.Lock()
+
+
+def get_user_versions() -> UserVersions:
+    global _versions
+    if _versions is None:
+        with _versions_lock:
+            if _versions is None:
+                _versions = UserVersions(sync_seconds=get_settings().user_version_sync_seconds)
+    return _versions
+
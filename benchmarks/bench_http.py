@@ -0,0 +1,508 @@
+"""
+Benchmark HTTP de todas as rotas de /user e /event (inclui reservas).
+
+    python -m benchmarks.bench_http --output resultado.json
+    python -m benchmarks.bench_http --modo uvicorn --workers 4 --concorrencia 64
+    python -m benchmarks.bench_http --baseline base.json --limite 0.15
+
+Roda o main.app no próprio processo (httpx + ASGITransport, com lifespan) ou
+num uvicorn em subprocesso, contra o Postgres do .env. Use um banco só para
+isso (ex.: DB_NAME=ides_bench): as tabelas são criadas se faltarem, a massa
+é semeada no início (--eventos, --lotes-por-evento, --produtos-por-evento,
+--usuarios) e apagada no fim (a menos que --manter).
+
+Não há modo SQLite: as rotas usam SQL do Postgres (json_agg, ON CONFLICT,
+CTEs com UPDATE/DELETE ... RETURNING).
+
+Cada endpoint recebe --requisicoes chamadas de --concorrencia clientes. A
+saída é JSON: req/s, p50/p95/p99/max em ms e erros (status inesperado) por
+endpoint. Com --baseline, compara com um JSON anterior e sai com código 1 se
+o p95 piorar ou o req/s cair mais que --limite (fração).
+
+O controle de admissão de login/register é desligado (todas as requisições
+vêm do mesmo IP), salvo com --com-rate-limit.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import datetime as dt
+import itertools
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import httpx
+
+SENHA = "bench-senha-123"
+RAIZ = Path(__file__).resolve().parent.parent
+
+
+# =========================
+# MASSA DE DADOS
+# =========================
+@dataclass
+class Massa:
+    run: str
+    eventos: List[int] = field(default_factory=list)
+    lotes: List[int] = field(default_factory=list)
+    produtos: List[int] = field(default_factory=list)
+    usuarios: List[Tuple[int, str]] = field(default_factory=list)  # (id, email)
+    lote_reservas: int = 0
+    # alvos consumidos por DELETE / confirmar / cancelar
+    eventos_descartaveis: Deque[int] = field(default_factory=deque)
+    lotes_descartaveis: Deque[int] = field(default_factory=deque)
+    produtos_descartaveis: Deque[int] = field(default_factory=deque)
+    reservas_confirmar: Deque[str] = field(default_factory=deque)
+    reservas_cancelar: Deque[str] = field(default_factory=deque)
+    cookies: List[str] = field(default_factory=list)
+
+
+def semear(args, alvos: int) -> Massa:
+    from sqlalchemy import insert
+
+    from app.database.connection import Base, SessionLocal, get_engine
+    from app.models.event import Evento, Lote, Produto
+    from app.models.user import Pessoa, Usuario
+    from app.routes.reserva import reservar_vagas
+    from app.utils.password import hash_password
+
+    Base.metadata.create_all(get_engine())
+    # coluna e índices da busca não estão nos models
+    with get_engine().begin() as conn:
+        conn.exec_driver_sql((RAIZ / "migrations" / "006_busca_eventos.sql").read_text(encoding="utf-8"))
+    massa = Massa(run=uuid.uuid4().hex[:8])
+    hoje = dt.date.today()
+    extra = alvos
+
+    def eventos(n: int) -> List[Dict[str, Any]]:
+        return [
+            {
+                "nome_evento": f"bench-{massa.run} {i}", "local": "Paróquia Bench",
+                "dt_ini": hoje + dt.timedelta(days=i % 365), "dt_fim": hoje + dt.timedelta(days=i % 365 + 1),
+                "hr_ini": dt.time(8), "hr_fim": dt.time(18),
+            }
+            for i in range(n)
+        ]
+
+    with SessionLocal() as db:
+        ids = db.execute(
+            insert(Evento).returning(Evento.id, sort_by_parameter_order=True), eventos(args.eventos + extra)
+        ).scalars().all()
+        massa.eventos, descartaveis = list(ids[: args.eventos]), ids[args.eventos:]
+        massa.eventos_descartaveis.extend(descartaveis)
+
+        lotes = [
+            {"id_evento": ev, "preco": 10 + n, "num_lote": n + 1, "total_vagas": 100}
+            for ev in massa.eventos for n in range(args.lotes_por_evento)
+        ]
+        lotes += [{"id_evento": massa.eventos[0], "preco": 1, "num_lote": 10_000 + i, "total_vagas": 1} for i in range(extra)]
+        lotes.append({"id_evento": massa.eventos[0], "preco": 1, "num_lote": 9_999, "total_vagas": 10**9})
+        ids = db.execute(insert(Lote).returning(Lote.id, sort_by_parameter_order=True), lotes).scalars().all()
+        corte = len(massa.eventos) * args.lotes_por_evento
+        massa.lotes = list(ids[:corte])
+        massa.lotes_descartaveis.extend(ids[corte:-1])
+        massa.lote_reservas = ids[-1]
+
+        produtos = [
+            {"id_evento": ev, "preco": 5 + n, "descricao": f"Produto {n}", "img": None}
+            for ev in massa.eventos for n in range(args.produtos_por_evento)
+        ]
+        produtos += [{"id_evento": massa.eventos[0], "preco": 1, "descricao": "descartável", "img": None} for _ in range(extra)]
+        ids = db.execute(insert(Produto).returning(Produto.id, sort_by_parameter_order=True), produtos).scalars().all()
+        corte = len(massa.eventos) * args.produtos_por_evento
+        massa.produtos = list(ids[:corte])
+        massa.produtos_descartaveis.extend(ids[corte:])
+
+        # um hash só para todos: o Argon2 aqui só atrasaria a semeadura
+        senha_hash = hash_password(SENHA)
+        pessoas = [
+            {"nome": f"Bench {i}", "cpf": None, "data_nascimento": dt.date(1990, 1, 1), "adm": False}
+            for i in range(args.usuarios)
+        ]
+        pids = db.execute(insert(Pessoa).returning(Pessoa.id, sort_by_parameter_order=True), pessoas).scalars().all()
+        emails = [f"u{i}.{massa.run}@bench.invalid" for i in range(args.usuarios)]
+        uids = db.execute(
+            insert(Usuario).returning(Usuario.id, sort_by_parameter_order=True),
+            [{"id_pessoa": pid, "email": email, "senha_hash": senha_hash} for pid, email in zip(pids, emails)],
+        ).scalars().all()
+        massa.usuarios = list(zip(uids, emails))
+        db.commit()
+
+        for fila in (massa.reservas_confirmar, massa.reservas_cancelar):
+            for _ in range(extra):
+                fila.append(reservar_vagas(db, massa.lote_reservas, 1).codigo)
+
+    return massa
+
+
+def limpar(massa: Massa) -> None:
+    from sqlalchemy import delete, select
+
+    from app.database.connection import SessionLocal
+    from app.models.event import Evento
+    from app.models.user import Pessoa, Usuario
+
+    with SessionLocal() as db:
+        db.execute(delete(Evento).where(Evento.nome_evento.like(f"bench-{massa.run}%")))
+        pessoas = select(Usuario.id_pessoa).where(Usuario.email.like(f"%.{massa.run}@bench.invalid"))
+        pids = list(db.execute(pessoas).scalars())
+        db.execute(delete(Usuario).where(Usuario.id_pessoa.in_(pids)))
+        db.execute(delete(Pessoa).where(Pessoa.id.in_(pids)))
+        db.commit()
+
+
+# =========================
+# CENÁRIOS
+# =========================
+Req = Tuple[str, str, Dict[str, Any]]  # método, caminho, kwargs do httpx
+
+
+@dataclass
+class Cenario:
+    nome: str
+    monta: Callable[[int], Optional[Req]]  # None = alvos esgotados
+    esperado: Tuple[int, ...] = (200,)
+
+
+def _imagem_png() -> bytes:
+    import io
+
+    from PIL import Image
+
+    buf = io.BytesIO()
+    Image.new("RGB", (1200, 800), (180, 40, 40)).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def cenarios(massa: Massa) -> List[Cenario]:
+    from app.utils.jwt_handler import criar_token
+
+    ev = lambda i: massa.eventos[i % len(massa.eventos)]
+    lote = lambda i: massa.lotes[i % len(massa.lotes)]
+    produto = lambda i: massa.produtos[i % len(massa.produtos)]
+    # lotes/produtos do evento ev(i) (semeados em blocos por evento)
+    por_ev = lambda ids, i: ids[(i % len(massa.eventos)) * (len(ids) // len(massa.eventos)):][: len(ids) // len(massa.eventos)]
+    usuario = lambda i: massa.usuarios[i % len(massa.usuarios)]
+    cookie = lambda i: {"headers": {"Cookie": massa.cookies[i % len(massa.cookies)]}}
+    num_lote = itertools.count(100_000)
+    seq = itertools.count()
+    cpf_base = int(massa.run, 16) % 10**4 * 10**7
+    hoje = dt.date.today().isoformat()
+    # imagem fixa: depois do 1º envio o upload cai na deduplicação (sem thumbnail)
+    imagem = _imagem_png()
+    evento_json = {"nome_evento": f"bench-{massa.run} novo", "local": "Paróquia Bench",
+                   "dt_ini": hoje, "dt_fim": hoje, "hr_ini": "08:00:00", "hr_fim": "18:00:00"}
+
+    def pop(fila: Deque) -> Any:
+        try:
+            return fila.popleft()
+        except IndexError:
+            return None
+
+    def delete(caminho: str, fila: Deque) -> Callable[[int], Optional[Req]]:
+        def monta(i: int) -> Optional[Req]:
+            alvo = pop(fila)
+            return None if alvo is None else ("DELETE", caminho.format(alvo), {})
+        return monta
+
+    def reserva(acao: str, fila: Deque) -> Callable[[int], Optional[Req]]:
+        def monta(i: int) -> Optional[Req]:
+            codigo = pop(fila)
+            if codigo is None:
+                return None
+            if acao == "confirmar":
+                return ("POST", f"/event/reservas/{codigo}/confirmar", {})
+            return ("DELETE", f"/event/reservas/{codigo}", {})
+        return monta
+
+    def register(i: int) -> Req:
+        # sequência própria: aquecimento e medição não podem repetir e-mail/CPF
+        n = next(seq)
+        return ("POST", "/user/register", {"json": {
+            "pessoa": {"nome": f"Bench novo {n}", "cpf": f"{cpf_base + n:011d}", "data_nascimento": "1990-01-01"},
+            "usuario": {"email": f"r{n}.{massa.run}@bench.invalid", "senha": SENHA},
+        }})
+
+    def refresh(i: int) -> Req:
+        uid, email = usuario(i)
+        tok = criar_token({"id": uid, "sub": email, "tipo": "refresh"}, expires_in=60)
+        return ("POST", "/user/refresh", {"headers": {"Cookie": f"refresh_token={tok}"}})
+
+    def logout(i: int) -> Req:
+        uid, email = usuario(i)
+        access = criar_token({"id": uid, "sub": email, "tipo": "access"}, expires_in=60)
+        refresh_tok = criar_token({"id": uid, "sub": email, "tipo": "refresh"}, expires_in=60)
+        return ("POST", "/user/logout", {"headers": {"Cookie": f"access_token={access}; refresh_token={refresh_tok}"}})
+
+    return [
+        # ---- usuário ----
+        Cenario("POST /user/register", register, (201,)),
+        Cenario("POST /user/login", lambda i: ("POST", "/user/login", {"json": {"usuario": usuario(i)[1], "senha": SENHA}})),
+        Cenario("GET /user/me", lambda i: ("GET", "/user/me", cookie(i))),
+        Cenario("POST /user/refresh", refresh),
+        Cenario("POST /user/logout", logout),
+        # ---- leitura do catálogo ----
+        Cenario("GET /event/eventos", lambda i: ("GET", "/event/eventos", {})),
+        Cenario("GET /event/eventos/search", lambda i: (
+            "GET", "/event/eventos/search", {"params": {"q": ("paroquia bench", f"{massa.run} {i % 50}", "paroqia")[i % 3]}},
+        )),
+        Cenario("GET /event/eventos/{id}", lambda i: ("GET", f"/event/eventos/{ev(i)}", {})),
+        Cenario("GET /event/eventos/{id}/info", lambda i: ("GET", f"/event/eventos/{ev(i)}/info", {})),
+        Cenario("GET /event/lotes", lambda i: ("GET", "/event/lotes", {"params": {"id_evento": ev(i)}})),
+        Cenario("GET /event/produtos", lambda i: ("GET", "/event/produtos", {"params": {"id_evento": ev(i)}})),
+        Cenario("GET /event/export/{recurso}", lambda i: ("GET", "/event/export/lotes", {"params": {"id_evento": ev(i)}})),
+        # ---- escrita ----
+        Cenario("POST /event/eventos", lambda i: ("POST", "/event/eventos", {"json": evento_json}), (201,)),
+        Cenario("PUT /event/eventos/{id}", lambda i: ("PUT", f"/event/eventos/{ev(i)}", {"json": {"local": f"Local {i}"}})),
+        Cenario("DELETE /event/eventos/{id}", delete("/event/eventos/{}", massa.eventos_descartaveis), (204,)),
+        Cenario("POST /event/lotes", lambda i: ("POST", "/event/lotes", {"json": {
+            "id_evento": ev(i), "preco": 10, "num_lote": next(num_lote), "total_vagas": 50}}), (201,)),
+        Cenario("POST /event/lotes/bulk", lambda i: ("POST", "/event/lotes/bulk", {"json": {
+            "id_evento": ev(i), "itens": [{"preco": 10, "num_lote": next(num_lote), "total_vagas": 50} for _ in range(20)]}}), (201,)),
+        Cenario("PUT /event/lotes/bulk", lambda i: ("PUT", "/event/lotes/bulk", {"json": {
+            "id_evento": ev(i), "itens": [{"id": l, "preco": 10 + i % 50} for l in por_ev(massa.lotes, i)]}})),
+        Cenario("PUT /event/lotes/{id}", lambda i: ("PUT", f"/event/lotes/{lote(i)}", {"json": {"preco": 10 + i % 50}})),
+        Cenario("DELETE /event/lotes/{id}", delete("/event/lotes/{}", massa.lotes_descartaveis), (204,)),
+        Cenario("POST /event/produtos", lambda i: ("POST", "/event/produtos", {"json": {
+            "id_evento": ev(i), "preco": 5, "descricao": f"Produto novo {i}"}}), (201,)),
+        Cenario("POST /event/produtos/bulk", lambda i: ("POST", "/event/produtos/bulk", {"json": {
+            "id_evento": ev(i), "itens": [{"preco": 5, "descricao": f"Item {n}"} for n in range(20)]}}), (201,)),
+        Cenario("PUT /event/produtos/bulk", lambda i: ("PUT", "/event/produtos/bulk", {"json": {
+            "id_evento": ev(i), "itens": [{"id": p, "preco": 5 + i % 50} for p in por_ev(massa.produtos, i)]}})),
+        Cenario("PUT /event/produtos/{id}", lambda i: ("PUT", f"/event/produtos/{produto(i)}", {"json": {"preco": 5 + i % 50}})),
+        Cenario("POST /event/produtos/{id}/imagem", lambda i: (
+            "POST", f"/event/produtos/{produto(i)}/imagem", {"files": {"arquivo": ("bench.png", imagem, "image/png")}},
+        )),
+        Cenario("DELETE /event/produtos/{id}", delete("/event/produtos/{}", massa.produtos_descartaveis), (204,)),
+        # ---- reservas ----
+        Cenario("POST /event/lotes/{id}/reservas", lambda i: ("POST", f"/event/lotes/{massa.lote_reservas}/reservas", {"json": {"quantidade": 1}}), (201,)),
+        Cenario("POST /event/reservas/{codigo}/confirmar", reserva("confirmar", massa.reservas_confirmar)),
+        Cenario("DELETE /event/reservas/{codigo}", reserva("cancelar", massa.reservas_cancelar), (204,)),
+    ]
+
+
+# =========================
+# EXECUÇÃO
+# =========================
+def _percentil(ordenadas: List[float], p: float) -> float:
+    if not ordenadas:
+        return 0.0
+    k = min(len(ordenadas) - 1, max(0, round(p / 100 * (len(ordenadas) - 1))))
+    return ordenadas[k]
+
+
+async def rodar_cenario(client: httpx.AsyncClient, cenario: Cenario, total: int, concorrencia: int) -> Dict[str, Any]:
+    contador = itertools.count()
+    latencias: List[float] = []
+    erros: Dict[str, int] = {}
+
+    async def cliente() -> None:
+        while (i := next(contador)) < total:
+            req = cenario.monta(i)
+            if req is None:
+                return
+            metodo, caminho, kwargs = req
+            t0 = time.perf_counter()
+            try:
+                resp = await client.request(metodo, caminho, **kwargs)
+                await resp.aread()
+                status = str(resp.status_code)
+                ok = resp.status_code in cenario.esperado
+            except httpx.HTTPError as e:
+                status, ok = type(e).__name__, False
+            latencias.append(time.perf_counter() - t0)
+            if not ok:
+                erros[status] = erros.get(status, 0) + 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(cliente() for _ in range(concorrencia)))
+    duracao = time.perf_counter() - t0
+
+    ms = sorted(x * 1000 for x in latencias)
+    return {
+        "requisicoes": len(ms),
+        "erros": erros,
+        "rps": round(len(ms) / duracao, 1) if duracao else 0.0,
+        "media_ms": round(statistics.fmean(ms), 3) if ms else 0.0,
+        "p50_ms": round(_percentil(ms, 50), 3),
+        "p95_ms": round(_percentil(ms, 95), 3),
+        "p99_ms": round(_percentil(ms, 99), 3),
+        "max_ms": round(ms[-1], 3) if ms else 0.0,
+    }
+
+
+async def _logins(client: httpx.AsyncClient, massa: Massa, n: int) -> None:
+    # cookies reais (inclui o perfil no token com ME_FROM_TOKEN)
+    for _, email in massa.usuarios[:n]:
+        resp = await client.post("/user/login", json={"usuario": email, "senha": SENHA})
+        resp.raise_for_status()
+        massa.cookies.append(f"access_token={resp.cookies['access_token']}")
+
+
+async def executar(client: httpx.AsyncClient, massa: Massa, args) -> Dict[str, Any]:
+    import re
+
+    await _logins(client, massa, min(len(massa.usuarios), 50))
+    filtro = re.compile(args.somente) if args.somente else None
+    resultados = {}
+    for cenario in cenarios(massa):
+        if filtro and not filtro.search(cenario.nome):
+            continue
+        # aquecimento fora da medição (conexões do pool, caches, JIT do Argon2)
+        await rodar_cenario(client, cenario, min(args.aquecimento, args.requisicoes), args.concorrencia)
+        resultados[cenario.nome] = r = await rodar_cenario(client, cenario, args.requisicoes, args.concorrencia)
+        print(f"{cenario.nome:45s} {r['rps']:>9.1f} req/s  p50={r['p50_ms']:.1f}ms  "
+              f"p95={r['p95_ms']:.1f}ms  p99={r['p99_ms']:.1f}ms  erros={sum(r['erros'].values())}", file=sys.stderr)
+    return resultados
+
+
+async def em_processo(massa: Massa, args) -> Dict[str, Any]:
+    from main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            return await executar(client, massa, args)
+
+
+def _porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def em_uvicorn(massa: Massa, args) -> Dict[str, Any]:
+    porta = _porta_livre()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(porta),
+         "--workers", str(args.workers), "--log-level", "warning"],
+        env=os.environ.copy(),
+    )
+    base = f"http://127.0.0.1:{porta}"
+    try:
+        limits = httpx.Limits(max_connections=args.concorrencia, max_keepalive_connections=args.concorrencia)
+        async with httpx.AsyncClient(base_url=base, timeout=60, limits=limits) as client:
+            for _ in range(100):
+                try:
+                    if (await client.get("/")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                await asyncio.sleep(0.1)
+            else:
+                raise RuntimeError("uvicorn não subiu")
+            return await executar(client, massa, args)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+
+# =========================
+# COMPARAÇÃO COM BASELINE
+# =========================
+def comparar(atual: Dict[str, Any], base: Dict[str, Any], limite: float) -> List[str]:
+    regressoes = []
+    for nome, r in atual["endpoints"].items():
+        b = base.get("endpoints", {}).get(nome)
+        if not b or not r["requisicoes"] or not b["requisicoes"]:
+            continue
+        if b["p95_ms"] and r["p95_ms"] > b["p95_ms"] * (1 + limite):
+            regressoes.append(f"{nome}: p95 {b['p95_ms']:.1f}ms -> {r['p95_ms']:.1f}ms")
+        if b["rps"] and r["rps"] < b["rps"] * (1 - limite):
+            regressoes.append(f"{nome}: {b['rps']:.1f} -> {r['rps']:.1f} req/s")
+    return regressoes
+
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark HTTP das rotas de /user e /event")
+    parser.add_argument("--modo", choices=["processo", "uvicorn"], default="processo")
+    parser.add_argument("--workers", type=int, default=1, help="workers do uvicorn")
+    parser.add_argument("--requisicoes", type=int, default=500, help="requisições medidas por endpoint")
+    parser.add_argument("--aquecimento", type=int, default=50, help="requisições descartadas por endpoint")
+    parser.add_argument("--concorrencia", type=int, default=16)
+    parser.add_argument("--eventos", type=int, default=200)
+    parser.add_argument("--lotes-por-evento", type=int, default=5)
+    parser.add_argument("--produtos-por-evento", type=int, default=10)
+    parser.add_argument("--usuarios", type=int, default=200)
+    parser.add_argument("--somente", default=None, help="regex sobre o nome do endpoint")
+    parser.add_argument("--output", default=None, help="arquivo JSON de saída (padrão: stdout)")
+    parser.add_argument("--baseline", default=None, help="JSON de uma execução anterior")
+    parser.add_argument("--limite", type=float, default=0.15, help="piora tolerada (fração) contra o baseline")
+    parser.add_argument("--manter", action="store_true", help="não apaga a massa semeada")
+    parser.add_argument("--com-rate-limit", action="store_true")
+    args = parser.parse_args()
+
+    if not args.com_rate_limit:
+        os.environ["AUTH_RATE_IP_PER_MIN"] = "0"
+        os.environ["AUTH_RATE_IDENT_PER_MIN"] = "0"
+
+    massa = None
+    try:
+        # aquecimento + medição consomem alvos de DELETE/confirmar/cancelar
+        massa = semear(args, args.requisicoes + min(args.aquecimento, args.requisicoes))
+        executor = em_uvicorn if args.modo == "uvicorn" else em_processo
+        endpoints = asyncio.run(executor(massa, args))
+    finally:
+        if massa is not None and not args.manter:
+            limpar(massa)
+
+    resultado = {
+        "meta": {
+            "quando": dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds"),
+            "commit": _commit(),
+            "python": platform.python_version(),
+            "modo": args.modo,
+            "workers": args.workers if args.modo == "uvicorn" else 1,
+            "db_mode": os.getenv("DB_MODE") or "sync",
+            "requisicoes": args.requisicoes,
+            "concorrencia": args.concorrencia,
+            "escala": {
+                "eventos": args.eventos,
+                "lotes_por_evento": args.lotes_por_evento,
+                "produtos_por_evento": args.produtos_por_evento,
+                "usuarios": args.usuarios,
+            },
+        },
+        "endpoints": endpoints,
+    }
+
+    texto = json.dumps(resultado, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fp:
+            fp.write(texto + "\n")
+    else:
+        print(texto)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fp:
+            regressoes = comparar(resultado, json.load(fp), args.limite)
+        for r in regressoes:
+            print("REGRESSÃO:", r, file=sys.stderr)
+        if regressoes:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Tempo de import do main (cold start de cada worker do uvicorn).
+
+    python -m benchmarks.bench_import
+    python -m benchmarks.bench_import --repeticoes 20 --top 15 --output import.json
+
+Cada repetição é um processo novo (`python -c "import main"`), então mede o
+custo real de subir um worker: imports, leitura do .env e o que mais rodar
+no import. Com --top, roda também `python -X importtime` uma vez e lista os
+módulos com maior tempo acumulado.
+
+Não abre conexão: o engine só é criado na primeira sessão (lifespan).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+
+def _importar(modulo: str, extra: List[str] | None = None) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *(extra or []), "-c", f"import {modulo}"],
+        cwd=RAIZ,
+        env=os.environ.copy(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def medir(modulo: str, repeticoes: int) -> Dict[str, Any]:
+    # o primeiro processo aquece o cache de bytecode e do sistema de arquivos
+    _importar(modulo)
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        _importar(modulo)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    tempos.sort()
+    return {
+        "modulo": modulo,
+        "repeticoes": repeticoes,
+        "mediana_ms": round(statistics.median(tempos), 1),
+        "min_ms": round(tempos[0], 1),
+        "max_ms": round(tempos[-1], 1),
+    }
+
+
+def mais_lentos(modulo: str, top: int) -> List[Dict[str, Any]]:
+    # linhas do -X importtime: "import time: self [us] | cumulative | imported package"
+    saida = _importar(modulo, ["-X", "importtime"]).stderr
+    linhas = []
+    for linha in saida.splitlines():
+        if not linha.startswith("import time:") or "cumulative" in linha:
+            continue
+        self_us, cumulativo_us, nome = linha.split(":", 1)[1].split("|")
+        linhas.append({
+            "modulo": nome.strip(),
+            "self_ms": round(int(self_us) / 1000, 1),
+            "acumulado_ms": round(int(cumulativo_us) / 1000, 1),
+        })
+    linhas.sort(key=lambda l: l["acumulado_ms"], reverse=True)
+    return linhas[:top]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modulo", default="main")
+    parser.add_argument("--repeticoes", type=int, default=10)
+    parser.add_argument("--top", type=int, default=10, help="0 desliga o -X importtime")
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    resultado = medir(args.modulo, args.repeticoes)
+    if args.top > 0:
+        resultado["mais_lentos"] = mais_lentos(args.modulo, args.top)
+
+    texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(texto + "\n", encoding="utf-8")
+    print(texto)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Micro-benchmark da serialização das listagens do catálogo (custo por 1k linhas).
+
+    python -m benchmarks.bench_serialization --rows 1000 --repeat 50
+
+Compara:
+  - response_model: objetos ORM validados pelo Pydantic (from_attributes) e
+    codificados com jsonable_encoder + json.dumps (caminho padrão do FastAPI);
+  - pydantic_dump_json: validação + dump_json do Pydantic (uma validação só);
+  - row_serializer: linhas de colunas serializadas direto com orjson
+    (app.utils.serialization.RowSerializer, usado pelas rotas de leitura).
+Não precisa de banco.
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import json
+import timeit
+from decimal import Decimal
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.models.event import Evento, Lote
+from app.schemas.event import EventoOut, LoteOut
+from app.utils.serialization import RowSerializer
+
+
+def _eventos(n: int):
+    base = dt.date(2026, 1, 1)
+    for i in range(n):
+        yield (
+            i + 1, f"Evento {i}", "Paróquia São José",
+            base + dt.timedelta(days=i % 365), base + dt.timedelta(days=i % 365 + 2),
+            dt.time(19, 30), dt.time(22, 0),
+        )
+
+
+def _lotes(n: int):
+    for i in range(n):
+        yield (i + 1, i // 10 + 1, Decimal("149.90"), i % 10 + 1, 300)
+
+
+def _bench(label: str, fn, rows: int, repeat: int) -> dict:
+    total = min(timeit.repeat(fn, number=1, repeat=repeat))
+    per_1k = total / rows * 1000
+    print(f"  {label:<20} {per_1k * 1000:10.3f} ms / 1k linhas")
+    return {"caso": label, "ms_por_1k": round(per_1k * 1000, 3)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--json", action="store_true", help="imprime o resultado em JSON")
+    args = parser.parse_args()
+
+    results = {}
+    for nome, model, schema, gen in (
+        ("eventos", Evento, EventoOut, _eventos),
+        ("lotes", Lote, LoteOut, _lotes),
+    ):
+        rows = list(gen(args.rows))
+        serializer = RowSerializer(schema, model)
+        objs = [model(**serializer.as_dict(r)) for r in rows]
+        adapter = TypeAdapter(list[schema])
+
+        def response_model():
+            validated = adapter.validate_python(objs, from_attributes=True)
+            return json.dumps(jsonable_encoder(validated)).encode("utf-8")
+
+        def pydantic_dump_json():
+            return adapter.dump_json(adapter.validate_python(objs, from_attributes=True))
+
+        def row_serializer():
+            return serializer.dumps(rows)
+
+        assert json.loads(response_model()) == json.loads(row_serializer())
+
+        print(f"{nome} ({args.rows} linhas):")
+        results[nome] = [
+            _bench("response_model", response_model, args.rows, args.repeat),
+            _bench("pydantic_dump_json", pydantic_dump_json, args.rows, args.repeat),
+            _bench("row_serializer", row_serializer, args.rows, args.repeat),
+        ]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
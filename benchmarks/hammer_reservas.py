@@ -0,0 +1,135 @@
+"""
+Teste de concorrência da reserva de vagas: muitas threads disputando o mesmo lote.
+
+    python -m benchmarks.hammer_reservas --vagas 100 --threads 32 --tentativas 20
+
+Cria um evento e um lote temporários no banco do .env, dispara reservas em
+paralelo (cada thread com a sua sessão) e confere que:
+  - a soma das reservas aceitas é exatamente total_vagas (nem mais, nem menos);
+  - Lote.vagas_reservadas bate com a soma das linhas de tb_reserva_vaga;
+  - cancelar metade devolve as vagas.
+Precisa de um Postgres com as migrations aplicadas. Apaga o evento no final.
+Sai com código 1 se alguma checagem falhar.
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from fastapi import HTTPException
+from sqlalchemy import func, select
+
+from app.database.connection import SessionLocal, get_engine
+from app.models.event import Evento, Lote, ReservaVaga
+from app.routes.reserva import cancelar_reserva, reservar_vagas
+
+
+def _criar_lote(vagas: int) -> tuple[int, int]:
+    with SessionLocal() as db:
+        hoje = dt.date.today()
+        evento = Evento(
+            nome_evento="hammer_reservas", local="-", dt_ini=hoje, dt_fim=hoje,
+            hr_ini=dt.time(8), hr_fim=dt.time(18),
+        )
+        db.add(evento)
+        db.flush()
+        lote = Lote(id_evento=evento.id, preco=0, num_lote=1, total_vagas=vagas)
+        db.add(lote)
+        db.commit()
+        return evento.id, lote.id
+
+
+def _apagar_evento(evento_id: int) -> None:
+    with SessionLocal() as db:
+        obj = db.get(Evento, evento_id)
+        if obj:
+            db.delete(obj)
+            db.commit()
+
+
+def _ocupacao(lote_id: int) -> tuple[int, int]:
+    with SessionLocal() as db:
+        contador = db.scalar(select(Lote.vagas_reservadas).where(Lote.id == lote_id))
+        soma = db.scalar(select(func.coalesce(func.sum(ReservaVaga.quantidade), 0)).where(ReservaVaga.id_lote == lote_id))
+        return int(contador), int(soma)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Dispara reservas concorrentes contra um único lote")
+    parser.add_argument("--vagas", type=int, default=100)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--tentativas", type=int, default=20, help="reservas por thread")
+    parser.add_argument("--quantidade", type=int, default=1, help="vagas por reserva")
+    args = parser.parse_args()
+
+    evento_id, lote_id = _criar_lote(args.vagas)
+    aceitas: list[str] = []
+    recusadas = 0
+    lock = threading.Lock()
+    inicio = threading.Event()
+
+    def worker() -> None:
+        nonlocal recusadas
+        inicio.wait()
+        for _ in range(args.tentativas):
+            with SessionLocal() as db:
+                try:
+                    reserva = reservar_vagas(db, lote_id, args.quantidade)
+                except HTTPException as e:
+                    if e.status_code != 409:
+                        raise
+                    with lock:
+                        recusadas += 1
+                    continue
+            with lock:
+                aceitas.append(reserva.codigo)
+
+    falhas = []
+    try:
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            futures = [pool.submit(worker) for _ in range(args.threads)]
+            t0 = time.perf_counter()
+            inicio.set()
+            for f in futures:
+                f.result()
+            elapsed = time.perf_counter() - t0
+
+        total = args.threads * args.tentativas
+        reservadas = len(aceitas) * args.quantidade
+        print(f"{total} tentativas em {elapsed:.2f}s ({total / elapsed:.0f}/s), pool={get_engine().pool.size()}")
+        print(f"aceitas={len(aceitas)} recusadas={recusadas} vagas reservadas={reservadas}/{args.vagas}")
+
+        esperado = args.vagas - args.vagas % args.quantidade
+        if reservadas != esperado:
+            falhas.append(f"esperava {esperado} vagas reservadas, obteve {reservadas}")
+        contador, soma = _ocupacao(lote_id)
+        if contador != soma or contador != reservadas:
+            falhas.append(f"vagas_reservadas={contador}, soma das reservas={soma}, aceitas={reservadas}")
+
+        metade = aceitas[: len(aceitas) // 2]
+        with SessionLocal() as db:
+            for codigo in metade:
+                cancelar_reserva(db, codigo)
+        contador, soma = _ocupacao(lote_id)
+        if contador != reservadas - len(metade) * args.quantidade or contador != soma:
+            falhas.append(f"após cancelar {len(metade)}: vagas_reservadas={contador}, soma={soma}")
+    finally:
+        _apagar_evento(evento_id)
+
+    for falha in falhas:
+        print("FALHA:", falha)
+    if falhas:
+        sys.exit(1)
+    print("ok")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,166 @@
-import os
-from dotenv import load_dotenv
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.staticfiles import StaticFiles
+from starlette.concurrency import run_in_threadpool
+
+from app.config import get_settings
+from app.database.connection import SessionLocal, dispose_async_engine, dispose_engine
+from app.database.replicas import ReadYourWritesMiddleware, dispose_replicas
+from app.utils.pagination import NEXT_CURSOR_HEADER
+from app.utils.metrics import MetricsMiddleware, metrics_enabled
+from app.utils.query_stats import QueryStatsMiddleware
+from app.utils.password import shutdown_hash_executor
+from app.utils.revocation import get_revocation_cache, shutdown_revocation_writer
+from app.utils.storage import LocalStorage, get_storage
+from app.utils.uploads import shutdown_thumb_pool
+from app.utils.user_version import get_user_versions
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+
+def _warm_caches() -> None:
+    # no boot, fora do event loop: no DB_MODE=async as checagens rodam via
+    # run_sync e só tentam sincronizar sem esperar
+    try:
+        with SessionLocal() as db:
+            get_revocation_cache().warm(db)
+            if settings.me_from_token:
+                get_user_versions().sync(db)
+    except Exception:
+        # sem banco no boot: os caches aquecem nas primeiras checagens
+        logger.exception("Falha ao aquecer os caches de revogação/versão")
+
+
+# os jobs importam seus módulos só quando rodam
+def _compact_blacklist() -> None:
+    from app.jobs.compact_blacklist import compact_blacklist
+
+    with SessionLocal() as db:
+        compact_blacklist(db, batch_size=settings.blacklist_compaction_batch)
+
+
+def _liberar_reservas() -> None:
+    from app.routes.reserva import liberar_reservas_expiradas
+
+    with SessionLocal() as db:
+        liberadas = liberar_reservas_expiradas(db)
+    if liberadas:
+        logger.info("Reservas vencidas: %s vagas devolvidas", liberadas)
+
+
+async def _periodic(interval: float, job, falha: str) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(job)
+        except Exception:
+            logger.exception(falha)
+
+
+def _start_periodic(interval: float, job, falha: str) -> asyncio.Task | None:
+    # intervalo 0 desliga o job
+    return asyncio.create_task(_periodic(interval, job, falha)) if interval > 0 else None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await run_in_threadpool(_warm_caches)
+
+    # compactação desligada por padrão (ex.: quando roda via cron com
+    # `python -m app.jobs.compact_blacklist`)
+    tasks = [
+        _start_periodic(settings.blacklist_compaction_seconds, _compact_blacklist, "Falha na compactação do tb_blacklist"),
+        _start_periodic(settings.reserva_release_seconds, _liberar_reservas, "Falha ao liberar reservas vencidas"),
+    ]
+
+    yield
+
+    for task in tasks:
+        if task:
+            task.cancel()
+    # grava as revogações ainda na fila antes de soltar o pool
+    await run_in_threadpool(shutdown_revocation_writer)
+    shutdown_hash_executor()
+    shutdown_thumb_pool()
+    await run_in_threadpool(dispose_engine)
+    await run_in_threadpool(dispose_replicas)
+    await dispose_async_engine()
 
-load_dotenv()
 
 app = FastAPI(
     title="Identidade e Santidade API",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # CORS (frontend)
-frontend_url = os.getenv("FRONTEND_URL", "http://localhost:5173")
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=[frontend_url],
+    allow_origins=[settings.frontend_url],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
+# por fora do CORS: mede a requisição inteira
+app.add_middleware(QueryStatsMiddleware)
+if metrics_enabled():
+    app.add_middleware(MetricsMiddleware)
+if settings.db_replica_urls:
+    app.add_middleware(ReadYourWritesMiddleware, seconds=settings.read_your_writes_seconds)
 
 # Routers
+from fastapi import APIRouter
+
 from app.routes.user import router as user_router
 from app.routes.event import router as event_router
+from app.routes.internal import router as internal_router
+from app.routes.reserva import router as reserva_router
+
+
+def _include(router: APIRouter, async_router: APIRouter | None, prefix: str, tags: list[str]) -> None:
+    if async_router is None:
+        app.include_router(router, prefix=prefix, tags=tags)
+        return
+
+    # DB_MODE=async: a variante async atende as rotas que ela implementa;
+    # rotas que só existem na versão sync continuam sendo servidas por ela.
+    # As sync vêm antes: PUT /lotes/bulk não pode cair no /lotes/{lote_id} async.
+    implemented = {(r.path, frozenset(r.methods)) for r in async_router.routes}
+    fallback = APIRouter()
+    fallback.routes.extend(
+        r for r in router.routes if (r.path, frozenset(r.methods)) not in implemented
+    )
+    app.include_router(fallback, prefix=prefix, tags=tags)
+    app.include_router(async_router, prefix=prefix, tags=tags)
+
+
+if settings.db_mode == "async":
+    from app.routes.user_async import router as user_async_router
+    from app.routes.event_async import router as event_async_router
+else:
+    user_async_router = event_async_router = None
+
+_include(user_router, user_async_router, "/user", ["Usuário"])
+_include(event_router, event_async_router, "/event", ["Eventos"])
+# reservas só têm a versão sync (UPDATE condicional curto no threadpool)
+app.include_router(reserva_router, prefix="/event", tags=["Reservas"])
+app.include_router(internal_router, prefix="/internal", include_in_schema=False)
+if metrics_enabled():
+    from app.routes.metrics import router as metrics_router
+
+    app.include_router(metrics_router, include_in_schema=False)
 
-app.include_router(user_router, prefix="/user", tags=["Usuário"])
-app.include_router(event_router, prefix="/event", tags=["Eventos"])
+# imagens do storage local (em produção, prefira servir pelo proxy/CDN)
+_storage = get_storage()
+if isinstance(_storage, LocalStorage) and _storage.base_url.startswith("/"):
+    app.mount(_storage.base_url, StaticFiles(directory=_storage.root, check_dir=False), name="media")
 
 @app.get("/")
 def root():
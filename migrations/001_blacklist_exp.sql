@@ -0,0 +1,3 @@
+-- Guarda a expiração do token revogado para permitir a compactação do tb_blacklist.
+ALTER TABLE tb_blacklist ADD COLUMN IF NOT EXISTS exp TIMESTAMP WITHOUT TIME ZONE NULL;
+CREATE INDEX IF NOT EXISTS ix_tb_blacklist_exp ON tb_blacklist (exp);
@@ -0,0 +1,2 @@
+-- Suporta a paginação por keyset de GET /event/eventos (dt_ini desc, id desc).
+CREATE INDEX IF NOT EXISTS ix_tb_eventos_dt_ini_id ON tb_eventos (dt_ini, id);
@@ -0,0 +1,22 @@
+-- Reserva de vagas por lote (app/routes/reserva.py).
+ALTER TABLE tb_lote ADD COLUMN IF NOT EXISTS vagas_reservadas INTEGER NOT NULL DEFAULT 0;
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'ck_tb_lote_vagas_reservadas') THEN
+        ALTER TABLE tb_lote ADD CONSTRAINT ck_tb_lote_vagas_reservadas
+            CHECK (vagas_reservadas >= 0 AND vagas_reservadas <= total_vagas);
+    END IF;
+END
+$$;
+
+CREATE TABLE IF NOT EXISTS tb_reserva_vaga (
+    id BIGSERIAL PRIMARY KEY,
+    id_lote BIGINT NOT NULL REFERENCES tb_lote (id) ON UPDATE CASCADE ON DELETE CASCADE,
+    codigo VARCHAR(36) NOT NULL UNIQUE,
+    quantidade INTEGER NOT NULL,
+    status VARCHAR(16) NOT NULL DEFAULT 'pendente',
+    expira_em TIMESTAMP WITH TIME ZONE NULL,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
+);
+CREATE INDEX IF NOT EXISTS ix_tb_reserva_vaga_id_lote ON tb_reserva_vaga (id_lote);
+CREATE INDEX IF NOT EXISTS ix_tb_reserva_vaga_status_expira_em ON tb_reserva_vaga (status, expira_em);
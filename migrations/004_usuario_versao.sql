@@ -0,0 +1,3 @@
+-- Versão do perfil para o /me a partir do token (ME_FROM_TOKEN, app.utils.user_version).
+ALTER TABLE tb_usuario ADD COLUMN IF NOT EXISTS versao INTEGER NOT NULL DEFAULT 1;
+CREATE INDEX IF NOT EXISTS ix_tb_usuario_updated_at ON tb_usuario (updated_at);
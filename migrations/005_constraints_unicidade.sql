@@ -0,0 +1,34 @@
+-- Unicidade garantida pelo banco; as rotas traduzem a violação em 409
+-- (app.utils.db_errors) em vez de fazer SELECT antes de escrever.
+-- Idempotente: cada passo confere o catálogo antes de alterar.
+
+-- Falha se já houver lotes repetidos. Para listá-los:
+--   SELECT id_evento, num_lote, count(*) FROM tb_lote GROUP BY 1, 2 HAVING count(*) > 1;
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'uq_tb_lote_evento_num_lote') THEN
+        ALTER TABLE tb_lote ADD CONSTRAINT uq_tb_lote_evento_num_lote UNIQUE (id_evento, num_lote);
+    END IF;
+END
+$$;
+-- coberto pelo índice da constraint acima (id_evento é a primeira coluna)
+DROP INDEX IF EXISTS ix_tb_lote_id_evento;
+
+-- Nomes fixos para as unicidades que já existiam
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'tb_pessoa_cpf_key')
+       AND NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'uq_tb_pessoa_cpf') THEN
+        ALTER TABLE tb_pessoa RENAME CONSTRAINT tb_pessoa_cpf_key TO uq_tb_pessoa_cpf;
+    END IF;
+END
+$$;
+-- o USING INDEX renomeia o índice para o nome da constraint
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'uq_tb_usuario_email')
+       AND EXISTS (SELECT 1 FROM pg_class WHERE relname = 'ix_tb_usuario_email' AND relkind = 'i') THEN
+        ALTER TABLE tb_usuario ADD CONSTRAINT uq_tb_usuario_email UNIQUE USING INDEX ix_tb_usuario_email;
+    END IF;
+END
+$$;
@@ -0,0 +1,32 @@
+-- Busca de eventos (GET /event/eventos/search, app/routes/event.py):
+-- full-text em português sem acento + trigramas sobre nome e local.
+-- Idempotente (o benchmarks/bench_http.py aplica depois do create_all).
+CREATE EXTENSION IF NOT EXISTS unaccent;
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- unaccent() é STABLE; o wrapper IMMUTABLE pode ir em índice
+CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+    AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$;
+
+-- português com stemming, ignorando acentos ("sao jose" acha "São José")
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'pt_unaccent') THEN
+        CREATE TEXT SEARCH CONFIGURATION pt_unaccent (COPY = portuguese);
+        ALTER TEXT SEARCH CONFIGURATION pt_unaccent
+            ALTER MAPPING FOR hword, hword_part, word WITH unaccent, portuguese_stem;
+    END IF;
+END
+$$;
+
+-- nome pesa mais que local no ranking
+ALTER TABLE tb_eventos ADD COLUMN IF NOT EXISTS busca tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('pt_unaccent', nome_evento), 'A') ||
+    setweight(to_tsvector('pt_unaccent', local), 'B')
+) STORED;
+
+CREATE INDEX IF NOT EXISTS ix_tb_eventos_busca ON tb_eventos USING gin (busca);
+-- mesma expressão usada na rota (_BUSCA_TRGM)
+CREATE INDEX IF NOT EXISTS ix_tb_eventos_busca_trgm ON tb_eventos
+    USING gin (f_unaccent(lower(nome_evento || ' ' || local)) gin_trgm_ops);
@@ -0,0 +1,2 @@
+-- Miniatura do produto, gerada no upload da imagem (POST /event/produtos/{id}/imagem).
+ALTER TABLE tb_produtos ADD COLUMN IF NOT EXISTS img_thumb TEXT NULL;
@@ -0,0 +1,3 @@
+-- Sincronização incremental do cache de revogação por data_insercao
+-- (app/utils/revocation.py); o corte por id pulava commits fora de ordem.
+CREATE INDEX IF NOT EXISTS ix_tb_blacklist_data_insercao ON tb_blacklist (data_insercao);
@@ -0,0 +1,34 @@
+-- Versão do perfil (ME_FROM_TOKEN, app.utils.user_version): qualquer alteração
+-- dos campos que o /me devolve, venha de onde vier (rota, job, SQL manual),
+-- incrementa tb_usuario.versao e o updated_at lido pela sincronização.
+CREATE OR REPLACE FUNCTION f_usuario_bump_versao() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+BEGIN
+    IF (NEW.email, NEW.id_pessoa) IS DISTINCT FROM (OLD.email, OLD.id_pessoa) THEN
+        NEW.versao := OLD.versao + 1;
+        NEW.updated_at := now();
+    END IF;
+    RETURN NEW;
+END
+$$;
+
+DROP TRIGGER IF EXISTS tg_usuario_bump_versao ON tb_usuario;
+CREATE TRIGGER tg_usuario_bump_versao
+    BEFORE UPDATE OF email, id_pessoa ON tb_usuario
+    FOR EACH ROW EXECUTE FUNCTION f_usuario_bump_versao();
+
+CREATE OR REPLACE FUNCTION f_pessoa_bump_versao() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+BEGIN
+    IF (NEW.nome, NEW.cpf, NEW.data_nascimento, NEW.adm)
+        IS DISTINCT FROM (OLD.nome, OLD.cpf, OLD.data_nascimento, OLD.adm) THEN
+        UPDATE tb_usuario SET versao = versao + 1, updated_at = now() WHERE id_pessoa = NEW.id;
+    END IF;
+    RETURN NULL;
+END
+$$;
+
+DROP TRIGGER IF EXISTS tg_pessoa_bump_versao ON tb_pessoa;
+CREATE TRIGGER tg_pessoa_bump_versao
+    AFTER UPDATE OF nome, cpf, data_nascimento, adm ON tb_pessoa
+    FOR EACH ROW EXECUTE FUNCTION f_pessoa_bump_versao();
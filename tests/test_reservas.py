@@ -0,0 +1,147 @@
+"""
+Concorrência da reserva de vagas contra um Postgres de verdade (o do .env /
+DB_*): muitas threads disputando o mesmo lote não podem vender além de
+total_vagas, e liberações concorrentes de vários lotes não podem travar.
+
+    python -m pytest tests/test_reservas.py
+
+Sem Postgres acessível o módulo é pulado. Versão manual, com mais carga e
+medição: benchmarks/hammer_reservas.py.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from fastapi import HTTPException
+from sqlalchemy import exc, func, select, update
+
+from app.database.connection import Base, SessionLocal, get_engine
+from app.models.event import Evento, Lote, ReservaVaga
+from app.routes.reserva import cancelar_reserva, liberar_reservas_expiradas, reservar_vagas
+
+THREADS = 16
+TENTATIVAS = 10
+
+
+@pytest.fixture(scope="module")
+def banco():
+    try:
+        with get_engine().connect() as conn:
+            if conn.dialect.name != "postgresql":
+                pytest.skip("precisa de Postgres")
+    except exc.SQLAlchemyError as e:
+        pytest.skip(f"Postgres indisponível: {e.__class__.__name__}")
+    Base.metadata.create_all(get_engine())
+
+
+@pytest.fixture
+def evento(banco):
+    with SessionLocal() as db:
+        hoje = dt.date.today()
+        obj = Evento(
+            nome_evento="test_reservas", local="-", dt_ini=hoje, dt_fim=hoje,
+            hr_ini=dt.time(8), hr_fim=dt.time(18),
+        )
+        db.add(obj)
+        db.commit()
+        evento_id = obj.id
+    yield evento_id
+    with SessionLocal() as db:
+        obj = db.get(Evento, evento_id)
+        if obj:
+            db.delete(obj)
+            db.commit()
+
+
+def _criar_lote(evento_id: int, num_lote: int, vagas: int) -> int:
+    with SessionLocal() as db:
+        lote = Lote(id_evento=evento_id, preco=0, num_lote=num_lote, total_vagas=vagas)
+        db.add(lote)
+        db.commit()
+        return lote.id
+
+
+def _ocupacao(lote_id: int) -> tuple[int, int]:
+    with SessionLocal() as db:
+        contador = db.scalar(select(Lote.vagas_reservadas).where(Lote.id == lote_id))
+        soma = db.scalar(
+            select(func.coalesce(func.sum(ReservaVaga.quantidade), 0)).where(ReservaVaga.id_lote == lote_id)
+        )
+        return int(contador), int(soma)
+
+
+def _disputar(lote_ids: list[int]) -> list[str]:
+    aceitas: list[str] = []
+    lock = threading.Lock()
+    inicio = threading.Event()
+
+    def worker(n: int) -> None:
+        inicio.wait()
+        for i in range(TENTATIVAS):
+            with SessionLocal() as db:
+                try:
+                    reserva = reservar_vagas(db, lote_ids[(n + i) % len(lote_ids)], 1)
+                except HTTPException as e:
+                    assert e.status_code == 409
+                    continue
+            with lock:
+                aceitas.append(reserva.codigo)
+
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        futures = [pool.submit(worker, n) for n in range(THREADS)]
+        inicio.set()
+        for f in futures:
+            f.result()
+    return aceitas
+
+
+def test_sem_overbooking(evento):
+    vagas = THREADS * TENTATIVAS // 3
+    lote_id = _criar_lote(evento, 1, vagas)
+
+    aceitas = _disputar([lote_id])
+
+    assert len(aceitas) == vagas
+    assert _ocupacao(lote_id) == (vagas, vagas)
+
+    metade = aceitas[: len(aceitas) // 2]
+    with SessionLocal() as db:
+        for codigo in metade:
+            cancelar_reserva(db, codigo)
+    restantes = vagas - len(metade)
+    assert _ocupacao(lote_id) == (restantes, restantes)
+
+
+def test_liberacoes_concorrentes(evento):
+    # reservas vencidas espalhadas em vários lotes, liberadas por várias
+    # threads ao mesmo tempo (o loop de cada worker): sem deadlock e com as
+    # vagas devolvidas uma vez só
+    lote_ids = [_criar_lote(evento, n, THREADS * TENTATIVAS) for n in range(1, 6)]
+    aceitas = _disputar(lote_ids)
+    assert len(aceitas) == THREADS * TENTATIVAS
+
+    with SessionLocal() as db:
+        db.execute(
+            update(ReservaVaga)
+            .where(ReservaVaga.id_lote.in_(lote_ids))
+            .values(expira_em=func.now() - dt.timedelta(seconds=1))
+        )
+        db.commit()
+
+    def liberar() -> int:
+        with SessionLocal() as db:
+            return liberar_reservas_expiradas(db, batch_size=7)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        devolvidas = sum(pool.map(lambda _: liberar(), range(4)))
+
+    assert devolvidas == len(aceitas)
+    for lote_id in lote_ids:
+        assert _ocupacao(lote_id) == (0, 0)